@@ -1,3 +1,7 @@
-from Renderer.base_renderer import pygame, SetupOptions
+import time
+
+START_TIME: float = time.perf_counter()
+
+from Renderer.base_renderer import pygame, numpy, SetupOptions
 from Renderer.renderer2d import Renderer2D
 from Renderer.renderer3d import Renderer3D
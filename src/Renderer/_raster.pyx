@@ -0,0 +1,251 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=False
+from libc.math cimport floor, fabs
+
+cdef int SUBPIXEL_BITS = 4
+cdef double MAX_COORD = 16777216.0
+
+
+cdef bint _clip(
+    double x0, double y0, double x1, double y1, int width, int height, double* out
+) noexcept:
+    cdef double dx = x1 - x0
+    cdef double dy = y1 - y0
+    cdef double t0 = 0.0
+    cdef double t1 = 1.0
+    cdef double p[4]
+    cdef double q[4]
+    cdef double r
+    cdef int i
+
+    p[0] = -dx
+    q[0] = x0
+    p[1] = dx
+    q[1] = (width - 1) - x0
+    p[2] = -dy
+    q[2] = y0
+    p[3] = dy
+    q[3] = (height - 1) - y0
+    for i in range(4):
+        if p[i] == 0:
+            if q[i] < 0:
+                return False
+            continue
+        r = q[i] / p[i]
+        if p[i] < 0:
+            if r > t0:
+                t0 = r
+        elif r < t1:
+            t1 = r
+    if t0 > t1:
+        return False
+
+    out[0] = x0 + t0 * dx
+    out[1] = y0 + t0 * dy
+    out[2] = x0 + t1 * dx
+    out[3] = y0 + t1 * dy
+    for i in range(4):
+        if out[i] < 0.0:
+            out[i] = 0.0
+        if out[i] > (width - 1 if i % 2 == 0 else height - 1):
+            out[i] = width - 1 if i % 2 == 0 else height - 1
+    return True
+
+
+cdef void _line(
+    unsigned char[:, :, :] framebuffer,
+    double sx,
+    double sy,
+    double ex,
+    double ey,
+    unsigned char r,
+    unsigned char g,
+    unsigned char b,
+) noexcept:
+    cdef double clipped[4]
+    cdef long long x0, y0, dx, dy, steps, step, divisor, x, y
+    if not _clip(sx, sy, ex, ey, framebuffer.shape[0], framebuffer.shape[1], clipped):
+        return
+
+    x0 = <long long>floor(clipped[0])
+    y0 = <long long>floor(clipped[1])
+    dx = <long long>floor(clipped[2]) - x0
+    dy = <long long>floor(clipped[3]) - y0
+    steps = max(abs(dx), abs(dy))
+    divisor = max(2 * steps, 1)
+    for step in range(steps + 1):
+        x = x0 + (2 * dx * step + steps) // divisor
+        y = y0 + (2 * dy * step + steps) // divisor
+        framebuffer[x, y, 0] = r
+        framebuffer[x, y, 1] = g
+        framebuffer[x, y, 2] = b
+
+
+cdef void _triangle(
+    unsigned char[:, :, :] framebuffer,
+    double ax,
+    double ay,
+    double bx,
+    double by,
+    double cx,
+    double cy,
+    unsigned char r,
+    unsigned char g,
+    unsigned char b,
+) noexcept:
+    cdef long long x0, y0, x1, y1, x2, y2, area, x, y, px, py, e0, e1, e2
+    cdef long long min_x, max_x, min_y, max_y
+    cdef long long half = 1 << (SUBPIXEL_BITS - 1)
+    cdef double scale = 1 << SUBPIXEL_BITS
+
+    if not (
+        fabs(ax) <= MAX_COORD
+        and fabs(ay) <= MAX_COORD
+        and fabs(bx) <= MAX_COORD
+        and fabs(by) <= MAX_COORD
+        and fabs(cx) <= MAX_COORD
+        and fabs(cy) <= MAX_COORD
+    ):
+        return
+
+    x0 = <long long>floor(ax * scale)
+    y0 = <long long>floor(ay * scale)
+    x1 = <long long>floor(bx * scale)
+    y1 = <long long>floor(by * scale)
+    x2 = <long long>floor(cx * scale)
+    y2 = <long long>floor(cy * scale)
+    area = (x1 - x0) * (y2 - y0) - (y1 - y0) * (x2 - x0)
+    if area == 0:
+        return
+
+    min_x = max(min(x0, x1, x2) >> SUBPIXEL_BITS, 0)
+    max_x = min(max(x0, x1, x2) >> SUBPIXEL_BITS, framebuffer.shape[0] - 1)
+    min_y = max(min(y0, y1, y2) >> SUBPIXEL_BITS, 0)
+    max_y = min(max(y0, y1, y2) >> SUBPIXEL_BITS, framebuffer.shape[1] - 1)
+
+    for y in range(min_y, max_y + 1):
+        py = (y << SUBPIXEL_BITS) + half
+        for x in range(min_x, max_x + 1):
+            px = (x << SUBPIXEL_BITS) + half
+            e0 = (x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)
+            e1 = (x0 - x2) * (py - y2) - (y0 - y2) * (px - x2)
+            e2 = (x1 - x0) * (py - y0) - (y1 - y0) * (px - x0)
+            if area > 0:
+                if e0 < 0 or e1 < 0 or e2 < 0:
+                    continue
+            elif e0 > 0 or e1 > 0 or e2 > 0:
+                continue
+            framebuffer[x, y, 0] = r
+            framebuffer[x, y, 1] = g
+            framebuffer[x, y, 2] = b
+
+
+def clip_lines(double[:, :] starts, double[:, :] ends, int width, int height):
+    import numpy
+
+    cdef Py_ssize_t count = starts.shape[0]
+    clipped_starts = numpy.zeros((count, 2))
+    clipped_ends = numpy.zeros((count, 2))
+    keep = numpy.zeros(count, dtype=bool)
+    cdef double[:, :] out_starts = clipped_starts
+    cdef double[:, :] out_ends = clipped_ends
+    cdef unsigned char[:] out_keep = keep.view(numpy.uint8)
+    cdef double clipped[4]
+    cdef Py_ssize_t i
+
+    for i in range(count):
+        if _clip(
+            starts[i, 0], starts[i, 1], ends[i, 0], ends[i, 1], width, height, clipped
+        ):
+            out_starts[i, 0] = clipped[0]
+            out_starts[i, 1] = clipped[1]
+            out_ends[i, 0] = clipped[2]
+            out_ends[i, 1] = clipped[3]
+            out_keep[i] = 1
+    return clipped_starts, clipped_ends, keep
+
+
+def draw_lines(
+    unsigned char[:, :, :] framebuffer,
+    double[:, :] starts,
+    double[:, :] ends,
+    unsigned char[:, :] colors,
+):
+    cdef Py_ssize_t i
+    for i in range(starts.shape[0]):
+        _line(
+            framebuffer,
+            starts[i, 0],
+            starts[i, 1],
+            ends[i, 0],
+            ends[i, 1],
+            colors[i, 0],
+            colors[i, 1],
+            colors[i, 2],
+        )
+
+
+def fill_polygons(
+    unsigned char[:, :, :] framebuffer,
+    double[:, :, :] polygons,
+    unsigned char[:, :] colors,
+    unsigned char[:, :] outlines,
+    outlined,
+):
+    import numpy
+
+    cdef unsigned char[:] has_outline = numpy.ascontiguousarray(
+        outlined, dtype=numpy.uint8
+    )
+    cdef Py_ssize_t size = polygons.shape[1]
+    cdef Py_ssize_t polygon, vertex, following
+    if size < 3:
+        return
+
+    for polygon in range(polygons.shape[0]):
+        for vertex in range(1, size - 1):
+            _triangle(
+                framebuffer,
+                polygons[polygon, 0, 0],
+                polygons[polygon, 0, 1],
+                polygons[polygon, vertex, 0],
+                polygons[polygon, vertex, 1],
+                polygons[polygon, vertex + 1, 0],
+                polygons[polygon, vertex + 1, 1],
+                colors[polygon, 0],
+                colors[polygon, 1],
+                colors[polygon, 2],
+            )
+        if not has_outline[polygon]:
+            continue
+        for vertex in range(size):
+            following = (vertex + 1) % size
+            _line(
+                framebuffer,
+                polygons[polygon, vertex, 0],
+                polygons[polygon, vertex, 1],
+                polygons[polygon, following, 0],
+                polygons[polygon, following, 1],
+                outlines[polygon, 0],
+                outlines[polygon, 1],
+                outlines[polygon, 2],
+            )
+
+
+def splat_points(
+    unsigned char[:, :] framebuffer,
+    float[:] zbuffer,
+    long long[:] pixels,
+    float[:] depths,
+    unsigned char[:, :] colors,
+):
+    cdef Py_ssize_t i, color
+    cdef long long pixel
+    cdef bint per_point = colors.shape[0] > 1
+    for i in range(pixels.shape[0]):
+        pixel = pixels[i]
+        if pixel >= 0 and depths[i] < zbuffer[pixel]:
+            zbuffer[pixel] = depths[i]
+            color = i if per_point else 0
+            framebuffer[pixel, 0] = colors[color, 0]
+            framebuffer[pixel, 1] = colors[color, 1]
+            framebuffer[pixel, 2] = colors[color, 2]
@@ -1,8 +1,34 @@
+import os
+import json
 import time
+import random
+import asyncio
+import threading
 import pygame
 import numpy
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
 
 from UI.ui import UI
+from Renderer import START_TIME
+from Renderer.scene import ObjectStore
+from Renderer.watcher import FileWatcher
+from Renderer.picking import BoundsIndex
+from Renderer.startup import StartupProfile, FontCache
+from Renderer.recorder import FrameRecorder
+from Renderer.replay import InputRecorder, InputLog, scene_path
+from Renderer.resolution import ResolutionScaler
+from Renderer.memory import (
+    arrays_nbytes,
+    deep_sizeof,
+    dump_snapshot,
+    format_bytes,
+    start_tracing,
+)
+from pathlib import Path
+
+WAKE_EVENT: int = pygame.event.custom_type()
 
 
 class SetupOptions:
@@ -11,6 +37,15 @@ class SetupOptions:
         self.window_flags: int = pygame.DOUBLEBUF
         self.allowed_events: list[int] = [pygame.QUIT, pygame.KEYDOWN]
         self.title: str = "Renderer"
+        self.hot_reload_interval: float | None = None
+        self.memory_tracing: bool = False
+        self.lazy_init: bool = True
+        self.headless: bool = False
+        self.on_demand: bool = False
+        self.idle_timeout: float = 0.5
+        self.target_fps: float | None = None
+        self.min_render_scale: float = 0.25
+        self.workers: int | None = None
 
     def set_size(self, size: tuple[int, int]) -> None:
         for i in size:
@@ -28,21 +63,66 @@ class SetupOptions:
     def set_title(self, title: str) -> None:
         self.title = title
 
+    def enable_on_demand(self, idle_timeout: float = 0.5) -> None:
+        if idle_timeout <= 0:
+            raise ValueError("Idle timeout must be greater than 0")
+        self.on_demand = True
+        self.idle_timeout = idle_timeout
+
+    def enable_dynamic_resolution(
+        self, target_fps: float = 60.0, min_scale: float = 0.25
+    ) -> None:
+        if target_fps <= 0:
+            raise ValueError("Target FPS must be greater than 0")
+        if not 0 < min_scale <= 1:
+            raise ValueError("Minimum scale must be between 0 and 1")
+        self.target_fps = target_fps
+        self.min_render_scale = min_scale
+
+    def set_workers(self, workers: int) -> None:
+        if workers < 1:
+            raise ValueError("Worker count cannot be less than 1")
+        self.workers = workers
+
+    def enable_headless(self) -> None:
+        self.headless = True
+
+    def disable_lazy_init(self) -> None:
+        self.lazy_init = False
+
+    def enable_memory_tracing(self) -> None:
+        self.memory_tracing = True
+
+    def enable_hot_reload(self, interval: float = 0.5) -> None:
+        if interval <= 0:
+            raise ValueError("Interval must be greater than 0")
+        self.hot_reload_interval = interval
+
 
 class RendererBase:
     def __init__(self, options: SetupOptions) -> None:
-        flags: int = options.window_flags
-        self._window: pygame.Surface = pygame.display.set_mode(options.size, flags, 8)
-        pygame.init()
-        pygame.event.set_allowed(options.allowed_events)
-        pygame.display.set_caption(options.title)
-        info = pygame.display.Info()
+        self.startup: StartupProfile = StartupProfile(START_TIME)
+        self._lazy_init: bool = options.lazy_init
+
+        if options.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+        with self.startup.phase("window"):
+            flags: int = options.window_flags
+            self._window: pygame.Surface = pygame.display.set_mode(
+                options.size, flags, 8
+            )
+            pygame.init()
+            pygame.event.set_allowed(options.allowed_events)
+            pygame.display.set_caption(options.title)
+            info = pygame.display.Info()
         self._win_width, self._win_height = (
             info.current_w,
             info.current_h,
         )
 
         pygame.mouse.set_visible(False)
+        self._mouse_pos: tuple[int, int] = (0, 0)
         self._last_mouse_pos: numpy.ndarray | None = None
         self._mouse_buttons: list[bool] = [False, False, False]
         self._shift_hold: bool = False
@@ -53,22 +133,94 @@ class RendererBase:
         self._debug_cursor_idx: int | None = None
         self._current_rendered: int = 0
 
-        self.fonts: dict[str, pygame.font.Font] = {
-            "default": pygame.font.Font(None, 24),
-            "debug": pygame.font.SysFont("monospace", 28),
-        }
+        self._on_demand: bool = options.on_demand
+        self._idle_timeout: float = options.idle_timeout
+        self._redraw: bool = True
+        self._drawn_state: tuple | None = None
+        self._idle: bool = False
+        self._held_events: list[pygame.event.Event] = []
+        self.frames_drawn: int = 0
+        self.frames_skipped: int = 0
+
+        self.resolution: ResolutionScaler | None = (
+            None
+            if options.target_fps is None
+            else ResolutionScaler(options.target_fps, options.min_render_scale)
+        )
+        self._render_surface: pygame.Surface | None = None
+
+        self.fonts: FontCache = FontCache(
+            {
+                "default": lambda: pygame.font.Font(None, 24),
+                "debug": lambda: pygame.font.SysFont("monospace", 28),
+            },
+            self.startup,
+        )
+        if not self._lazy_init:
+            self.fonts.load_all()
+
+        if options.memory_tracing:
+            start_tracing()
+        self._memory_text: list[str] = []
+        self._memory_time: float = 0.0
 
-        self.ui: UI = UI((self._win_width, self._win_height), "src/UI/")
-        self.bind_buttons()
+        self._pick_index: BoundsIndex = BoundsIndex()
+        self._pick_state: tuple | None = None
 
+        self._hot_reload_interval: float | None = options.hot_reload_interval
+        self._watcher: FileWatcher | None = None
+
+        self._recorder: FrameRecorder | None = None
+        self._input_recorder: InputRecorder | None = None
+        self._replaying: bool = False
+
+        self._pending_calls: list[tuple[Future, Callable, tuple]] = []
+        self._pending_lock: threading.Lock = threading.Lock()
+
+        self._template_data: dict[str, dict] = {}
+
+        with self.startup.phase("ui"):
+            self.ui: UI = UI(
+                (self._win_width, self._win_height), "src/UI/", self._lazy_init
+            )
+            self.bind_buttons()
 
     def _resize(self, width: int, height: int) -> None:
         self._win_width = width
         self._win_height = height
         self.ui.update_blocks((width, height))
+        self._redraw = True
+
+    def mark_dirty(self) -> None:
+        self._redraw = True
+
+    def _view_state(self) -> tuple:
+        return (
+            self._mouse_pos,
+            tuple(self._mouse_buttons),
+            self._win_width,
+            self._win_height,
+            self._objects,
+            self._objects.version,
+            self._objects.move_version,
+            self._get_templates(),
+        )
 
-    def _poll_events(self) -> bool:
-        for event in pygame.event.get():
+    def _needs_draw(self) -> bool:
+        state: tuple = self._view_state()
+        if self._redraw or self._debug_mode or state != self._drawn_state:
+            self._redraw = False
+            self._drawn_state = state
+            return True
+        return False
+
+    def _wait_for_event(self) -> None:
+        event: pygame.event.Event = pygame.event.wait(int(self._idle_timeout * 1000))
+        if event.type != pygame.NOEVENT:
+            self._held_events.append(event)
+
+    def _poll_events(self, events: list[pygame.event.Event]) -> bool:
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             elif event.type == pygame.VIDEORESIZE:
@@ -119,17 +271,211 @@ class RendererBase:
                 self._mouse_buttons[2] = False
 
             self.mouse_released(pos, button)
-            
+
     def bind_buttons(self) -> None: ...
 
     def _toggle_debug(self) -> None: ...
     def update(self, dt: float) -> None: ...
-    def create_object(self, obj_name: str, pos: tuple) -> None: ...
+    def create_object(self, obj_name: str, pos: tuple) -> int: ...
+    def move_object(self, idx: int, pos: tuple) -> None: ...
     def _delete_object(self, idx: int) -> None: ...
     def _render_objects(self) -> None: ...
+    def _stop_workers(self) -> None: ...
+
+    @staticmethod
+    def _read_obj_file(path: Path) -> dict:
+        with open(path, "r") as file:
+            return json.load(file)
+
+    def _load_obj_templates(self) -> None:
+        self._template_data = {}
+        for path in sorted(Path(self._objects_path).glob("*.obj")):
+            obj: dict = self._read_obj_file(path)
+            self._template_data[obj["name"]] = obj
+        if not self._lazy_init:
+            for name in list(self._template_data):
+                self._get_template(name)
+
+    def _has_template(self, name: str) -> bool:
+        return name in self._object_templates or name in self._template_data
+
+    def _get_template(self, name: str) -> Any:
+        template: Any | None = self._object_templates.get(name)
+        if template is None:
+            if name not in self._template_data:
+                raise KeyError(name)
+            with self.startup.phase("templates"):
+                self._set_obj_template(
+                    self._build_obj_template(self._template_data.pop(name))
+                )
+            template = self._object_templates[name]
+        return template
+
+    def startup_report(self) -> dict[str, float]:
+        return self.startup.report()
+
+    def _get_startup_text(self) -> str:
+        return f"{(self.startup.first_frame or 0.0) * 1000:.0f} ms"
+
+    def _get_templates(self) -> list[Any]:
+        return [self._object_templates[name] for name in self._objects.templates]
+
+    def _update_pick_index(self) -> None:
+        store: ObjectStore = self._objects
+        templates: list[Any] = self._get_templates()
+        bounds: numpy.ndarray = numpy.array(
+            [template.bounds for template in templates], dtype=float
+        ).reshape(-1, store.dims * 2)
+        if self._pick_state is not None:
+            old_store, version, move_version, old_templates = self._pick_state
+            if (
+                old_store is store
+                and version == store.version
+                and templates == old_templates
+            ):
+                if move_version != store.move_version:
+                    moved: numpy.ndarray = store.moved_since(move_version)
+                    mins, maxs = store.bounds(moved, bounds[store.template_ids[moved]])
+                    self._pick_index.update(moved, mins, maxs)
+                    self._pick_state = (store, version, store.move_version, templates)
+                return
+
+        handles: numpy.ndarray = store.alive()
+        mins, maxs = store.bounds(handles, bounds[store.template_ids[handles]])
+        self._pick_index.build(handles, mins, maxs)
+        self._pick_state = (store, store.version, store.move_version, templates)
+
+    def _build_obj_template(self, obj: dict) -> Any: ...
+
+    def _set_obj_template(self, template: Any) -> None:
+        self._object_templates[template.name] = template
+
+    def _file_changed(self, path: Path) -> None:
+        if path.suffix == ".obj":
+            try:
+                obj: dict = self._read_obj_file(path)
+                name: str = obj["name"]
+                if name not in self._object_templates:
+                    self._template_data[name] = obj
+                    return
+                template: Any = self._build_obj_template(obj)
+            except (OSError, ValueError, KeyError):
+                return
+            self.submit(self._set_obj_template, template)
+        else:
+            self.submit(self.ui.reload)
+
+    def _start_watcher(self) -> None:
+        if self._hot_reload_interval is None:
+            return
+        self._watcher = FileWatcher(
+            [Path(self._objects_path), self.ui.layout_path],
+            (".obj", ".html", ".css"),
+            self._file_changed,
+            self._hot_reload_interval,
+        )
+        self._watcher.start()
+
+    def _stop_watcher(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _memory_caches(self) -> dict[str, int]:
+        index: BoundsIndex = self._pick_index
+        return {
+            "pick_index": arrays_nbytes(
+                index.order,
+                index.handles,
+                index.mins,
+                index.maxs,
+                index.leaf_mins,
+                index.leaf_maxs,
+            ),
+            "render_surface": (
+                0
+                if self._render_surface is None
+                else self._render_surface.get_pitch()
+                * self._render_surface.get_height()
+            ),
+        }
+
+    def memory_report(self) -> dict[str, Any]:
+        store: ObjectStore = self._objects
+        arrays: tuple[numpy.ndarray, ...] = (
+            store.positions,
+            store.template_ids,
+            store.flags,
+            store.rotations,
+            store.scales,
+            store.matrices,
+            store.dirty,
+            store.parents,
+            store.world_dirty,
+            store.move_stamps,
+        )
+        if store.hierarchical:
+            arrays += (store.world_positions, store.world_matrices)
+        return {
+            "objects": len(store),
+            "capacity": len(store.flags),
+            "bytes_per_object": sum(
+                array.itemsize * int(numpy.prod(array.shape[1:])) for array in arrays
+            ),
+            "scene_store": arrays_nbytes(*arrays) + deep_sizeof(store.templates),
+            "templates": {
+                name: deep_sizeof(template)
+                for name, template in self._object_templates.items()
+            },
+            "ui": deep_sizeof(self.ui.blocks),
+            "caches": self._memory_caches(),
+        }
+
+    def dump_memory_snapshot(self, path: Path | str) -> None:
+        dump_snapshot(path)
+
+    def _get_memory_text(self) -> list[str]:
+        if time.perf_counter() - self._memory_time > 1:
+            report: dict[str, Any] = self.memory_report()
+            self._memory_text = [
+                f"Memory/Object: {report['bytes_per_object']} B",
+                "Memory (Store/Templates/UI/Caches): "
+                + "/".join(
+                    format_bytes(size)
+                    for size in (
+                        report["scene_store"],
+                        sum(report["templates"].values()),
+                        report["ui"],
+                        sum(report["caches"].values()),
+                    )
+                ),
+            ]
+            self._memory_time = time.perf_counter()
+        return self._memory_text
+
+    def save_scene(self, path: Path | str) -> None:
+        self._objects.save(path)
+
+    def load_scene(self, path: Path | str) -> None:
+        store: ObjectStore = ObjectStore.load(path)
+        if store.dims != self._objects.dims:
+            raise ValueError(f"Scene has {store.dims} dimensions")
+        for name in store.templates:
+            if not self._has_template(name):
+                raise ValueError(f"Scene uses unknown template {name}")
+        for name in store.templates:
+            self._get_template(name)
+
+        self._objects = store
+        self._debug_mode = False
+        self._debug_cursor_idx = None
+
     def draw_ui(self) -> None: ...
 
     def _draw_ui(self) -> None:
+        if not self.ui.loaded:
+            with self.startup.phase("ui"):
+                self.ui.reload()
         self.ui.draw(self._window, self.fonts["default"])
 
         color = [0, 0, 0]
@@ -144,40 +490,285 @@ class RendererBase:
             pygame.draw.circle(
                 self._window,
                 (255, 255, 255),
-                pygame.mouse.get_pos(),
+                self._mouse_pos,
                 4,
             )
         else:
             pygame.draw.circle(
                 self._window,
                 color,
-                pygame.mouse.get_pos(),
+                self._mouse_pos,
                 3,
             )
 
         self.draw_ui()
 
+    @contextmanager
+    def _use_render_scale(self, scale: float) -> Iterator[float]:
+        size: tuple[int, int] = (
+            max(round(self._win_width * scale), 1),
+            max(round(self._win_height * scale), 1),
+        )
+        if self._render_surface is None or self._render_surface.get_size() != size:
+            self._render_surface = pygame.Surface(size, 0, self._window)
+
+        state: tuple = (self._window, self._win_width, self._win_height)
+        self._window = self._render_surface
+        self._win_width, self._win_height = size
+        self._window.fill(0)
+        try:
+            yield size[0] / state[1]
+        finally:
+            self._window, self._win_width, self._win_height = state
+            pygame.transform.scale(
+                self._render_surface, self._window.get_size(), self._window
+            )
+
+    def _get_resolution_text(self) -> str:
+        if self.resolution is None:
+            return "native"
+        return (
+            f"{round(self._win_width * self.resolution.scale)}x"
+            + f"{round(self._win_height * self.resolution.scale)} "
+            + f"({round(self.resolution.scale * 100)}%)"
+        )
+
     def _draw(self) -> None:
         self._window.fill(0)
 
-        self._render_objects()
+        if self.resolution is None or self.resolution.scale == 1.0:
+            self._render_objects()
+        else:
+            with self._use_render_scale(self.resolution.scale):
+                self._render_objects()
         self._draw_ui()
 
         pygame.display.flip()
+        if self._recorder is not None:
+            try:
+                self._recorder.capture(self._window)
+            except (RuntimeError, TimeoutError):
+                self._recorder = None
+                raise
+
+    def _capture_state(self) -> dict[str, Any]:
+        return {
+            "mouse_pos": self._mouse_pos,
+            "last_mouse_pos": (
+                None if self._last_mouse_pos is None else self._last_mouse_pos.tolist()
+            ),
+            "mouse_buttons": self._mouse_buttons,
+            "shift_hold": self._shift_hold,
+            "debug_mode": self._debug_mode,
+            "debug_cursor_idx": self._debug_cursor_idx,
+        }
 
-    def start(self) -> None:
-        previous_time = time.time()
-        running: bool = True
-        while running:
-            current_time = time.time()
-            deltatime = current_time - previous_time
+    def _restore_state(self, state: dict[str, Any]) -> None:
+        self._mouse_pos = tuple(state["mouse_pos"])
+        self._last_mouse_pos = (
+            None
+            if state["last_mouse_pos"] is None
+            else numpy.array(state["last_mouse_pos"], dtype=float)
+        )
+        self._mouse_buttons = list(state["mouse_buttons"])
+        self._shift_hold = state["shift_hold"]
+        self._debug_mode = state["debug_mode"]
+        self._debug_cursor_idx = state["debug_cursor_idx"]
+
+    def start_input_recording(self, path: Path | str, seed: int | None = None) -> None:
+        if self._replaying:
+            return
+        self.stop_input_recording()
+        if seed is None:
+            seed = random.randrange(2**32)
+        random.seed(seed)
+        self.save_scene(scene_path(path))
+        self._input_recorder = InputRecorder(
+            path, (self._win_width, self._win_height), seed, self._capture_state()
+        )
 
-            running = self._poll_events()
-            self.update(deltatime)
-            self._draw()
-            self._clock.tick(60)
+    def stop_input_recording(self) -> None:
+        if self._input_recorder is not None and not self._replaying:
+            self._input_recorder.close()
+            self._input_recorder = None
+
+    def replay(
+        self, path: Path | str, fixed_dt: float | None = None, realtime: bool = False
+    ) -> list[float]:
+        log: InputLog = InputLog(path)
+        if log.size != (self._win_width, self._win_height):
+            raise ValueError(f"Input log was recorded at {log.size[0]}x{log.size[1]}")
+        if log.state is not None:
+            self.load_scene(scene_path(log.path))
+            self._restore_state(log.state)
+        random.seed(log.seed)
+
+        frame_times: list[float] = []
+        self._replaying = True
+        try:
+            for dt, mouse_pos, events in log:
+                frame_start: float = time.perf_counter()
+                running: bool = self._frame(
+                    dt if fixed_dt is None else fixed_dt, (mouse_pos, events)
+                )
+                frame_times.append(time.perf_counter() - frame_start)
+                if not running:
+                    break
+                if realtime:
+                    time.sleep(max(dt - frame_times[-1], 0))
+        finally:
+            self._replaying = False
+        return frame_times
+
+    def start_recording(
+        self,
+        path: Path | str,
+        format: str = "png",
+        queue_size: int = 16,
+        drop: str = "newest",
+        fps: int = 60,
+    ) -> None:
+        self.stop_recording()
+        self._recorder = FrameRecorder(
+            path, self._window, format, queue_size, drop, fps
+        )
 
-            previous_time = current_time
-            time.sleep(1 / 60)
+    def stop_recording(self) -> dict[str, float] | None:
+        if self._recorder is None:
+            return None
+        recorder: FrameRecorder = self._recorder
+        self._recorder = None
+        recorder.stop()
+        return recorder.stats()
+
+    def submit(self, func: Callable, *args: Any) -> Future:
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending_calls.append((future, func, args))
+        self._wake()
+        return future
+
+    def _wake(self) -> None:
+        if self._on_demand:
+            try:
+                pygame.event.post(pygame.event.Event(WAKE_EVENT))
+            except pygame.error:
+                pass
+
+    def _run_pending(self) -> None:
+        with self._pending_lock:
+            calls, self._pending_calls = self._pending_calls, []
+        if calls:
+            self._redraw = True
+
+        for future, func, args in calls:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except Exception as error:
+                future.set_exception(error)
+
+    async def create_object_async(self, obj_name: str, pos: tuple) -> int:
+        return await asyncio.wrap_future(self.submit(self.create_object, obj_name, pos))
+
+    async def move_object_async(self, idx: int, pos: tuple) -> None:
+        await asyncio.wrap_future(self.submit(self.move_object, idx, pos))
+
+    async def delete_object_async(self, idx: int) -> None:
+        await asyncio.wrap_future(self.submit(self._delete_object, idx))
+
+    def _frame(
+        self,
+        deltatime: float,
+        frame_input: tuple[tuple[int, int], list[pygame.event.Event]] | None = None,
+    ) -> bool:
+        self._run_pending()
+        if frame_input is None:
+            self._mouse_pos = pygame.mouse.get_pos()
+            events: list[pygame.event.Event] = [
+                event
+                for event in self._held_events + pygame.event.get()
+                if event.type != WAKE_EVENT
+            ]
+            self._held_events = []
+        else:
+            self._mouse_pos, events = frame_input
+        if self._input_recorder is not None:
+            self._input_recorder.frame(deltatime, self._mouse_pos, events)
+
+        frame_start: float = time.perf_counter()
+        running: bool = self._poll_events(events)
+        self.update(deltatime)
+        if events:
+            self._redraw = True
+
+        self._idle = self._on_demand and not self._needs_draw()
+        if self._idle:
+            self.frames_skipped += 1
+        else:
+            self._draw()
+            self.frames_drawn += 1
+            if self.resolution is not None:
+                self.resolution.update(time.perf_counter() - frame_start)
+        if self.startup.first_frame is None:
+            self.startup.frame_done()
+        return running
 
-        pygame.quit()
+    def start(self) -> None:
+        self._start_watcher()
+        previous_time = time.time()
+        running: bool = True
+        try:
+            while running:
+                current_time = time.time()
+                deltatime = current_time - previous_time
+
+                running = self._frame(deltatime)
+                previous_time = current_time
+                if self._idle:
+                    self._wait_for_event()
+                    previous_time = time.time() - 1 / 60
+                    continue
+
+                self._clock.tick(60)
+                time.sleep(1 / 60)
+        finally:
+            self.close()
+
+    async def start_async(self, fps: int = 60) -> None:
+        frame_time: float = 1 / fps
+        self._start_watcher()
+        previous_time = time.perf_counter()
+        next_frame: float = previous_time
+        running: bool = True
+        try:
+            while running:
+                current_time = time.perf_counter()
+                deltatime = current_time - previous_time
+
+                running = self._frame(deltatime)
+                self._clock.tick()
+
+                previous_time = current_time
+                next_frame += frame_time
+                delay: float = next_frame - time.perf_counter()
+                if delay < 0:
+                    next_frame = time.perf_counter()
+                    delay = 0
+                await asyncio.sleep(delay)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._stop_watcher()
+        try:
+            self.stop_recording()
+        finally:
+            self.stop_input_recording()
+            self._stop_workers()
+            with self._pending_lock:
+                for future, _, _ in self._pending_calls:
+                    future.cancel()
+                self._pending_calls = []
+            pygame.quit()
@@ -0,0 +1,107 @@
+import numpy
+from Renderer import raster
+
+try:
+    from Renderer import _raster
+except ImportError:
+    _raster = None
+
+COMPILED: bool = _raster is not None
+BACKENDS: dict[str, object] = {"numpy": raster}
+if _raster is not None:
+    BACKENDS["compiled"] = _raster
+
+backend = _raster if _raster is not None else raster
+
+
+def set_backend(name: str) -> None:
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown raster backend {name}")
+    backend = BACKENDS[name]
+
+
+def draw_lines(
+    framebuffer: numpy.ndarray,
+    starts: numpy.ndarray,
+    ends: numpy.ndarray,
+    colors: numpy.ndarray,
+) -> None:
+    backend.draw_lines(
+        framebuffer,
+        numpy.ascontiguousarray(starts, dtype=float),
+        numpy.ascontiguousarray(ends, dtype=float),
+        numpy.ascontiguousarray(colors, dtype=numpy.uint8),
+    )
+
+
+def fill_polygons(
+    framebuffer: numpy.ndarray,
+    polygons: numpy.ndarray,
+    colors: numpy.ndarray,
+    outlines: numpy.ndarray,
+    outlined: numpy.ndarray,
+) -> None:
+    backend.fill_polygons(
+        framebuffer,
+        numpy.ascontiguousarray(polygons, dtype=float),
+        numpy.ascontiguousarray(colors, dtype=numpy.uint8),
+        numpy.ascontiguousarray(outlines, dtype=numpy.uint8),
+        numpy.ascontiguousarray(outlined, dtype=bool),
+    )
+
+
+def splat_points(
+    framebuffer: numpy.ndarray,
+    zbuffer: numpy.ndarray,
+    pixels: numpy.ndarray,
+    depths: numpy.ndarray,
+    colors: numpy.ndarray,
+) -> None:
+    backend.splat_points(
+        framebuffer.reshape(-1, 3),
+        zbuffer.reshape(-1),
+        numpy.ascontiguousarray(pixels, dtype=numpy.int64),
+        numpy.ascontiguousarray(depths, dtype=numpy.float32),
+        numpy.ascontiguousarray(colors, dtype=numpy.uint8).reshape(-1, 3),
+    )
+
+
+def compare_backends(
+    size: tuple[int, int] = (320, 240), count: int = 500, seed: int = 0
+) -> int:
+    if _raster is None:
+        raise RuntimeError("The compiled raster backend is not built")
+
+    rng: numpy.random.Generator = numpy.random.default_rng(seed)
+    scale: numpy.ndarray = numpy.array(size, dtype=float)
+    polygons: numpy.ndarray = rng.random((count, 4, 2)) * scale * 1.4 - scale * 0.2
+    polygons[: count // 4, 3] = polygons[: count // 4, 2]
+    colors: numpy.ndarray = rng.integers(0, 256, (count, 3), dtype=numpy.uint8)
+    outlined: numpy.ndarray = rng.random(count) < 0.5
+    starts: numpy.ndarray = rng.random((count, 2)) * scale * 1.4 - scale * 0.2
+    ends: numpy.ndarray = rng.random((count, 2)) * scale * 1.4 - scale * 0.2
+    pixels: numpy.ndarray = rng.integers(
+        -size[0] * size[1], size[0] * size[1], count * 20
+    )
+    depths: numpy.ndarray = rng.integers(0, 64, count * 20).astype(numpy.float32)
+    point_colors: numpy.ndarray = rng.integers(
+        0, 256, (count * 20, 3), dtype=numpy.uint8
+    )
+
+    frames: list[numpy.ndarray] = []
+    for module in (raster, _raster):
+        framebuffer: numpy.ndarray = numpy.zeros((*size, 3), dtype=numpy.uint8)
+        module.fill_polygons(framebuffer, polygons, colors, colors[::-1], outlined)
+        module.draw_lines(framebuffer, starts, ends, colors)
+        zbuffer: numpy.ndarray = numpy.full(size, numpy.inf, dtype=numpy.float32)
+        for chunk in numpy.array_split(numpy.arange(count * 20), 4):
+            module.splat_points(
+                framebuffer.reshape(-1, 3),
+                zbuffer.reshape(-1),
+                pixels[chunk],
+                depths[chunk],
+                point_colors[chunk],
+            )
+        frames.append(framebuffer)
+    return int((frames[0] != frames[1]).any(axis=2).sum())
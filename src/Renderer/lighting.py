@@ -0,0 +1,87 @@
+import numpy
+
+
+class DirectionalLight:
+    def __init__(
+        self,
+        direction: tuple[float, float, float],
+        color: tuple[int, int, int] = (255, 255, 255),
+        intensity: float = 1.0,
+    ) -> None:
+        self.direction: numpy.ndarray = numpy.array(direction, dtype=float)
+        self.color: numpy.ndarray = numpy.array(color, dtype=float) / 255
+        self.intensity: float = intensity
+
+    def key(self) -> tuple:
+        return ("directional", *self.direction, *self.color, self.intensity)
+
+    def diffuse(self, normals: numpy.ndarray, points: numpy.ndarray) -> numpy.ndarray:
+        to_light: numpy.ndarray = -self.direction / numpy.linalg.norm(self.direction)
+        return numpy.maximum(normals @ to_light, 0)
+
+
+class PointLight:
+    def __init__(
+        self,
+        pos: tuple[float, float, float],
+        color: tuple[int, int, int] = (255, 255, 255),
+        intensity: float = 1.0,
+        attenuation: float = 0.05,
+    ) -> None:
+        self.pos: numpy.ndarray = numpy.array(pos, dtype=float)
+        self.color: numpy.ndarray = numpy.array(color, dtype=float) / 255
+        self.intensity: float = intensity
+        self.attenuation: float = attenuation
+
+    def key(self) -> tuple:
+        return ("point", *self.pos, *self.color, self.intensity, self.attenuation)
+
+    def diffuse(self, normals: numpy.ndarray, points: numpy.ndarray) -> numpy.ndarray:
+        to_light: numpy.ndarray = self.pos - points
+        distance: numpy.ndarray = numpy.maximum(
+            numpy.linalg.norm(to_light, axis=-1), 1e-9
+        )
+        lambert: numpy.ndarray = numpy.maximum(
+            numpy.einsum("...i,...i->...", normals, to_light) / distance, 0
+        )
+        return lambert / (1 + self.attenuation * distance**2)
+
+
+class Lighting:
+    def __init__(self) -> None:
+        self.mode: str = "flat"
+        self.ambient: numpy.ndarray = numpy.array([0.2, 0.2, 0.2])
+        self.lights: list[DirectionalLight | PointLight] = [
+            DirectionalLight((-0.4, -1.0, 0.6))
+        ]
+
+    def set_mode(self, mode: str) -> None:
+        if mode not in ("flat", "lambert"):
+            raise ValueError(f"Unknown shading mode {mode}")
+        self.mode = mode
+
+    def key(self) -> tuple:
+        return (
+            self.mode,
+            *self.ambient,
+            *[light.key() for light in self.lights],
+        )
+
+    def shade(
+        self,
+        colors: numpy.ndarray,
+        normals: numpy.ndarray,
+        points: numpy.ndarray,
+        weights: numpy.ndarray | None = None,
+    ) -> numpy.ndarray:
+        light: numpy.ndarray = numpy.broadcast_to(self.ambient, points.shape).copy()
+        for source in self.lights:
+            light += (
+                source.diffuse(normals, points)[..., None]
+                * source.color
+                * source.intensity
+            )
+        if weights is not None:
+            light = numpy.einsum("...k,...ki->...i", weights, light)
+
+        return numpy.minimum(colors * light, 255).astype(numpy.uint8)
@@ -0,0 +1,71 @@
+import sys
+import types
+import tracemalloc
+import numpy
+import pygame
+from pathlib import Path
+from typing import Any
+
+SKIPPED_TYPES: tuple[type, ...] = (
+    type,
+    types.FunctionType,
+    types.MethodType,
+    types.BuiltinFunctionType,
+    types.ModuleType,
+    pygame.font.Font,
+)
+
+
+def deep_sizeof(obj: Any, seen: set[int] | None = None) -> int:
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, SKIPPED_TYPES):
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, numpy.ndarray):
+        return sys.getsizeof(obj) if obj.base is None else obj.nbytes
+    if isinstance(obj, pygame.Surface):
+        return sys.getsizeof(obj) + obj.get_width() * obj.get_height() * (
+            obj.get_bytesize()
+        )
+
+    size: int = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    else:
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def arrays_nbytes(*arrays: numpy.ndarray) -> int:
+    return sum(array.nbytes for array in arrays)
+
+
+def start_tracing(frames: int = 1) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def dump_snapshot(path: Path | str) -> tracemalloc.Snapshot:
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("Memory tracing is not enabled")
+    snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+    snapshot.dump(str(path))
+    return snapshot
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
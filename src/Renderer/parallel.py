@@ -0,0 +1,83 @@
+import os
+import time
+import numpy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+ChunkResult = tuple[numpy.ndarray, ...]
+
+
+class ChunkPool:
+    def __init__(
+        self,
+        workers: int | None = None,
+        min_chunk: int = 4096,
+        chunk_time: float = 0.002,
+        smoothing: float = 0.2,
+    ) -> None:
+        if workers is not None and workers < 1:
+            raise ValueError("Worker count cannot be less than 1")
+        if min_chunk < 1:
+            raise ValueError("Minimum chunk size cannot be less than 1")
+
+        self.workers: int = workers or os.cpu_count() or 1
+        self.min_chunk: int = min_chunk
+        self.chunk_time: float = chunk_time
+        self.smoothing: float = smoothing
+        self.item_times: dict[str, float] = {}
+        self.chunk_sizes: dict[str, int] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _chunk_size(self, key: str, count: int) -> int:
+        spread: int = -(-count // self.workers)
+        item_time: float | None = self.item_times.get(key)
+        if item_time is None:
+            return max(spread, self.min_chunk)
+        return max(min(int(self.chunk_time / item_time), spread), self.min_chunk)
+
+    def _record(self, key: str, count: int, elapsed: float, parallel: int) -> None:
+        item_time: float = elapsed * parallel / max(count, 1)
+        previous: float | None = self.item_times.get(key)
+        self.item_times[key] = (
+            item_time
+            if previous is None
+            else previous + (item_time - previous) * self.smoothing
+        )
+
+    def map(
+        self,
+        key: str,
+        func: Callable[..., ChunkResult],
+        *arrays: numpy.ndarray,
+    ) -> ChunkResult:
+        count: int = len(arrays[0])
+        chunk: int = self._chunk_size(key, count)
+        self.chunk_sizes[key] = chunk
+        start: float = time.perf_counter()
+        if self.workers == 1 or chunk >= count:
+            self.chunk_sizes[key] = count
+            result: ChunkResult = func(*arrays)
+            self._record(key, count, time.perf_counter() - start, 1)
+            return result
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, "ChunkPool")
+        bounds: range = range(0, count, chunk)
+        results: list[ChunkResult] = list(
+            self._executor.map(
+                lambda low: func(*[array[low : low + chunk] for array in arrays]),
+                bounds,
+            )
+        )
+        self._record(
+            key,
+            count,
+            time.perf_counter() - start,
+            min(self.workers, len(bounds)),
+        )
+        return tuple(numpy.concatenate(parts) for parts in zip(*results))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
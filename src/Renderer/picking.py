@@ -0,0 +1,178 @@
+import numpy
+
+
+class BoundsIndex:
+    def __init__(self, leaf_size: int = 64) -> None:
+        self.leaf_size: int = leaf_size
+        self.order: numpy.ndarray = numpy.zeros(0, dtype=numpy.intp)
+        self.handles: numpy.ndarray = numpy.zeros(0, dtype=numpy.intp)
+        self.slots: numpy.ndarray = numpy.zeros(0, dtype=numpy.intp)
+        self.mins: numpy.ndarray = numpy.zeros((0, 0))
+        self.maxs: numpy.ndarray = numpy.zeros((0, 0))
+        self.leaf_starts: numpy.ndarray = numpy.zeros(0, dtype=numpy.intp)
+        self.leaf_mins: numpy.ndarray = numpy.zeros((0, 0))
+        self.leaf_maxs: numpy.ndarray = numpy.zeros((0, 0))
+
+    @staticmethod
+    def _morton(centers: numpy.ndarray) -> numpy.ndarray:
+        low: numpy.ndarray = centers.min(axis=0)
+        span: numpy.ndarray = numpy.maximum(centers.max(axis=0) - low, 1e-9)
+        cells: numpy.ndarray = ((centers - low) / span * 1023).astype(numpy.int64)
+
+        codes: numpy.ndarray = numpy.zeros(len(centers), dtype=numpy.int64)
+        dims: int = centers.shape[1]
+        for bit in range(10):
+            for axis in range(dims):
+                codes |= ((cells[:, axis] >> bit) & 1) << (bit * dims + axis)
+        return codes
+
+    def build(
+        self, handles: numpy.ndarray, mins: numpy.ndarray, maxs: numpy.ndarray
+    ) -> None:
+        if len(handles) == 0:
+            self.order = numpy.zeros(0, dtype=numpy.intp)
+            self.handles = numpy.zeros(0, dtype=numpy.intp)
+            self.slots = numpy.zeros(0, dtype=numpy.intp)
+            return
+
+        self.order = numpy.argsort(self._morton((mins + maxs) / 2), kind="stable")
+        self.handles = handles[self.order]
+        self.slots = numpy.full(handles.max() + 1, -1, dtype=numpy.intp)
+        self.slots[self.handles] = numpy.arange(len(handles))
+        self.leaf_starts = numpy.arange(0, len(handles), self.leaf_size)
+        self.refit(mins, maxs)
+
+    def refit(self, mins: numpy.ndarray, maxs: numpy.ndarray) -> None:
+        if len(self.order) == 0:
+            return
+
+        self.mins = mins[self.order]
+        self.maxs = maxs[self.order]
+        self.leaf_mins = numpy.minimum.reduceat(self.mins, self.leaf_starts, axis=0)
+        self.leaf_maxs = numpy.maximum.reduceat(self.maxs, self.leaf_starts, axis=0)
+
+    def update(
+        self, handles: numpy.ndarray, mins: numpy.ndarray, maxs: numpy.ndarray
+    ) -> None:
+        inside: numpy.ndarray = handles < len(self.slots)
+        slots: numpy.ndarray = self.slots[handles[inside]]
+        indexed: numpy.ndarray = slots >= 0
+        slots = slots[indexed]
+        if len(slots) == 0:
+            return
+
+        self.mins[slots] = mins[inside][indexed]
+        self.maxs[slots] = maxs[inside][indexed]
+        leaves: numpy.ndarray = numpy.unique(slots // self.leaf_size)
+        if len(leaves) > len(self.leaf_starts) // 8:
+            self.leaf_mins = numpy.minimum.reduceat(self.mins, self.leaf_starts, axis=0)
+            self.leaf_maxs = numpy.maximum.reduceat(self.maxs, self.leaf_starts, axis=0)
+            return
+        for leaf in leaves.tolist():
+            start: int = leaf * self.leaf_size
+            end: int = start + self.leaf_size
+            self.leaf_mins[leaf] = self.mins[start:end].min(axis=0)
+            self.leaf_maxs[leaf] = self.maxs[start:end].max(axis=0)
+
+    @staticmethod
+    def _slabs(
+        origin: numpy.ndarray,
+        inv_direction: numpy.ndarray,
+        mins: numpy.ndarray,
+        maxs: numpy.ndarray,
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        t1: numpy.ndarray = (mins - origin) * inv_direction
+        t2: numpy.ndarray = (maxs - origin) * inv_direction
+        return (
+            numpy.minimum(t1, t2).max(axis=1),
+            numpy.maximum(t1, t2).min(axis=1),
+        )
+
+    def ray(
+        self,
+        origin: numpy.ndarray,
+        direction: numpy.ndarray,
+        max_t: float,
+        exclude: int | None = None,
+    ) -> tuple[int, float] | None:
+        if len(self.handles) == 0:
+            return None
+
+        direction = numpy.where(direction == 0, 1e-12, direction)
+        inv_direction: numpy.ndarray = 1 / direction
+
+        near, far = self._slabs(origin, inv_direction, self.leaf_mins, self.leaf_maxs)
+        near = numpy.maximum(near, 0)
+        hit: numpy.ndarray = numpy.flatnonzero((near <= far) & (near <= max_t))
+
+        best: tuple[int, float] | None = None
+        best_t: float = max_t
+        for leaf in hit[numpy.argsort(near[hit])].tolist():
+            if near[leaf] > best_t:
+                break
+
+            start: int = self.leaf_starts[leaf]
+            end: int = start + self.leaf_size
+            obj_near, obj_far = self._slabs(
+                origin, inv_direction, self.mins[start:end], self.maxs[start:end]
+            )
+            obj_near = numpy.maximum(obj_near, 0)
+            obj_near[obj_near > obj_far] = numpy.inf
+            obj_near[self.handles[start:end] == exclude] = numpy.inf
+
+            nearest: int = int(numpy.argmin(obj_near))
+            if obj_near[nearest] <= best_t:
+                best_t = float(obj_near[nearest])
+                best = (int(self.handles[start + nearest]), best_t)
+
+        return best
+
+    def point(self, pos: numpy.ndarray, exclude: int | None = None) -> int | None:
+        if len(self.handles) == 0:
+            return None
+
+        leaves: numpy.ndarray = numpy.flatnonzero(
+            numpy.all((self.leaf_mins <= pos) & (pos <= self.leaf_maxs), axis=1)
+        )
+
+        best: int | None = None
+        best_area: float = numpy.inf
+        for leaf in leaves.tolist():
+            start: int = self.leaf_starts[leaf]
+            end: int = start + self.leaf_size
+            mins: numpy.ndarray = self.mins[start:end]
+            maxs: numpy.ndarray = self.maxs[start:end]
+
+            inside: numpy.ndarray = numpy.flatnonzero(
+                numpy.all((mins <= pos) & (pos <= maxs), axis=1)
+                & (self.handles[start:end] != exclude)
+            )
+            if len(inside) == 0:
+                continue
+
+            areas: numpy.ndarray = numpy.prod(maxs[inside] - mins[inside], axis=1)
+            smallest: int = int(numpy.argmin(areas))
+            if areas[smallest] < best_area:
+                best_area = float(areas[smallest])
+                best = int(self.handles[start + inside[smallest]])
+
+        return best
+
+    def overlapping(self, mins: numpy.ndarray, maxs: numpy.ndarray) -> numpy.ndarray:
+        if len(self.handles) == 0:
+            return numpy.zeros(0, dtype=numpy.intp)
+
+        leaves: numpy.ndarray = numpy.flatnonzero(
+            numpy.all((self.leaf_mins <= maxs) & (mins <= self.leaf_maxs), axis=1)
+        )
+
+        found: list[numpy.ndarray] = []
+        for leaf in leaves.tolist():
+            start: int = self.leaf_starts[leaf]
+            end: int = start + self.leaf_size
+            inside: numpy.ndarray = numpy.all(
+                (self.mins[start:end] <= maxs) & (mins <= self.maxs[start:end]), axis=1
+            )
+            found.append(self.handles[start:end][inside])
+
+        return numpy.sort(numpy.concatenate(found or [numpy.zeros(0, numpy.intp)]))
@@ -0,0 +1,49 @@
+import numpy
+
+CLOUD_CHUNK: int = 1 << 18
+
+
+class PointCloud:
+    def __init__(
+        self,
+        points: numpy.ndarray,
+        colors: numpy.ndarray | None = None,
+        color: tuple[int, int, int] = (255, 255, 255),
+    ) -> None:
+        points = numpy.asarray(points)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError("Points must have the shape (n, 3)")
+        self.components: numpy.ndarray = numpy.ascontiguousarray(
+            points.T, dtype=numpy.float32
+        )
+
+        if colors is None:
+            self.colors: numpy.ndarray = numpy.array([color], dtype=numpy.uint8)
+        else:
+            self.colors = numpy.ascontiguousarray(colors, dtype=numpy.uint8)
+            if self.colors.shape != (len(points), 3):
+                raise ValueError("Colors must have the shape (n, 3)")
+
+    def __len__(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def points(self) -> numpy.ndarray:
+        return self.components.T
+
+    @property
+    def per_point_colors(self) -> bool:
+        return len(self.colors) == len(self) and len(self) > 1
+
+    def chunks(self) -> list[tuple[numpy.ndarray, numpy.ndarray]]:
+        return [
+            (
+                self.components[:, start : start + CLOUD_CHUNK],
+                (
+                    self.colors[start : start + CLOUD_CHUNK]
+                    if self.per_point_colors
+                    else self.colors
+                ),
+            )
+            for start in range(0, len(self), CLOUD_CHUNK)
+        ]
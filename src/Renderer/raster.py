@@ -0,0 +1,207 @@
+import numpy
+
+SUBPIXEL_BITS: int = 4
+MAX_COORD: float = 2.0**24
+CHUNK_PIXELS: int = 1 << 21
+
+
+def clip_lines(
+    starts: numpy.ndarray, ends: numpy.ndarray, width: int, height: int
+) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    x0, y0 = starts[:, 0], starts[:, 1]
+    dx: numpy.ndarray = ends[:, 0] - x0
+    dy: numpy.ndarray = ends[:, 1] - y0
+
+    keep: numpy.ndarray = numpy.ones(len(starts), dtype=bool)
+    t0: numpy.ndarray = numpy.zeros(len(starts))
+    t1: numpy.ndarray = numpy.ones(len(starts))
+    for p, q in ((-dx, x0), (dx, (width - 1) - x0), (-dy, y0), (dy, (height - 1) - y0)):
+        parallel: numpy.ndarray = p == 0
+        keep &= ~(parallel & (q < 0))
+        r: numpy.ndarray = q / numpy.where(parallel, 1.0, p)
+        t0 = numpy.where((p < 0) & (r > t0), r, t0)
+        t1 = numpy.where((p > 0) & (r < t1), r, t1)
+    keep &= t0 <= t1
+
+    limits: numpy.ndarray = numpy.array([width - 1, height - 1], dtype=float)
+    delta: numpy.ndarray = numpy.stack((dx, dy), axis=1)
+    return (
+        numpy.minimum(numpy.maximum(starts + t0[:, None] * delta, 0.0), limits),
+        numpy.minimum(numpy.maximum(starts + t1[:, None] * delta, 0.0), limits),
+        keep,
+    )
+
+
+def _line_pixels(
+    starts: numpy.ndarray, ends: numpy.ndarray
+) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    x0: numpy.ndarray = numpy.floor(starts[:, 0]).astype(numpy.int64)
+    y0: numpy.ndarray = numpy.floor(starts[:, 1]).astype(numpy.int64)
+    dx: numpy.ndarray = numpy.floor(ends[:, 0]).astype(numpy.int64) - x0
+    dy: numpy.ndarray = numpy.floor(ends[:, 1]).astype(numpy.int64) - y0
+    steps: numpy.ndarray = numpy.maximum(numpy.abs(dx), numpy.abs(dy))
+
+    counts: numpy.ndarray = steps + 1
+    ids: numpy.ndarray = numpy.repeat(numpy.arange(len(starts)), counts)
+    step: numpy.ndarray = numpy.arange(len(ids)) - numpy.repeat(
+        numpy.cumsum(counts) - counts, counts
+    )
+    divisor: numpy.ndarray = numpy.maximum(2 * steps, 1)[ids]
+    return (
+        x0[ids] + (2 * dx[ids] * step + steps[ids]) // divisor,
+        y0[ids] + (2 * dy[ids] * step + steps[ids]) // divisor,
+        ids,
+    )
+
+
+def _triangle_pixels(
+    triangles: numpy.ndarray, width: int, height: int
+) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    valid: numpy.ndarray = (numpy.abs(triangles) <= MAX_COORD).all(axis=(1, 2))
+    fixed: numpy.ndarray = numpy.floor(
+        numpy.where(valid[:, None, None], triangles, 0.0) * (1 << SUBPIXEL_BITS)
+    ).astype(numpy.int64)
+    x0, y0 = fixed[:, 0, 0], fixed[:, 0, 1]
+    x1, y1 = fixed[:, 1, 0], fixed[:, 1, 1]
+    x2, y2 = fixed[:, 2, 0], fixed[:, 2, 1]
+    area: numpy.ndarray = (x1 - x0) * (y2 - y0) - (y1 - y0) * (x2 - x0)
+
+    min_x: numpy.ndarray = numpy.maximum(fixed[..., 0].min(axis=1) >> SUBPIXEL_BITS, 0)
+    max_x: numpy.ndarray = numpy.minimum(
+        fixed[..., 0].max(axis=1) >> SUBPIXEL_BITS, width - 1
+    )
+    min_y: numpy.ndarray = numpy.maximum(fixed[..., 1].min(axis=1) >> SUBPIXEL_BITS, 0)
+    max_y: numpy.ndarray = numpy.minimum(
+        fixed[..., 1].max(axis=1) >> SUBPIXEL_BITS, height - 1
+    )
+    box_width: numpy.ndarray = max_x - min_x + 1
+    counts: numpy.ndarray = box_width * (max_y - min_y + 1)
+    counts[~valid | (area == 0) | (max_x < min_x) | (max_y < min_y)] = 0
+
+    ids: numpy.ndarray = numpy.repeat(numpy.arange(len(triangles)), counts)
+    cell: numpy.ndarray = numpy.arange(len(ids)) - numpy.repeat(
+        numpy.cumsum(counts) - counts, counts
+    )
+    x: numpy.ndarray = min_x[ids] + cell % box_width[ids]
+    y: numpy.ndarray = min_y[ids] + cell // box_width[ids]
+
+    half: int = 1 << (SUBPIXEL_BITS - 1)
+    px: numpy.ndarray = (x << SUBPIXEL_BITS) + half
+    py: numpy.ndarray = (y << SUBPIXEL_BITS) + half
+    x0, y0, x1, y1, x2, y2 = x0[ids], y0[ids], x1[ids], y1[ids], x2[ids], y2[ids]
+    e0: numpy.ndarray = (x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)
+    e1: numpy.ndarray = (x0 - x2) * (py - y2) - (y0 - y2) * (px - x2)
+    e2: numpy.ndarray = (x1 - x0) * (py - y0) - (y1 - y0) * (px - x0)
+    inside: numpy.ndarray = numpy.where(
+        area[ids] > 0,
+        (e0 >= 0) & (e1 >= 0) & (e2 >= 0),
+        (e0 <= 0) & (e1 <= 0) & (e2 <= 0),
+    )
+    return x[inside], y[inside], ids[inside]
+
+
+def _write_last(
+    framebuffer: numpy.ndarray,
+    x: numpy.ndarray,
+    y: numpy.ndarray,
+    keys: numpy.ndarray,
+    colors: numpy.ndarray,
+) -> None:
+    if len(x) == 0:
+        return
+    flat: numpy.ndarray = x * framebuffer.shape[1] + y
+    order: numpy.ndarray = numpy.lexsort((keys, flat))
+    last: numpy.ndarray = order[numpy.append(flat[order][1:] != flat[order][:-1], True)]
+    framebuffer[x[last], y[last]] = colors[last]
+
+
+def draw_lines(
+    framebuffer: numpy.ndarray,
+    starts: numpy.ndarray,
+    ends: numpy.ndarray,
+    colors: numpy.ndarray,
+) -> None:
+    starts, ends, keep = clip_lines(
+        starts, ends, framebuffer.shape[0], framebuffer.shape[1]
+    )
+    lines: numpy.ndarray = numpy.flatnonzero(keep)
+    x, y, ids = _line_pixels(starts[lines], ends[lines])
+    _write_last(framebuffer, x, y, ids, colors[lines[ids]])
+
+
+def fill_polygons(
+    framebuffer: numpy.ndarray,
+    polygons: numpy.ndarray,
+    colors: numpy.ndarray,
+    outlines: numpy.ndarray,
+    outlined: numpy.ndarray,
+) -> None:
+    width, height = framebuffer.shape[:2]
+    count, size = polygons.shape[:2]
+    if count == 0 or size < 3:
+        return
+
+    low: numpy.ndarray = numpy.clip(polygons.min(axis=1), 0, (width, height))
+    high: numpy.ndarray = numpy.clip(polygons.max(axis=1), 0, (width, height))
+    cost: numpy.ndarray = numpy.cumsum((numpy.prod(high - low + 1, axis=1) + 1) * size)
+    bounds: numpy.ndarray = numpy.searchsorted(
+        cost, numpy.arange(CHUNK_PIXELS, cost[-1], CHUNK_PIXELS), side="right"
+    )
+
+    fan: numpy.ndarray = numpy.arange(1, size - 1)
+    for start, end in zip([0, *bounds.tolist()], [*bounds.tolist(), count]):
+        if start >= end:
+            continue
+        chunk: numpy.ndarray = polygons[start:end]
+        triangles: numpy.ndarray = numpy.stack(
+            (
+                numpy.repeat(chunk[:, :1], size - 2, axis=1),
+                chunk[:, fan],
+                chunk[:, fan + 1],
+            ),
+            axis=2,
+        ).reshape(-1, 3, 2)
+        fill_x, fill_y, fill_ids = _triangle_pixels(triangles, width, height)
+        fill_ids //= size - 2
+
+        edge_polygons: numpy.ndarray = numpy.flatnonzero(outlined[start:end])
+        edge_starts: numpy.ndarray = chunk[edge_polygons].reshape(-1, 2)
+        edge_ends: numpy.ndarray = numpy.roll(chunk[edge_polygons], -1, axis=1)
+        edge_starts, edge_ends, keep = clip_lines(
+            edge_starts, edge_ends.reshape(-1, 2), width, height
+        )
+        edges: numpy.ndarray = numpy.flatnonzero(keep)
+        line_x, line_y, line_ids = _line_pixels(edge_starts[edges], edge_ends[edges])
+        line_ids = edge_polygons[edges[line_ids] // size]
+
+        _write_last(
+            framebuffer,
+            numpy.concatenate((fill_x, line_x)),
+            numpy.concatenate((fill_y, line_y)),
+            numpy.concatenate((fill_ids * 2, line_ids * 2 + 1)),
+            numpy.concatenate(
+                (colors[start:end][fill_ids], outlines[start:end][line_ids])
+            ),
+        )
+
+
+def splat_points(
+    framebuffer: numpy.ndarray,
+    zbuffer: numpy.ndarray,
+    pixels: numpy.ndarray,
+    depths: numpy.ndarray,
+    colors: numpy.ndarray,
+) -> None:
+    points: numpy.ndarray = numpy.flatnonzero(pixels >= 0)
+    if len(points) == 0:
+        return
+    pixels, depths = pixels[points], depths[points]
+    previous: numpy.ndarray = zbuffer[pixels]
+    numpy.minimum.at(zbuffer, pixels, depths)
+    nearest: numpy.ndarray = numpy.flatnonzero(
+        (depths == zbuffer[pixels]) & (depths < previous)
+    )
+    written, first = numpy.unique(pixels[nearest], return_index=True)
+    framebuffer[written] = (
+        colors[points[nearest[first]]] if len(colors) > 1 else colors[0]
+    )
@@ -0,0 +1,323 @@
+import json
+import zlib
+import time
+import queue
+import struct
+import threading
+import numpy
+import pygame
+from pathlib import Path
+from typing import BinaryIO
+
+RECORD_FORMATS: tuple[str, ...] = ("raw", "png", "avi")
+DROP_POLICIES: tuple[str, ...] = ("newest", "oldest", "block")
+
+
+class AviWriter:
+    def __init__(self, path: Path, size: tuple[int, int], fps: int) -> None:
+        self.size: tuple[int, int] = size
+        self.fps: int = fps
+        self.row_size: int = (size[0] * 3 + 3) & ~3
+        self.frame_size: int = self.row_size * size[1]
+        self.frames: int = 0
+        self._index: list[tuple[int, int]] = []
+
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(self._header())
+        self._movi_start: int = self._file.tell() - 4
+
+    def _header(self) -> bytes:
+        width, height = self.size
+        avih: bytes = struct.pack(
+            "<10I4I",
+            1_000_000 // self.fps,
+            self.frame_size * self.fps,
+            0,
+            0x10,
+            self.frames,
+            0,
+            1,
+            self.frame_size,
+            width,
+            height,
+            0,
+            0,
+            0,
+            0,
+        )
+        strh: bytes = struct.pack(
+            "<4s4sIHHIIIIIIIIhhhh",
+            b"vids",
+            b"DIB ",
+            0,
+            0,
+            0,
+            0,
+            1,
+            self.fps,
+            0,
+            self.frames,
+            self.frame_size,
+            0xFFFFFFFF,
+            0,
+            0,
+            0,
+            width,
+            height,
+        )
+        strf: bytes = struct.pack(
+            "<IiiHHIIiiII", 40, width, height, 1, 24, 0, self.frame_size, 0, 0, 0, 0
+        )
+        strl: bytes = b"strl" + self._chunk(b"strh", strh) + self._chunk(b"strf", strf)
+        hdrl: bytes = b"hdrl" + self._chunk(b"avih", avih) + self._chunk(b"LIST", strl)
+        return (
+            b"RIFF"
+            + struct.pack("<I", 0)
+            + b"AVI "
+            + self._chunk(b"LIST", hdrl)
+            + b"LIST"
+            + struct.pack("<I", 0)
+            + b"movi"
+        )
+
+    @staticmethod
+    def _chunk(tag: bytes, data: bytes) -> bytes:
+        return tag + struct.pack("<I", len(data)) + data + bytes(len(data) % 2)
+
+    def write(self, rgb: numpy.ndarray) -> None:
+        rows: numpy.ndarray = numpy.zeros(
+            (self.size[1], self.row_size), dtype=numpy.uint8
+        )
+        rows[:, : self.size[0] * 3] = rgb[::-1, :, ::-1].reshape(self.size[1], -1)
+        self._index.append((self._file.tell() - self._movi_start, self.frame_size))
+        self._file.write(self._chunk(b"00db", rows.tobytes()))
+        self.frames += 1
+
+    def close(self) -> None:
+        movi_end: int = self._file.tell()
+        index: bytes = b"".join(
+            b"00db" + struct.pack("<III", 0x10, offset, size)
+            for offset, size in self._index
+        )
+        self._file.write(self._chunk(b"idx1", index))
+        riff_end: int = self._file.tell()
+
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.seek(4)
+        self._file.write(struct.pack("<I", riff_end - 8))
+        self._file.seek(self._movi_start - 4)
+        self._file.write(struct.pack("<I", movi_end - self._movi_start))
+        self._file.close()
+
+
+def write_png(path: Path, rgb: numpy.ndarray, level: int = 1) -> None:
+    height, width = rgb.shape[:2]
+    rows: numpy.ndarray = numpy.zeros((height, width * 3 + 1), dtype=numpy.uint8)
+    rows[:, 1:] = rgb.reshape(height, -1)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + tag
+            + data
+            + struct.pack(">I", zlib.crc32(tag + data))
+        )
+
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(
+            chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        )
+        file.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), level)))
+        file.write(chunk(b"IEND", b""))
+
+
+class FrameRecorder:
+    def __init__(
+        self,
+        path: Path | str,
+        surface: pygame.Surface,
+        format: str = "png",
+        queue_size: int = 16,
+        drop: str = "newest",
+        fps: int = 60,
+        timeout: float = 10.0,
+    ) -> None:
+        if format not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format {format}")
+        if drop not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop}")
+        if queue_size < 1:
+            raise ValueError("Queue size cannot be less than 1")
+        if fps < 1:
+            raise ValueError("FPS cannot be less than 1")
+
+        self.path: Path = Path(path)
+        self.format: str = format
+        self.drop: str = drop
+        self.fps: int = fps
+        self.timeout: float = timeout
+        self.size: tuple[int, int] = surface.get_size()
+        self._pitch: int = surface.get_pitch()
+        self._bytesize: int = surface.get_bytesize()
+        self._masks: tuple[int, ...] = surface.get_masks()[:3]
+        self._shifts: tuple[int, ...] = surface.get_shifts()[:3]
+        self._losses: tuple[int, ...] = surface.get_losses()[:3]
+        self._palette: numpy.ndarray | None = (
+            numpy.array(surface.get_palette(), dtype=numpy.uint8)[:, :3]
+            if self._bytesize == 1
+            else None
+        )
+
+        self.captured: int = 0
+        self.written: int = 0
+        self.dropped: int = 0
+        self.capture_time: float = 0.0
+        self.error: Exception | None = None
+
+        self._queue: queue.Queue[tuple[int, bytes] | None] = queue.Queue(queue_size)
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name="FrameRecorder", daemon=True
+        )
+        self._thread.start()
+
+    def _check(self) -> None:
+        if self.error is not None:
+            raise RuntimeError(f"Recording to {self.path} failed") from self.error
+
+    def _put(self, item: tuple[int, bytes] | None) -> None:
+        deadline: float = time.perf_counter() + self.timeout
+        while True:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                self._check()
+                if not self._thread.is_alive():
+                    raise RuntimeError("Recording writer stopped")
+                if time.perf_counter() > deadline:
+                    raise TimeoutError("Recording writer is not draining frames")
+
+    def capture(self, surface: pygame.Surface) -> bool:
+        self._check()
+        start: float = time.perf_counter()
+        if surface.get_size() != self.size:
+            self.dropped += 1
+            return False
+
+        frame: tuple[int, bytes] = (self.captured, surface.get_buffer().raw)
+        self.captured += 1
+        queued: bool = True
+        if self.drop == "block":
+            self._put(frame)
+        else:
+            try:
+                self._queue.put_nowait(frame)
+            except queue.Full:
+                if self.drop == "oldest":
+                    try:
+                        self._queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                    self._queue.put_nowait(frame)
+                else:
+                    queued = False
+                self.dropped += 1
+
+        self.capture_time += time.perf_counter() - start
+        return queued
+
+    def _to_rgb(self, raw: bytes) -> numpy.ndarray:
+        width, height = self.size
+        rows: numpy.ndarray = numpy.frombuffer(raw, dtype=numpy.uint8).reshape(
+            height, self._pitch
+        )[:, : width * self._bytesize]
+        if self._palette is not None:
+            return self._palette[rows]
+
+        if self._bytesize == 3:
+            bytes_: numpy.ndarray = rows.reshape(height, width, 3).astype(numpy.uint32)
+            pixels: numpy.ndarray = (
+                bytes_[..., 0] | bytes_[..., 1] << 8 | bytes_[..., 2] << 16
+            )
+        else:
+            pixels = numpy.ascontiguousarray(rows).view(
+                "<u2" if self._bytesize == 2 else "<u4"
+            )
+        return numpy.stack(
+            [
+                ((pixels & mask) >> shift) << loss
+                for mask, shift, loss in zip(self._masks, self._shifts, self._losses)
+            ],
+            axis=-1,
+        ).astype(numpy.uint8)
+
+    def _run(self) -> None:
+        avi: AviWriter | None = None
+        raw: BinaryIO | None = None
+        try:
+            if self.format == "avi":
+                avi = AviWriter(self.path, self.size, self.fps)
+            elif self.format == "raw":
+                raw = open(self.path, "wb")
+            else:
+                self.path.mkdir(parents=True, exist_ok=True)
+
+            while True:
+                frame: tuple[int, bytes] | None = self._queue.get()
+                if frame is None:
+                    break
+
+                idx, data = frame
+                rgb: numpy.ndarray = self._to_rgb(data)
+                if avi is not None:
+                    avi.write(rgb)
+                elif raw is not None:
+                    raw.write(rgb.tobytes())
+                else:
+                    write_png(self.path / f"frame_{idx:06d}.png", rgb)
+                self.written += 1
+
+            if avi is not None:
+                avi.close()
+            if raw is not None:
+                raw.close()
+                with open(self.path.with_suffix(".json"), "w") as file:
+                    json.dump(
+                        {
+                            "width": self.size[0],
+                            "height": self.size[1],
+                            "fps": self.fps,
+                            "format": "rgb24",
+                            "frames": self.written,
+                        },
+                        file,
+                    )
+        except Exception as error:
+            self.error = error
+            if avi is not None:
+                avi._file.close()
+            if raw is not None:
+                raw.close()
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    def stop(self) -> None:
+        if self._thread.is_alive():
+            self._put(None)
+            self._thread.join(self.timeout)
+            if self._thread.is_alive():
+                raise TimeoutError("Recording writer did not finish")
+        self._check()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "captured": self.captured,
+            "written": self.written,
+            "dropped": self.dropped,
+            "capture_ms": self.capture_time / max(self.captured, 1) * 1000,
+        }
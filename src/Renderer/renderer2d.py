@@ -1,7 +1,11 @@
-import os
-import json
+from contextlib import contextmanager
+from typing import Any, Iterator
 from Renderer.base_renderer import pygame, numpy, SetupOptions, RendererBase
-from typing import Callable
+from Renderer.scene import ObjectStore
+from Renderer.textures import Texture, TextureCache
+from Renderer.memory import deep_sizeof
+from Renderer.world import WorldChunk, WorldStreamer
+from pathlib import Path
 
 
 class Camera2D:
@@ -12,37 +16,46 @@ class Camera2D:
 
 
 class Object2D:
-    def __init__(self) -> None:
-        self.name: str = ""
-        self.pos: numpy.ndarray = numpy.array([0.0, 0.0])
-        self.vertices: list[numpy.ndarray] = []
-        self.edges: list[numpy.ndarray] = []
-        self.colors: dict[str, pygame.Color] = {}
-        self.items: list[dict] = []
-        self.bounds: numpy.ndarray = numpy.array([0.0, 0.0, 0.0, 0.0], dtype=float)
+    __slots__ = ("_store", "_idx", "_template")
 
-    def calc_bounds(self, project_point: Callable) -> None:
-        min_point = numpy.array([numpy.inf, numpy.inf], dtype=float)
-        max_point = numpy.array([-numpy.inf, -numpy.inf], dtype=float)
+    def __init__(
+        self, store: ObjectStore, idx: int, template: "Object2DTemplate"
+    ) -> None:
+        self._store: ObjectStore = store
+        self._idx: int = idx
+        self._template: Object2DTemplate = template
 
-        for vertice in self.vertices:
-            min_point[0] = min(min_point[0], vertice[0])
-            min_point[1] = min(min_point[1], vertice[1])
-            max_point[0] = max(max_point[0], vertice[0])
-            max_point[1] = max(max_point[1], vertice[1])
+    @property
+    def name(self) -> str:
+        return self._template.name
 
-        min_point += self.pos
-        max_point += self.pos
+    @property
+    def pos(self) -> numpy.ndarray:
+        pos: numpy.ndarray = self._store.positions[self._idx]
+        pos.flags.writeable = False
+        return pos
 
-        self.bounds = numpy.array(
-            [
-                (min_point[0]),
-                (min_point[1]),
-                (max_point[0] - min_point[0]),
-                (max_point[1] - min_point[1]),
-            ],
-            dtype=float,
-        )
+    @property
+    def vertices(self) -> list[numpy.ndarray]:
+        return self._template.vertices
+
+    @property
+    def edges(self) -> list[numpy.ndarray]:
+        return self._template.edges
+
+    @property
+    def colors(self) -> dict[str, pygame.Color]:
+        return self._template.colors
+
+    @property
+    def items(self) -> list[dict]:
+        return self._template.items
+
+    @property
+    def bounds(self) -> numpy.ndarray:
+        bounds: numpy.ndarray = self._template.bounds.copy()
+        bounds[:2] += self.pos
+        return bounds
 
 
 class Object2DTemplate:
@@ -64,23 +77,47 @@ class Object2DTemplate:
         for item in obj_params["render"]:
             self.items.append(item)
 
-    def create_obj(self, pos: numpy.ndarray) -> Object2D:
-        obj = Object2D()
-        obj.name = self.name
-        obj.pos = pos
-        obj.vertices = self.vertices
-        obj.edges = self.edges
-        obj.colors = self.colors
-        obj.items = self.items
-        return obj
+        self.textures: list[str] = [
+            item["texture"] for item in self.items if item["type"] == "texture"
+        ]
+
+        corners: list[numpy.ndarray] = list(self.vertices)
+        for item in self.items:
+            if item["type"] == "texture":
+                x, y, width, height = item["rect"]
+                corners += [numpy.array([x, y]), numpy.array([x + width, y + height])]
+
+        min_point: numpy.ndarray = numpy.min(corners, axis=0)
+        max_point: numpy.ndarray = numpy.max(corners, axis=0)
+        self.bounds: numpy.ndarray = numpy.array(
+            [*min_point, *(max_point - min_point)], dtype=float
+        )
+
+    def create_obj(self, store: ObjectStore, idx: int) -> Object2D:
+        return Object2D(store, idx, self)
 
 
 class Renderer2D(RendererBase):
     def __init__(self, options: SetupOptions) -> None:
         super().__init__(options)
         self._camera: Camera2D = Camera2D()
+        self._middle_clicked: bool = False
         self._object_templates: dict[str, Object2DTemplate] = {}
-        self._objects: list[Object2D] = []
+        self._objects_path: str = "src/Renderer/data/objects2d"
+        self._textures_path: str = "src/Renderer/data/textures"
+        self.textures: TextureCache = TextureCache()
+
+        self._canvas: pygame.Surface = self._window
+        self._scroll_reuse: bool = True
+        self._layer: pygame.Surface | None = None
+        self._layer_state: tuple | None = None
+        self._layer_offset: tuple[int, int] = (0, 0)
+        self._dirty_bounds: list[numpy.ndarray] = []
+        self._objects: ObjectStore = ObjectStore(2)
+
+        self._world: WorldStreamer | None = None
+        self._world_templates: list[Object2DTemplate] = []
+        self._world_margin: float = 0.0
 
         self._screen_bounds: numpy.ndarray = numpy.array(
             [
@@ -101,6 +138,30 @@ class Renderer2D(RendererBase):
         self._screen_bounds[2] = width
         self._screen_bounds[3] = height
 
+    @contextmanager
+    def _use_render_scale(self, scale: float) -> Iterator[float]:
+        with super()._use_render_scale(scale) as factor:
+            state: tuple = (self._camera.scale, self._screen_bounds.copy())
+            self._camera.scale *= factor
+            self._screen_bounds[2:] = (self._win_width, self._win_height)
+            try:
+                yield factor
+            finally:
+                self._camera.scale, self._screen_bounds = state
+
+    def _capture_state(self) -> dict[str, Any]:
+        return super()._capture_state() | {
+            "camera": [*self._camera.pos.tolist(), self._camera.scale],
+            "middle_clicked": self._middle_clicked,
+        }
+
+    def _restore_state(self, state: dict[str, Any]) -> None:
+        super()._restore_state(state)
+        *pos, self._camera.scale = state["camera"]
+        self._camera.pos = numpy.array(pos, dtype=float)
+        self._middle_clicked = state["middle_clicked"]
+        self._layer = None
+
     def mouse_pressed(self, pos: tuple[int, int], button: int) -> None:
         if button == pygame.BUTTON_LEFT:
             self.create_object("square", self._camera.pos - (0.5, 0.5))
@@ -120,46 +181,179 @@ class Renderer2D(RendererBase):
         self._camera.scale += scale
         self._camera.scale = max(self._camera.scale, 1)
 
-    def _load_obj_templates(self) -> None:
-        objects_path: str = "src/Renderer/data/objects2d"
+    def _build_obj_template(self, obj: dict) -> Object2DTemplate:
+        return Object2DTemplate(obj)
 
-        for filename in os.listdir(objects_path):
-            if filename.endswith(".obj"):
-                with open(f"{objects_path}/{filename}", "r") as file:
-                    obj: dict = json.load(file)
-
-                    self._object_templates[obj["name"]] = Object2DTemplate(obj)
+    def _set_obj_template(self, template: Object2DTemplate) -> None:
+        for name in template.textures:
+            if name not in self.textures.textures:
+                self.textures.add(
+                    name, Texture.load(Path(self._textures_path) / f"{name}.png")
+                )
+        super()._set_obj_template(template)
 
     def create_object(
         self, obj_name: str, pos: tuple[float, float] | numpy.ndarray
-    ) -> None:
-        obj = self._object_templates[obj_name].create_obj(numpy.array(pos, dtype=float))
-        obj.calc_bounds(self._project_point)
-        self._objects.append(obj)
+    ) -> int:
+        self._get_template(obj_name)
+        idx: int = self._objects.add(obj_name, numpy.array(pos, dtype=float))
+        self._dirty_bounds.append(self._world_bounds(idx))
+        return idx
+
+    def move_object(self, idx: int, pos: tuple[float, float] | numpy.ndarray) -> None:
+        self._dirty_bounds.append(self._world_bounds(idx))
+        self._objects.move(idx, pos)
+        self._dirty_bounds.append(self._world_bounds(idx))
+
+    def _world_bounds(self, idx: int) -> numpy.ndarray:
+        return self.get_object(idx).bounds
+
+    def get_object(self, idx: int) -> Object2D:
+        if idx not in self._objects:
+            raise KeyError(idx)
+        name: str = self._objects.templates[self._objects.template_ids[idx]]
+        return self._get_template(name).create_obj(self._objects, idx)
 
     def _delete_object(self, idx: int) -> None:
-        self._objects.pop(idx)
+        self._dirty_bounds.append(self._world_bounds(idx))
+        self._objects.remove(idx)
+
+    def open_world(self, path: Path | str, budget: int = 256 << 20) -> None:
+        world: WorldStreamer = WorldStreamer(path, budget, self._wake)
+        for name in world.templates:
+            if not self._has_template(name):
+                world.close()
+                raise ValueError(f"World uses unknown template {name}")
+
+        self.close_world()
+        self._world = world
+        self._world_templates = [self._get_template(name) for name in world.templates]
+        self._world_margin = max(
+            [
+                float(numpy.abs(numpy.concatenate((low, low + size))).max())
+                for low, size in (
+                    (template.bounds[:2], template.bounds[2:])
+                    for template in self._world_templates
+                )
+            ]
+            or [0.0]
+        )
+        self._layer = None
+
+    def close_world(self) -> None:
+        if self._world is not None:
+            self._world.close()
+            self._world = None
+            self._world_templates = []
+            self._layer = None
+
+    def _view_rect(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        return (
+            self.screen_to_world((0, self._win_height)),
+            self.screen_to_world((self._win_width, 0)),
+        )
+
+    def _stream_world(self) -> None:
+        if self._world is None:
+            return
+
+        low, high = self._view_rect()
+        size: float = self._world.chunk_size
+        keys: list[tuple[int, int]] = self._world.keys_in(
+            low - size - self._world_margin, high + size + self._world_margin
+        )
+        keys.sort(
+            key=lambda key: (key[0] * size + size / 2 - self._camera.pos[0]) ** 2
+            + (key[1] * size + size / 2 - self._camera.pos[1]) ** 2
+        )
+        try:
+            self._world.request(keys)
+            ready: list[WorldChunk] = self._world.poll()
+        except RuntimeError:
+            self.close_world()
+            raise
+
+        for chunk in ready:
+            self._dirty_bounds.append(
+                numpy.array(
+                    [
+                        chunk.origin[0] - self._world_margin,
+                        chunk.origin[1] - self._world_margin,
+                        size + self._world_margin * 2,
+                        size + self._world_margin * 2,
+                    ]
+                )
+            )
+            self._redraw = True
+
+    def _render_world(self, low: numpy.ndarray, high: numpy.ndarray) -> int:
+        if self._world is None:
+            return 0
+
+        rendered: int = 0
+        low = low - self._world_margin
+        high = high + self._world_margin
+        for chunk in self._world.chunks_in(low, high):
+            local_low: numpy.ndarray = low - chunk.origin
+            local_high: numpy.ndarray = high - chunk.origin
+            selected: numpy.ndarray = numpy.flatnonzero(
+                (chunk.positions >= local_low).all(axis=1)
+                & (chunk.positions <= local_high).all(axis=1)
+            )
+            positions: numpy.ndarray = chunk.origin + chunk.positions[selected]
+            for pos, template_id in zip(
+                positions, chunk.template_ids[selected].tolist()
+            ):
+                rendered += self._render_object(self._world_templates[template_id], pos)
+        return rendered
+
+    def _view_state(self) -> tuple:
+        return super()._view_state() + (
+            tuple(self._camera.pos.tolist()),
+            self._camera.scale,
+            self._scroll_reuse,
+        )
 
     def update(self, dt: float) -> None:
         if self._middle_clicked:
-            mouse_pos: numpy.ndarray = numpy.array(pygame.mouse.get_pos(), dtype=float)
+            mouse_pos: numpy.ndarray = numpy.array(self._mouse_pos, dtype=float)
             if self._last_mouse_pos is not None:
                 offset: float = dt * 60 / self._camera.scale * self._camera.sens
                 self._camera.pos[0] += (self._last_mouse_pos[0] - mouse_pos[0]) * offset
                 self._camera.pos[1] -= (self._last_mouse_pos[1] - mouse_pos[1]) * offset
             self._last_mouse_pos = mouse_pos
 
-        if self._debug_mode and self._debug_cursor_idx:
-            self._objects[self._debug_cursor_idx].pos = self._camera.pos
+        if self._debug_mode and self._debug_cursor_idx is not None:
+            self.move_object(self._debug_cursor_idx, self._camera.pos)
+
+        self._stream_world()
+
+    def _camera_offset(self) -> tuple[int, int]:
+        return (
+            round(self._camera.pos[0] * self._camera.scale),
+            round(self._camera.pos[1] * self._camera.scale),
+        )
+
+    def screen_to_world(self, pos: tuple[int, int]) -> numpy.ndarray:
+        offset: tuple[int, int] = self._camera_offset()
+        return numpy.array(
+            [
+                (pos[0] - self._win_width // 2 + offset[0]) / self._camera.scale,
+                (self._win_height // 2 - pos[1] + offset[1]) / self._camera.scale,
+            ]
+        )
+
+    def pick(self, pos: tuple[int, int]) -> int | None:
+        self._update_pick_index()
+        return self._pick_index.point(self.screen_to_world(pos), self._debug_cursor_idx)
 
     def _project_point(self, point: numpy.ndarray) -> tuple[numpy.ndarray, bool]:
         point[1] *= -1
         point *= self._camera.scale
-        point += (
-            -self._camera.pos[0] * self._camera.scale,
-            self._camera.pos[1] * self._camera.scale,
-        )
+        offset: tuple[int, int] = self._camera_offset()
+        point += (-offset[0], offset[1])
         point += numpy.array([self._win_width // 2, self._win_height // 2])
+        numpy.floor(point, out=point)
 
         tolerance = self._camera.scale * 1
 
@@ -181,7 +375,7 @@ class Renderer2D(RendererBase):
         point, on_screen = self._project_point(point)
 
         if on_screen:
-            pygame.draw.circle(self._window, color, tuple(point), radius)
+            pygame.draw.circle(self._canvas, color, tuple(point), radius)
             return True
         return False
 
@@ -195,13 +389,27 @@ class Renderer2D(RendererBase):
         point1, on_screen1 = self._project_point(point1)
         point2, on_screen2 = self._project_point(point2)
 
-        if on_screen1 and on_screen2:
-            pygame.draw.line(self._window, color, tuple(point1), tuple(point2), width)
+        if on_screen1 or on_screen2 or self._canvas.get_rect().clipline(point1, point2):
+            pygame.draw.line(self._canvas, color, tuple(point1), tuple(point2), width)
             return True
         return False
 
-    def _is_object_showing(self, obj: Object2D) -> bool:
-        x1, y1, w1, h1 = self._project_rect(obj.bounds)
+    def _render_texture(self, name: str, rect: numpy.ndarray) -> bool:
+        size: tuple[int, int] = (
+            round(rect[2] * self._camera.scale),
+            round(rect[3] * self._camera.scale),
+        )
+        if size[0] < 1 or size[1] < 1:
+            return False
+
+        top_left, _ = self._project_point(numpy.array([rect[0], rect[1] + rect[3]]))
+        self._canvas.blit(self.textures.get(name, size), tuple(top_left))
+        return True
+
+    def _is_object_showing(self, obj: Object2DTemplate, pos: numpy.ndarray) -> bool:
+        bounds: numpy.ndarray = obj.bounds.copy()
+        bounds[:2] += pos
+        x1, y1, w1, h1 = self._project_rect(bounds)
         x2, y2, w2, h2 = self._screen_bounds
 
         x_overlap = not (x1 + w1 < x2 or x2 + w2 < x1)
@@ -209,14 +417,14 @@ class Renderer2D(RendererBase):
 
         return x_overlap and y_overlap
 
-    def _render_object(self, obj: Object2D) -> bool:
-        if not self._is_object_showing(obj):
+    def _render_object(self, obj: Object2DTemplate, pos: numpy.ndarray) -> bool:
+        if not self._is_object_showing(obj, pos):
             return False
 
         for item in obj.items:
             if item["type"] == "point":
                 self._render_point(
-                    obj.vertices[item["pos"]] + obj.pos,
+                    obj.vertices[item["pos"]] + pos,
                     obj.colors[item["color"]],
                     3,
                 )
@@ -225,26 +433,140 @@ class Renderer2D(RendererBase):
                 end: numpy.ndarray = obj.vertices[obj.edges[item["pos"]][1]]
 
                 self._render_line(
-                    start + obj.pos,
-                    end + obj.pos,
+                    start + pos,
+                    end + pos,
                     obj.colors[item["color"]],
                 )
+            elif item["type"] == "texture":
+                rect: numpy.ndarray = numpy.array(item["rect"], dtype=float)
+                rect[:2] += pos
+                self._render_texture(item["texture"], rect)
         return True
 
+    def _render_handles(self, handles: numpy.ndarray) -> int:
+        rendered: int = 0
+        templates: list[Object2DTemplate] = self._get_templates()
+        positions: numpy.ndarray = self._objects.positions
+        template_ids: numpy.ndarray = self._objects.template_ids
+        for idx in handles.tolist():
+            rendered += self._render_object(
+                templates[template_ids[idx]], positions[idx]
+            )
+        return rendered
+
+    def _render_region(self, region: pygame.Rect) -> int:
+        region = region.clip(self._canvas.get_rect())
+        if region.width == 0 or region.height == 0:
+            return 0
+
+        self._canvas.set_clip(region)
+        self._canvas.fill(0, region)
+
+        margin: pygame.Rect = region.inflate(8, 8)
+        corners: numpy.ndarray = numpy.array(
+            [
+                self.screen_to_world(margin.bottomleft),
+                self.screen_to_world(margin.topright),
+            ]
+        )
+        self._update_pick_index()
+        rendered: int = self._render_world(corners[0], corners[1])
+        rendered += self._render_handles(
+            self._pick_index.overlapping(corners[0], corners[1])
+        )
+
+        self._canvas.set_clip(None)
+        return rendered
+
+    def _memory_caches(self) -> dict[str, int]:
+        caches: dict[str, int] = super()._memory_caches()
+        caches["textures"] = self.textures.used + deep_sizeof(self.textures.textures)
+        caches["scene_layer"] = deep_sizeof(self._layer)
+        caches["world"] = self._world.nbytes if self._world is not None else 0
+        return caches
+
+    def set_scroll_reuse(self, enabled: bool) -> None:
+        self._scroll_reuse = enabled
+        self._layer = None
+
     def _render_objects(self) -> None:
-        self._current_rendered = 0
-        for obj in self._objects:
-            self._current_rendered += self._render_object(obj)
+        if not self._scroll_reuse:
+            self._canvas = self._window
+            self._current_rendered = self._render_world(*self._view_rect())
+            self._current_rendered += self._render_handles(self._objects.alive())
+            return
+
+        state: tuple = (
+            self._objects,
+            self._camera.scale,
+            self._window.get_size(),
+            self._get_templates(),
+        )
+        offset: tuple[int, int] = self._camera_offset()
+        dx: int = self._layer_offset[0] - offset[0]
+        dy: int = offset[1] - self._layer_offset[1]
+
+        if (
+            self._layer is None
+            or self._layer_state != state
+            or abs(dx) >= self._win_width
+            or abs(dy) >= self._win_height
+        ):
+            self._layer = pygame.Surface(self._window.get_size())
+            self._canvas = self._layer
+            self._current_rendered = self._render_world(*self._view_rect())
+            self._current_rendered += self._render_handles(self._objects.alive())
+        else:
+            self._canvas = self._layer
+            self._layer.scroll(dx, dy)
+
+            regions: list[pygame.Rect] = []
+            if dx > 0:
+                regions.append(pygame.Rect(0, 0, dx, self._win_height))
+            elif dx < 0:
+                regions.append(
+                    pygame.Rect(self._win_width + dx, 0, -dx, self._win_height)
+                )
+            if dy > 0:
+                regions.append(pygame.Rect(0, 0, self._win_width, dy))
+            elif dy < 0:
+                regions.append(
+                    pygame.Rect(0, self._win_height + dy, self._win_width, -dy)
+                )
+            for bounds in self._dirty_bounds:
+                x, y, width, height = self._project_rect(bounds)
+                regions.append(
+                    pygame.Rect(
+                        int(x), int(y), int(width) + 1, int(height) + 1
+                    ).inflate(8, 8)
+                )
 
-        if self._debug_mode:
-            self._render_object
+            self._current_rendered = 0
+            for region in regions:
+                self._current_rendered += self._render_region(region)
+
+        self._layer_state = state
+        self._layer_offset = offset
+        self._dirty_bounds = []
+        self._window.blit(self._layer, (0, 0))
 
     def draw_ui(self) -> None:
         if self._debug_mode:
             debug_text: str = str(
                 f"FPS: {round(self._clock.get_fps(), 2)}\n"
                 + f"Objects (Rendered/Total): {self._current_rendered}/{len(self._objects)}\n"
+                + f"Hover: {self.pick(self._mouse_pos)}\n"
+                + f"Resolution: {self._get_resolution_text()}\n"
+                + f"Startup (First Frame): {self._get_startup_text()}\n"
+                + "\n".join(self._get_memory_text())
+                + "\n"
                 + f"Camera Pos: {self._camera.pos}\n"
+                + f"Textures (Hits/Misses): {self.textures.hits}/{self.textures.misses}\n"
+                + (
+                    f"World Chunks (Loaded/Pending): {self._world.loaded}/{self._world.pending}\n"
+                    if self._world is not None
+                    else ""
+                )
             )
             for idx, line in enumerate(debug_text.split("\n")):
                 line_distance: int = self.fonts["debug"].get_height() + 4
@@ -256,9 +578,10 @@ class Renderer2D(RendererBase):
     def _toggle_debug(self) -> None:
         self._debug_mode = not self._debug_mode
         if self._debug_mode:
-            self._debug_cursor_idx = len(self._objects)
-            self.create_object("debug_cursor", self._camera.pos)
+            self._debug_cursor_idx = self.create_object(
+                "debug_cursor", self._camera.pos
+            )
 
-        elif self._debug_cursor_idx:
+        elif self._debug_cursor_idx is not None:
             self._delete_object(self._debug_cursor_idx)
             self._debug_cursor_idx = None
@@ -1,7 +1,13 @@
-import os
-import json
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
 from Renderer.base_renderer import pygame, numpy, SetupOptions, RendererBase
-from typing import Callable
+from Renderer.scene import ObjectStore
+from Renderer.lighting import Lighting
+from Renderer.pointcloud import PointCloud
+from Renderer.voxels import VoxelGrid
+from Renderer.memory import arrays_nbytes
+from Renderer.parallel import ChunkPool
+from Renderer import kernels
 
 
 class Camera3D:
@@ -15,40 +21,137 @@ class Camera3D:
         self.max_zoom: float = 0.01
         self.far_plane: float = 20.0
 
+    def state(self) -> dict[str, Any]:
+        return {
+            "focus": self.focus.tolist(),
+            "rot": self.rot.tolist(),
+            "distance": self.distance,
+            "depth_scaling": self.depth_scaling,
+            "far_plane": self.far_plane,
+        }
+
+    def restore(self, state: dict[str, Any]) -> None:
+        self.focus = numpy.array(state["focus"], dtype=float)
+        self.rot = numpy.array(state["rot"], dtype=float)
+        self.distance = state["distance"]
+        self.depth_scaling = state["depth_scaling"]
+        self.far_plane = state["far_plane"]
+
+    def rotation_matrix(self) -> numpy.ndarray:
+        pitch, yaw = self.rot
+        rotation_matrix_yaw = numpy.array(
+            [
+                [numpy.cos(yaw), 0, -numpy.sin(yaw)],
+                [0, 1, 0],
+                [numpy.sin(yaw), 0, numpy.cos(yaw)],
+            ]
+        )
+        rotation_matrix_pitch = numpy.array(
+            [
+                [1, 0, 0],
+                [0, numpy.cos(pitch), -numpy.sin(pitch)],
+                [0, numpy.sin(pitch), numpy.cos(pitch)],
+            ]
+        )
+        return numpy.dot(rotation_matrix_pitch, rotation_matrix_yaw)
+
+
+class Viewport:
+    def __init__(
+        self,
+        area: tuple[float, float, float, float],
+        camera: Camera3D | None = None,
+    ) -> None:
+        x, y, width, height = area
+        if (
+            width <= 0
+            or height <= 0
+            or x < 0
+            or y < 0
+            or x + width > 1
+            or y + height > 1
+        ):
+            raise ValueError("Viewport area must lie inside the window")
+        self.area: tuple[float, float, float, float] = area
+        self.camera: Camera3D = camera if camera is not None else Camera3D()
+        self.framebuffer: numpy.ndarray = numpy.zeros((0, 0, 3), dtype=numpy.uint8)
+        self.zbuffer: numpy.ndarray = numpy.zeros((0, 0), dtype=numpy.float32)
+
+    def rect(self, size: tuple[int, int]) -> pygame.Rect:
+        x, y, width, height = self.area
+        left: int = round(x * size[0])
+        top: int = round(y * size[1])
+        return pygame.Rect(
+            left,
+            top,
+            max(round((x + width) * size[0]) - left, 1),
+            max(round((y + height) * size[1]) - top, 1),
+        ).clip(pygame.Rect((0, 0), size))
 
-class Object3D:
-    def __init__(self) -> None:
-        self.name: str = ""
-        self.pos: numpy.ndarray = numpy.array([0.0, 0.0, 0.0])
-        self.vertices: list[numpy.ndarray] = []
-        self.edges: list[numpy.ndarray] = []
-        self.faces: list[numpy.ndarray] = []
-        self.colors: dict[str, pygame.Color] = {}
-        self.items: list[dict] = []
-        # self.bounds: numpy.ndarray = numpy.array([0.0, 0.0, 0.0, 0.0], dtype=float)
-
-    # def calc_bounds(self, project_point: Callable) -> None:
-    #     min_point = numpy.array([numpy.inf, numpy.inf], dtype=float)
-    #     max_point = numpy.array([-numpy.inf, -numpy.inf], dtype=float)
-
-    #     for vertice in self.vertices:
-    #         min_point[0] = min(min_point[0], vertice[0])
-    #         min_point[1] = min(min_point[1], vertice[1])
-    #         max_point[0] = max(max_point[0], vertice[0])
-    #         max_point[1] = max(max_point[1], vertice[1])
 
-    #     min_point += self.pos
-    #     max_point += self.pos
+class Object3D:
+    __slots__ = ("_store", "_idx", "_template")
 
-    #     self.bounds = numpy.array(
-    #         [
-    #             (min_point[0]),
-    #             (min_point[1]),
-    #             (max_point[0] - min_point[0]),
-    #             (max_point[1] - min_point[1]),
-    #         ],
-    #         dtype=float,
-    #     )
+    def __init__(
+        self, store: ObjectStore, idx: int, template: "Object3DTemplate"
+    ) -> None:
+        self._store: ObjectStore = store
+        self._idx: int = idx
+        self._template: Object3DTemplate = template
+
+    @property
+    def name(self) -> str:
+        return self._template.name
+
+    @property
+    def pos(self) -> numpy.ndarray:
+        pos: numpy.ndarray = self._store.positions[self._idx]
+        pos.flags.writeable = False
+        return pos
+
+    @property
+    def rotation(self) -> numpy.ndarray:
+        rotation: numpy.ndarray = self._store.rotations[self._idx]
+        rotation.flags.writeable = False
+        return rotation
+
+    @property
+    def scale(self) -> numpy.ndarray:
+        scale: numpy.ndarray = self._store.scales[self._idx]
+        scale.flags.writeable = False
+        return scale
+
+    @property
+    def parent(self) -> int | None:
+        parent: int = int(self._store.parents[self._idx])
+        return None if parent == -1 else parent
+
+    @property
+    def world_pos(self) -> numpy.ndarray:
+        self._store.update_transforms()
+        pos: numpy.ndarray = self._store.world_positions[self._idx]
+        pos.flags.writeable = False
+        return pos
+
+    @property
+    def vertices(self) -> list[numpy.ndarray]:
+        return self._template.vertices
+
+    @property
+    def edges(self) -> list[numpy.ndarray]:
+        return self._template.edges
+
+    @property
+    def faces(self) -> list[numpy.ndarray]:
+        return self._template.faces
+
+    @property
+    def colors(self) -> dict[str, pygame.Color]:
+        return self._template.colors
+
+    @property
+    def items(self) -> list[dict]:
+        return self._template.items
 
 
 class Object3DTemplate:
@@ -73,16 +176,96 @@ class Object3DTemplate:
         for item in obj_params["render"]:
             self.items.append(item)
 
-    def create_obj(self, pos: numpy.ndarray) -> Object3D:
-        obj = Object3D()
-        obj.name = self.name
-        obj.pos = pos
-        obj.vertices = self.vertices
-        obj.edges = self.edges
-        obj.faces = self.faces
-        obj.colors = self.colors
-        obj.items = self.items
-        return obj
+        min_point: numpy.ndarray = numpy.min(self.vertices, axis=0)
+        max_point: numpy.ndarray = numpy.max(self.vertices, axis=0)
+        self.bounds: numpy.ndarray = numpy.array(
+            [*min_point, *(max_point - min_point)], dtype=float
+        )
+
+        self.vertex_array: numpy.ndarray = numpy.array(self.vertices, dtype=float)
+        self._calc_faces()
+        self._calc_lines()
+
+    def _calc_lines(self) -> None:
+        lines: list[dict] = [item for item in self.items if item["type"] == "line"]
+        points: list[dict] = [item for item in self.items if item["type"] == "point"]
+
+        self.line_indices: numpy.ndarray = numpy.array(
+            [self.edges[item["pos"]] for item in lines], dtype=numpy.intp
+        ).reshape(-1, 2)
+        self.line_color_array: numpy.ndarray = numpy.array(
+            [tuple(self.colors[item["color"]])[:3] for item in lines],
+            dtype=numpy.uint8,
+        ).reshape(-1, 3)
+        self.point_indices: numpy.ndarray = numpy.array(
+            [item["pos"] for item in points], dtype=numpy.intp
+        )
+        self.point_color_array: numpy.ndarray = numpy.array(
+            [tuple(self.colors[item["color"]])[:3] for item in points],
+            dtype=numpy.uint8,
+        ).reshape(-1, 3)
+
+    def _calc_faces(self) -> None:
+        face_items: list[dict] = [item for item in self.items if item["type"] == "face"]
+        size: int = max([len(self.faces[item["pos"]]) for item in face_items] or [0])
+
+        self.face_indices: numpy.ndarray = numpy.zeros(
+            (len(face_items), size), dtype=numpy.intp
+        )
+        self.face_colors: list[pygame.Color] = []
+        self.face_outlines: list[pygame.Color | None] = []
+        for idx, item in enumerate(face_items):
+            face: numpy.ndarray = self.faces[item["pos"]]
+            self.face_indices[idx, : len(face)] = face
+            self.face_indices[idx, len(face) :] = face[-1]
+            self.face_colors.append(self.colors[item["color"]])
+            self.face_outlines.append(
+                self.colors[item["outline"]] if "outline" in item else None
+            )
+
+        points: numpy.ndarray = self.vertex_array[self.face_indices]
+        self.face_normals: numpy.ndarray = (
+            numpy.cross(points, numpy.roll(points, -1, axis=1)).sum(axis=1) / 2
+        )
+        self.face_offsets: numpy.ndarray = numpy.einsum(
+            "ij,ij->i", self.face_normals, points[:, 0] if size else numpy.zeros((0, 3))
+        )
+        lengths: numpy.ndarray = numpy.linalg.norm(self.face_normals, axis=1)
+        self.face_double_sided: numpy.ndarray = lengths < 1e-9
+        self.face_unit_normals: numpy.ndarray = self.face_normals / numpy.maximum(
+            lengths, 1e-9
+        ).reshape(-1, 1)
+        self.face_centroids: numpy.ndarray = numpy.array(
+            [
+                numpy.mean(self.vertex_array[self.faces[item["pos"]]], axis=0)
+                for item in face_items
+            ]
+        ).reshape(-1, 3)
+        self.face_color_array: numpy.ndarray = numpy.array(
+            [tuple(color)[:3] for color in self.face_colors], dtype=float
+        ).reshape(-1, 3)
+
+        sizes: numpy.ndarray = numpy.array(
+            [len(self.faces[item["pos"]]) for item in face_items], dtype=numpy.intp
+        )
+        self.face_vertex_weights: numpy.ndarray = (
+            numpy.arange(size) < sizes[:, None]
+        ) / numpy.maximum(sizes, 1)[:, None]
+        vertex_normals: numpy.ndarray = numpy.zeros_like(self.vertex_array)
+        numpy.add.at(
+            vertex_normals,
+            self.face_indices[self.face_vertex_weights > 0],
+            numpy.repeat(self.face_normals, sizes, axis=0),
+        )
+        self.face_vertex_normals: numpy.ndarray = (
+            vertex_normals
+            / numpy.maximum(
+                numpy.linalg.norm(vertex_normals, axis=1, keepdims=True), 1e-9
+            )
+        )[self.face_indices]
+
+    def create_obj(self, store: ObjectStore, idx: int) -> Object3D:
+        return Object3D(store, idx, self)
 
 
 class Renderer3D(RendererBase):
@@ -90,7 +273,29 @@ class Renderer3D(RendererBase):
         super().__init__(options)
         self._camera: Camera3D = Camera3D()
         self._object_templates: dict[str, Object3DTemplate] = {}
-        self._objects: list[Object3D] = []
+        self._objects_path: str = "src/Renderer/data/objects3d"
+        self._objects: ObjectStore = ObjectStore(3)
+        self._solid: bool = False
+        self.lighting: Lighting = Lighting()
+        self._shade_cache: dict[int, tuple] = {}
+        self._shade_store: ObjectStore | None = None
+        self._shade_version: int = 0
+        self._raster: bool = kernels.COMPILED
+        self._framebuffer: numpy.ndarray = numpy.zeros(
+            (self._win_width, self._win_height, 3), dtype=numpy.uint8
+        )
+        self._zbuffer: numpy.ndarray = numpy.zeros((0, 0), dtype=numpy.float32)
+        self._point_clouds: dict[int, PointCloud] = {}
+        self._next_cloud: int = 0
+        self._current_points: int = 0
+        self._voxel_grids: dict[int, VoxelGrid] = {}
+        self._next_grid: int = 0
+        self._voxel_shades: dict[int, tuple[tuple, numpy.ndarray]] = {}
+        self._viewports: list[Viewport] = []
+        self._scaled_framebuffer: numpy.ndarray = numpy.zeros((0, 0, 3), numpy.uint8)
+        self._scaled_zbuffer: numpy.ndarray = numpy.zeros((0, 0), numpy.float32)
+        self._frame_groups: list[tuple] = []
+        self._pool: ChunkPool = ChunkPool(options.workers)
 
         # self._screen_bounds: numpy.ndarray = numpy.array(
         #     [
@@ -108,12 +313,21 @@ class Renderer3D(RendererBase):
 
     def _resize(self, width: int, height: int) -> None:
         super()._resize(width, height)
+        self._framebuffer = numpy.zeros((width, height, 3), dtype=numpy.uint8)
+        if self._zbuffer.size:
+            self._zbuffer = numpy.zeros((width, height), dtype=numpy.float32)
         # self._screen_bounds[2] = width
         # self._screen_bounds[3] = height
 
     def key_pressed(self, key: int, mod: int, unicode: str, scancode: int) -> None:
         if key == pygame.K_LSHIFT:
             self._shift_hold = True
+        elif key == pygame.K_F3:
+            self._solid = not self._solid
+        elif key == pygame.K_F4:
+            self.lighting.set_mode(
+                "lambert" if self.lighting.mode == "flat" else "flat"
+            )
         elif key == pygame.K_KP_0:
             self._camera.focus = numpy.array([0.0, 0.0, 0.0])
             self._camera.rot = numpy.array([0.0, 0.0])
@@ -132,7 +346,165 @@ class Renderer3D(RendererBase):
         if key == pygame.K_LSHIFT:
             self._shift_hold = False
 
+    def add_viewport(
+        self,
+        area: tuple[float, float, float, float],
+        camera: Camera3D | None = None,
+    ) -> Viewport:
+        viewport: Viewport = Viewport(area, camera)
+        self._viewports.append(viewport)
+        return viewport
+
+    def clear_viewports(self) -> None:
+        self._viewports = []
+
+    def set_quad_view(self) -> None:
+        self.clear_viewports()
+        for rot, area in (
+            ((0.0, 0.0), (0.0, 0.0, 0.5, 0.5)),
+            ((0.0, -numpy.pi / 2), (0.5, 0.0, 0.5, 0.5)),
+            ((-numpy.pi / 2, 0.0), (0.0, 0.5, 0.5, 0.5)),
+        ):
+            camera: Camera3D = Camera3D()
+            camera.focus = self._camera.focus.copy()
+            camera.distance = self._camera.distance
+            camera.rot = numpy.array(rot)
+            self.add_viewport(area, camera)
+        self.add_viewport((0.5, 0.5, 0.5, 0.5), self._camera)
+
+    def _viewport_at(self, pos: tuple[int, int]) -> Viewport | None:
+        for viewport in self._viewports:
+            if viewport.rect((self._win_width, self._win_height)).collidepoint(pos):
+                return viewport
+        return None
+
+    @contextmanager
+    def _use_viewport(self, viewport: Viewport) -> Iterator[pygame.Rect]:
+        rect: pygame.Rect = viewport.rect((self._win_width, self._win_height))
+        if viewport.framebuffer.shape[:2] != rect.size:
+            viewport.framebuffer = numpy.zeros((*rect.size, 3), dtype=numpy.uint8)
+            viewport.zbuffer = numpy.zeros((0, 0), dtype=numpy.float32)
+
+        state: tuple = (
+            self._camera,
+            self._win_width,
+            self._win_height,
+            self._window,
+            self._framebuffer,
+            self._zbuffer,
+        )
+        self._camera = viewport.camera
+        self._win_width, self._win_height = rect.size
+        self._window = state[3].subsurface(rect)
+        self._framebuffer = viewport.framebuffer
+        self._zbuffer = viewport.zbuffer
+        try:
+            yield rect
+        finally:
+            viewport.zbuffer = self._zbuffer
+            (
+                self._camera,
+                self._win_width,
+                self._win_height,
+                self._window,
+                self._framebuffer,
+                self._zbuffer,
+            ) = state
+
+    @contextmanager
+    def _use_render_scale(self, scale: float) -> Iterator[float]:
+        with super()._use_render_scale(scale) as factor:
+            size: tuple[int, int] = (self._win_width, self._win_height)
+            if self._scaled_framebuffer.shape[:2] != size:
+                self._scaled_framebuffer = numpy.zeros((*size, 3), dtype=numpy.uint8)
+                self._scaled_zbuffer = numpy.zeros((0, 0), dtype=numpy.float32)
+
+            cameras: list[Camera3D] = [self._camera] + [
+                viewport.camera
+                for viewport in self._viewports
+                if viewport.camera is not self._camera
+            ]
+            state: tuple = (
+                self._framebuffer,
+                self._zbuffer,
+                [camera.depth_scaling for camera in cameras],
+            )
+            self._framebuffer = self._scaled_framebuffer
+            self._zbuffer = self._scaled_zbuffer
+            for camera in cameras:
+                camera.depth_scaling *= factor
+            try:
+                yield factor
+            finally:
+                self._scaled_zbuffer = self._zbuffer
+                self._framebuffer, self._zbuffer, depth_scalings = state
+                for camera, depth_scaling in zip(cameras, depth_scalings):
+                    camera.depth_scaling = depth_scaling
+
+    def _at_viewport(
+        self, pos: tuple[int, int], func: Callable[[tuple[int, int]], Any]
+    ) -> Any:
+        viewport: Viewport | None = self._viewport_at(pos)
+        if viewport is None:
+            return func(pos)
+        with self._use_viewport(viewport) as rect:
+            return func((pos[0] - rect.x, pos[1] - rect.y))
+
+    def _view_state(self) -> tuple:
+        return super()._view_state() + (
+            tuple(
+                (
+                    tuple(camera.focus.tolist()),
+                    tuple(camera.rot.tolist()),
+                    camera.distance,
+                    camera.depth_scaling,
+                    camera.far_plane,
+                )
+                for camera in [self._camera]
+                + [viewport.camera for viewport in self._viewports]
+            ),
+            tuple(viewport.area for viewport in self._viewports),
+            self._solid,
+            self._raster,
+            self.lighting.key(),
+            tuple(self._point_clouds),
+            tuple((idx, grid.version) for idx, grid in self._voxel_grids.items()),
+        )
+
+    def _capture_state(self) -> dict[str, Any]:
+        cameras: list[Camera3D] = [self._camera] + [
+            viewport.camera
+            for viewport in self._viewports
+            if viewport.camera is not self._camera
+        ]
+        return super()._capture_state() | {
+            "cameras": [camera.state() for camera in cameras],
+            "viewports": [
+                [*viewport.area, cameras.index(viewport.camera)]
+                for viewport in self._viewports
+            ],
+            "solid": self._solid,
+            "lighting": self.lighting.mode,
+        }
+
+    def _restore_state(self, state: dict[str, Any]) -> None:
+        super()._restore_state(state)
+        cameras: list[Camera3D] = []
+        for camera_state in state["cameras"]:
+            cameras.append(Camera3D())
+            cameras[-1].restore(camera_state)
+        self._camera = cameras[0]
+        self.clear_viewports()
+        for *area, camera in state["viewports"]:
+            self.add_viewport(tuple(area), cameras[camera])
+        self._solid = state["solid"]
+        self.lighting.set_mode(state["lighting"])
+
     def mouse_pressed(self, pos: tuple[int, int], button: int) -> None:
+        viewport: Viewport | None = self._viewport_at(pos)
+        if viewport is not None:
+            self._camera = viewport.camera
+
         if button == pygame.BUTTON_LEFT:
             self.create_object("cube", self._camera.focus - (0.5, 0.5, 0.5))
         elif button == pygame.BUTTON_WHEELUP:
@@ -148,29 +520,97 @@ class Renderer3D(RendererBase):
         self._camera.distance -= scale
         self._camera.distance = max(self._camera.distance, self._camera.max_zoom)
 
-    def _load_obj_templates(self) -> None:
-        objects_path: str = "src/Renderer/data/objects3d"
-
-        for filename in os.listdir(objects_path):
-            if filename.endswith(".obj"):
-                with open(f"{objects_path}/{filename}", "r") as file:
-                    obj: dict = json.load(file)
-
-                    self._object_templates[obj["name"]] = Object3DTemplate(obj)
+    def _build_obj_template(self, obj: dict) -> Object3DTemplate:
+        return Object3DTemplate(obj)
 
     def create_object(
         self, obj_name: str, pos: tuple[float, float, float] | numpy.ndarray
+    ) -> int:
+        self._get_template(obj_name)
+        return self._objects.add(obj_name, numpy.array(pos, dtype=float))
+
+    def move_object(
+        self, idx: int, pos: tuple[float, float, float] | numpy.ndarray
+    ) -> None:
+        self._objects.move(idx, pos)
+
+    def transform_object(
+        self,
+        idx: int,
+        rotation: tuple[float, ...] | numpy.ndarray | None = None,
+        scale: float | tuple[float, float, float] | numpy.ndarray | None = None,
+    ) -> None:
+        self._objects.set_transforms(
+            numpy.array([idx]),
+            None if rotation is None else numpy.array([rotation], dtype=float),
+            None if scale is None else numpy.broadcast_to(scale, (1, 3)),
+        )
+
+    def transform_objects(
+        self,
+        handles: numpy.ndarray,
+        rotations: numpy.ndarray | None = None,
+        scales: numpy.ndarray | None = None,
     ) -> None:
-        obj = self._object_templates[obj_name].create_obj(numpy.array(pos, dtype=float))
-        # obj.calc_bounds(self._project_point)
-        self._objects.append(obj)
+        handles = numpy.asarray(handles, dtype=numpy.intp)
+        self._objects.set_transforms(
+            handles,
+            rotations,
+            None if scales is None else numpy.broadcast_to(scales, (len(handles), 3)),
+        )
+
+    def add_point_cloud(
+        self,
+        points: numpy.ndarray,
+        colors: numpy.ndarray | None = None,
+        color: tuple[int, int, int] = (255, 255, 255),
+    ) -> int:
+        idx: int = self._next_cloud
+        self._point_clouds[idx] = PointCloud(points, colors, color)
+        self._next_cloud += 1
+        return idx
+
+    def get_point_cloud(self, idx: int) -> PointCloud:
+        return self._point_clouds[idx]
+
+    def remove_point_cloud(self, idx: int) -> None:
+        del self._point_clouds[idx]
+
+    def add_voxel_grid(self, grid: VoxelGrid) -> int:
+        idx: int = self._next_grid
+        self._voxel_grids[idx] = grid
+        self._next_grid += 1
+        return idx
+
+    def get_voxel_grid(self, idx: int) -> VoxelGrid:
+        return self._voxel_grids[idx]
+
+    def remove_voxel_grid(self, idx: int) -> None:
+        del self._voxel_grids[idx]
+        self._voxel_shades.pop(idx, None)
+
+    def create_group(
+        self, pos: tuple[float, float, float] | numpy.ndarray = (0.0, 0.0, 0.0)
+    ) -> int:
+        return self.create_object("group", pos)
+
+    def set_parent(self, handles: int | numpy.ndarray, parent: int | None) -> None:
+        self._objects.set_parent(
+            numpy.asarray(handles, dtype=numpy.intp), -1 if parent is None else parent
+        )
+
+    def get_object(self, idx: int) -> Object3D:
+        if idx not in self._objects:
+            raise KeyError(idx)
+        name: str = self._objects.templates[self._objects.template_ids[idx]]
+        return self._get_template(name).create_obj(self._objects, idx)
 
     def _delete_object(self, idx: int) -> None:
-        self._objects.pop(idx)
+        self._objects.remove(idx)
 
     def update(self, dt: float) -> None:
         if self._mouse_buttons[1]:
-            mouse_pos: numpy.ndarray = numpy.array(pygame.mouse.get_pos(), dtype=float)
+            mouse_pos: numpy.ndarray = numpy.array(self._mouse_pos, dtype=float)
             if self._last_mouse_pos is not None:
                 d_offset: float = dt * self._camera.sens
 
@@ -226,8 +666,40 @@ class Renderer3D(RendererBase):
 
             self._last_mouse_pos = mouse_pos
 
-        if self._debug_mode and self._debug_cursor_idx:
-            self._objects[self._debug_cursor_idx].pos = self._camera.focus
+        if self._debug_mode and self._debug_cursor_idx is not None:
+            self.move_object(self._debug_cursor_idx, self._camera.focus)
+
+    def screen_ray(self, pos: tuple[int, int]) -> tuple[numpy.ndarray, numpy.ndarray]:
+        return self._at_viewport(pos, self._screen_ray)
+
+    def _screen_ray(self, pos: tuple[int, int]) -> tuple[numpy.ndarray, numpy.ndarray]:
+        rotation_matrix: numpy.ndarray = self._camera.rotation_matrix()
+        direction: numpy.ndarray = numpy.array(
+            [
+                (pos[0] - self._win_width / 2) / self._camera.depth_scaling,
+                (self._win_height / 2 - pos[1]) / self._camera.depth_scaling,
+                1.0,
+            ]
+        )
+        origin: numpy.ndarray = numpy.array([0.0, 0.0, -self._camera.distance])
+        return (
+            rotation_matrix.T @ origin + self._camera.focus,
+            rotation_matrix.T @ direction,
+        )
+
+    def pick(self, pos: tuple[int, int]) -> int | None:
+        self._update_pick_index()
+        return self._at_viewport(pos, self._pick)
+
+    def _pick(self, pos: tuple[int, int]) -> int | None:
+        origin, direction = self._screen_ray(pos)
+        hit: tuple[int, float] | None = self._pick_index.ray(
+            origin,
+            direction,
+            self._camera.far_plane + self._camera.distance,
+            self._debug_cursor_idx,
+        )
+        return None if hit is None else hit[0]
 
     def _project_point(self, point: numpy.ndarray) -> tuple[numpy.ndarray, bool]:
         x: float = point[0]
@@ -263,11 +735,34 @@ class Renderer3D(RendererBase):
 
         return point, on_screen
 
+    def _project_points(
+        self, points: numpy.ndarray
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        camera: numpy.ndarray = (points - self._camera.focus) @ (
+            self._camera.rotation_matrix().T
+        )
+        depth: numpy.ndarray = camera[..., 2] + 1e-5
+
+        f: numpy.ndarray = self._camera.depth_scaling / numpy.maximum(
+            depth + self._camera.distance, 1e-5
+        )
+        screen: numpy.ndarray = numpy.stack(
+            (
+                self._win_width / 2 + camera[..., 0] * f,
+                self._win_height / 2 - camera[..., 1] * f,
+            ),
+            axis=-1,
+        )
+        return screen, depth
+
     def _project_rect(self, rect: numpy.ndarray) -> tuple[float, float, float, float]:
         point, _ = self._project_point(numpy.array([rect[0], rect[1]], dtype=float))
         width, height = rect[2] * self._camera.distance, rect[3] * self._camera.distance
         return point[0], point[1] - height, width, height
 
+    def set_raster(self, enabled: bool) -> None:
+        self._raster = enabled
+
     def _render_point(
         self, point: numpy.ndarray, color: pygame.Color, radius: int = 1
     ) -> bool:
@@ -302,43 +797,525 @@ class Renderer3D(RendererBase):
 
     #     return x_overlap and y_overlap
 
-    def _render_object(self, obj: Object3D) -> bool:
+    def _render_object(self, obj: Object3DTemplate, vertices: numpy.ndarray) -> bool:
         # if not self._is_object_showing(obj):
         #     return False
 
         for item in obj.items:
             if item["type"] == "point":
                 self._render_point(
-                    obj.vertices[item["pos"]] + obj.pos,
+                    vertices[item["pos"]],
                     obj.colors[item["color"]],
                     3,
                 )
             elif item["type"] == "line":
-                start: numpy.ndarray = obj.vertices[obj.edges[item["pos"]][0]]
-                end: numpy.ndarray = obj.vertices[obj.edges[item["pos"]][1]]
-
                 self._render_line(
-                    start + obj.pos,
-                    end + obj.pos,
+                    vertices[obj.edges[item["pos"]][0]],
+                    vertices[obj.edges[item["pos"]][1]],
                     obj.colors[item["color"]],
                 )
         return True
 
-    def _render_objects(self) -> None:
-        self._current_rendered = 0
-        for obj in self._objects:
-            self._current_rendered += self._render_object(obj)
+    def _memory_caches(self) -> dict[str, int]:
+        caches: dict[str, int] = super()._memory_caches()
+        caches["shading"] = arrays_nbytes(
+            *[cached[3] for cached in self._shade_cache.values()]
+        )
+        caches["frame"] = arrays_nbytes(
+            *[array for group in self._frame_groups for array in group[2:]]
+        )
+        caches["viewports"] = arrays_nbytes(
+            *[viewport.framebuffer for viewport in self._viewports]
+        )
+        caches["render_surface"] += arrays_nbytes(self._scaled_framebuffer)
+        caches["point_clouds"] = arrays_nbytes(
+            self._zbuffer,
+            self._scaled_zbuffer,
+            *[viewport.zbuffer for viewport in self._viewports],
+            *[cloud.components for cloud in self._point_clouds.values()],
+            *[cloud.colors for cloud in self._point_clouds.values()],
+        )
+        caches["voxels"] = arrays_nbytes(
+            *[grid.cells for grid in self._voxel_grids.values()],
+            *[grid.faces.data for grid in self._voxel_grids.values()],
+            *[grid.edges.data for grid in self._voxel_grids.values()],
+            *[shades for _, shades in self._voxel_shades.values()],
+        )
+        return caches
+
+    def _get_voxel_shades(self, idx: int, grid: VoxelGrid) -> numpy.ndarray:
+        key: tuple = (grid.version, self.lighting.key())
+        cached: tuple[tuple, numpy.ndarray] | None = self._voxel_shades.get(idx)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        _, corners = grid.faces.arrays()
+        shades: numpy.ndarray = self.lighting.shade(
+            grid.color, grid.face_normals(), corners.mean(axis=1)
+        )
+        self._voxel_shades[idx] = (key, shades)
+        return shades
+
+    def _shade_group(
+        self, template: Object3DTemplate, group: numpy.ndarray
+    ) -> numpy.ndarray:
+        matrices: numpy.ndarray = self._objects.world_matrices[group]
+        normal_matrices: numpy.ndarray = self._objects.normal_matrices(group)
+        positions: numpy.ndarray = self._objects.world_positions[group, None, :]
+        if self.lighting.mode == "flat":
+            normals: numpy.ndarray = numpy.einsum(
+                "nij,fj->nfi", normal_matrices, template.face_unit_normals
+            )
+            points: numpy.ndarray = positions + numpy.einsum(
+                "nij,fj->nfi", matrices, template.face_centroids
+            )
+            weights: numpy.ndarray | None = None
+        else:
+            normals = numpy.einsum(
+                "nij,fkj->nfki", normal_matrices, template.face_vertex_normals
+            )
+            points = positions[:, None] + numpy.einsum(
+                "nij,fkj->nfki", matrices, template.vertex_array[template.face_indices]
+            )
+            weights = template.face_vertex_weights
+        return self.lighting.shade(
+            template.face_color_array,
+            normals
+            / numpy.maximum(numpy.linalg.norm(normals, axis=-1, keepdims=True), 1e-9),
+            points,
+            weights,
+        )
+
+    def _get_shades(
+        self,
+        templates: list[Object3DTemplate],
+        handles: numpy.ndarray,
+        template_ids: numpy.ndarray,
+    ) -> dict[int, numpy.ndarray]:
+        if self._shade_store is not self._objects:
+            self._shade_cache = {}
+            self._shade_store = self._objects
+            moved: numpy.ndarray = numpy.zeros(0, dtype=numpy.intp)
+        else:
+            moved = self._objects.moved_since(self._shade_version)
+        self._shade_version = self._objects.move_version
+        lighting_key: tuple = self.lighting.key()
+
+        shades: dict[int, numpy.ndarray] = {}
+        for template_id, template in enumerate(templates):
+            if len(template.face_indices) == 0:
+                continue
+            group: numpy.ndarray = handles[template_ids == template_id]
+            cached: tuple | None = self._shade_cache.get(template_id)
+            if (
+                cached is None
+                or cached[0] is not template
+                or cached[1] != lighting_key
+                or not numpy.array_equal(cached[2], group)
+            ):
+                cached = (
+                    template,
+                    lighting_key,
+                    group,
+                    self._shade_group(template, group),
+                )
+                self._shade_cache[template_id] = cached
+            elif len(moved):
+                rows: numpy.ndarray = numpy.searchsorted(group, moved)
+                found: numpy.ndarray = rows < len(group)
+                found[found] = group[rows[found]] == moved[found]
+                rows = rows[found]
+                if len(rows):
+                    cached[3][rows] = self._shade_group(template, group[rows])
+            shades[template_id] = cached[3]
+        return shades
+
+    def _prepare_groups(self, templates: list[Object3DTemplate]) -> None:
+        handles: numpy.ndarray = self._objects.alive()
+        template_ids: numpy.ndarray = self._objects.template_ids[handles]
+        positions: numpy.ndarray = self._objects.world_positions
+        matrices: numpy.ndarray = self._objects.world_matrices
+
+        def transform(
+            vertices: numpy.ndarray, group: numpy.ndarray
+        ) -> tuple[numpy.ndarray, ...]:
+            world: numpy.ndarray = positions[group, None, :] + numpy.einsum(
+                "nij,vj->nvi", matrices[group], vertices
+            )
+            low: numpy.ndarray = world.min(axis=1)
+            high: numpy.ndarray = world.max(axis=1)
+            return world, (low + high) / 2, numpy.linalg.norm(high - low, axis=1) / 2
+
+        self._frame_groups = []
+        for template_id, template in enumerate(templates):
+            group: numpy.ndarray = handles[template_ids == template_id]
+            if len(group) == 0:
+                continue
+            world, centers, radii = self._pool.map(
+                f"transform:{template.name}",
+                lambda group: transform(template.vertex_array, group),
+                group,
+            )
+            self._frame_groups.append(
+                (template_id, template, group, world, centers, radii)
+            )
+
+    def _cull_groups(self) -> list[tuple]:
+        rotation_matrix: numpy.ndarray = self._camera.rotation_matrix()
+        near: float = -self._camera.distance + 0.01
+        tan_x: float = self._win_width / 2 / self._camera.depth_scaling
+        tan_y: float = self._win_height / 2 / self._camera.depth_scaling
+
+        def cull(
+            centers: numpy.ndarray, radii: numpy.ndarray
+        ) -> tuple[numpy.ndarray, ...]:
+            camera: numpy.ndarray = (centers - self._camera.focus) @ rotation_matrix.T
+            depth: numpy.ndarray = camera[:, 2] + self._camera.distance
+            visible: numpy.ndarray = (
+                (camera[:, 2] + radii > near)
+                & (camera[:, 2] - radii < self._camera.far_plane)
+                & (
+                    numpy.abs(camera[:, 0]) - depth * tan_x
+                    <= radii * numpy.sqrt(1 + tan_x**2)
+                )
+                & (
+                    numpy.abs(camera[:, 1]) - depth * tan_y
+                    <= radii * numpy.sqrt(1 + tan_y**2)
+                )
+            )
+            return (visible,)
+
+        views: list[tuple] = []
+        for template_id, template, group, world, centers, radii in self._frame_groups:
+            (visible,) = self._pool.map("cull", cull, centers, radii)
+            instances: numpy.ndarray = numpy.flatnonzero(visible)
+            if len(instances):
+                views.append(
+                    (
+                        template_id,
+                        template,
+                        instances,
+                        group[instances],
+                        world[instances],
+                    )
+                )
+        return views
+
+    def _render_faces(
+        self, templates: list[Object3DTemplate], views: list[tuple]
+    ) -> int:
+        rotation_matrix: numpy.ndarray = self._camera.rotation_matrix()
+        eye: numpy.ndarray = (
+            rotation_matrix.T @ numpy.array([0.0, 0.0, -self._camera.distance])
+            + self._camera.focus
+        )
+        near: float = -self._camera.distance + 0.01
+
+        handles: numpy.ndarray = self._objects.alive()
+        template_ids: numpy.ndarray = self._objects.template_ids[handles]
+        shades: dict[int, numpy.ndarray] = self._get_shades(
+            templates, handles, template_ids
+        )
+
+        rendered: int = 0
+        depths: list[numpy.ndarray] = []
+        polygons: list[numpy.ndarray] = []
+        colors: list[numpy.ndarray] = []
+        outlines: list[numpy.ndarray] = []
+        outline_table: list[pygame.Color | None] = []
+        for template_id, template, group_idx, group, world in views:
+            if len(template.face_indices) == 0:
+                continue
+            local_eye: numpy.ndarray = numpy.einsum(
+                "nij,ni->nj",
+                self._objects.normal_matrices(group),
+                eye - self._objects.world_positions[group],
+            )
+            visible: numpy.ndarray = (
+                (local_eye @ template.face_normals.T) > template.face_offsets
+            ) | template.face_double_sided
+
+            screen, depth = self._pool.map(
+                f"project:{template.name}", self._project_points, world
+            )
+            face_depth: numpy.ndarray = depth[:, template.face_indices]
+            face_screen: numpy.ndarray = screen[:, template.face_indices]
+            visible &= (face_depth > near).all(axis=2)
+            visible &= (face_depth < self._camera.far_plane).all(axis=2)
+            visible &= (face_screen.max(axis=2) >= 0).all(axis=2)
+            visible &= face_screen[..., 0].min(axis=2) <= self._win_width
+            visible &= face_screen[..., 1].min(axis=2) <= self._win_height
+
+            instances, faces = numpy.nonzero(visible)
+            rendered += len(numpy.unique(instances))
+            depths.append(face_depth[instances, faces].mean(axis=1))
+            polygons.append(face_screen[instances, faces])
+            colors.append(shades[template_id][group_idx[instances], faces])
+            outlines.append(faces + len(outline_table))
+            outline_table.extend(template.face_outlines)
+
+        for idx, grid in self._voxel_grids.items():
+            if len(grid.faces) == 0:
+                continue
+            _, corners = grid.faces.arrays()
+            screen, depth = self._project_points(corners)
+            visible = (
+                numpy.einsum("fi,fi->f", eye - corners[:, 0], grid.face_normals()) > 0
+            )
+            visible &= (depth > near).all(axis=1)
+            visible &= (depth < self._camera.far_plane).all(axis=1)
+            visible &= (screen.max(axis=1) >= 0).all(axis=1)
+            visible &= screen[..., 0].min(axis=1) <= self._win_width
+            visible &= screen[..., 1].min(axis=1) <= self._win_height
+
+            faces: numpy.ndarray = numpy.flatnonzero(visible)
+            depths.append(depth[faces].mean(axis=1))
+            polygons.append(screen[faces])
+            colors.append(self._get_voxel_shades(idx, grid)[faces])
+            outlines.append(numpy.full(len(faces), len(outline_table)))
+            outline_table.append(pygame.Color(*grid.line_color.tolist()))
+
+        if not depths:
+            return rendered
+
+        size: int = max(polygon.shape[1] for polygon in polygons)
+        polygons = [
+            numpy.concatenate(
+                (polygon, numpy.repeat(polygon[:, -1:], size - polygon.shape[1], 1)),
+                axis=1,
+            )
+            for polygon in polygons
+        ]
+
+        order: numpy.ndarray = numpy.argsort(-numpy.concatenate(depths), kind="stable")
+        if self._raster:
+            outline_idx: numpy.ndarray = numpy.concatenate(outlines)[order]
+            outline_colors: numpy.ndarray = numpy.array(
+                [
+                    (0, 0, 0) if color is None else tuple(color)[:3]
+                    for color in outline_table
+                ],
+                dtype=numpy.uint8,
+            )
+            outlined: numpy.ndarray = numpy.array(
+                [color is not None for color in outline_table], dtype=bool
+            )
+            kernels.fill_polygons(
+                self._framebuffer,
+                numpy.concatenate(polygons)[order],
+                numpy.concatenate(colors)[order],
+                outline_colors[outline_idx],
+                outlined[outline_idx],
+            )
+            return rendered
+
+        for polygon, color, outline_idx in zip(
+            numpy.concatenate(polygons)[order].tolist(),
+            numpy.concatenate(colors)[order].tolist(),
+            numpy.concatenate(outlines)[order].tolist(),
+        ):
+            pygame.draw.polygon(self._window, color, polygon)
+            outline: pygame.Color | None = outline_table[outline_idx]
+            if outline is not None:
+                pygame.draw.polygon(self._window, outline, polygon, 1)
+
+        return rendered
+
+    def _render_wireframes(
+        self, views: list[tuple]
+    ) -> tuple[int, numpy.ndarray, numpy.ndarray]:
+        rendered: int = 0
+        starts: list[numpy.ndarray] = [numpy.zeros((0, 2))]
+        ends: list[numpy.ndarray] = [numpy.zeros((0, 2))]
+        colors: list[numpy.ndarray] = [numpy.zeros((0, 3), dtype=numpy.uint8)]
+        points: list[numpy.ndarray] = [numpy.zeros((0, 2))]
+        point_colors: list[numpy.ndarray] = [numpy.zeros((0, 3), dtype=numpy.uint8)]
+        for _, template, _, group, world in views:
+            if self._solid and len(template.face_indices):
+                continue
+            rendered += len(group)
+
+            screen, depth = self._pool.map(
+                f"project:{template.name}", self._project_points, world
+            )
+            in_depth: numpy.ndarray = (depth >= -self._camera.distance) & (
+                depth <= self._camera.far_plane
+            )
+
+            instances, lines = numpy.nonzero(
+                in_depth[:, template.line_indices].all(axis=2)
+            )
+            starts.append(screen[instances, template.line_indices[lines, 0]])
+            ends.append(screen[instances, template.line_indices[lines, 1]])
+            colors.append(template.line_color_array[lines])
+
+            point_screen: numpy.ndarray = screen[:, template.point_indices]
+            instances, point_ids = numpy.nonzero(
+                in_depth[:, template.point_indices]
+                & (point_screen > 0).all(axis=2)
+                & (point_screen[..., 0] < self._win_width)
+                & (point_screen[..., 1] < self._win_height)
+            )
+            points.append(point_screen[instances, point_ids])
+            point_colors.append(template.point_color_array[point_ids])
+
+        if not self._solid:
+            for grid in self._voxel_grids.values():
+                lines, line_colors = self._voxel_lines(grid)
+                starts.append(lines[:, 0])
+                ends.append(lines[:, 1])
+                colors.append(line_colors)
+
+        kernels.draw_lines(
+            self._framebuffer,
+            numpy.concatenate(starts),
+            numpy.concatenate(ends),
+            numpy.concatenate(colors),
+        )
+        return rendered, numpy.concatenate(points), numpy.concatenate(point_colors)
+
+    def _voxel_lines(self, grid: VoxelGrid) -> tuple[numpy.ndarray, numpy.ndarray]:
+        _, edges = grid.edges.arrays()
+        screen, depth = self._project_points(edges)
+        lines: numpy.ndarray = screen[
+            ((depth >= -self._camera.distance) & (depth <= self._camera.far_plane)).all(
+                axis=1
+            )
+        ]
+        return lines, numpy.broadcast_to(grid.line_color, (len(lines), 3))
+
+    def _render_point_clouds(self) -> int:
+        if self._zbuffer.shape != (self._win_width, self._win_height):
+            self._zbuffer = numpy.zeros(
+                (self._win_width, self._win_height), dtype=numpy.float32
+            )
+        self._zbuffer.fill(numpy.inf)
+        rotation: numpy.ndarray = self._camera.rotation_matrix().astype(numpy.float32)
+        offset: numpy.ndarray = rotation @ self._camera.focus.astype(numpy.float32)
+        distance: numpy.float32 = numpy.float32(self._camera.distance)
+        depth_scaling: numpy.float32 = numpy.float32(self._camera.depth_scaling)
+        near: float = -self._camera.distance + 0.01
+        half_width: numpy.float32 = numpy.float32(self._win_width / 2)
+        half_height: numpy.float32 = numpy.float32(self._win_height / 2)
+
+        rendered: int = 0
+        for cloud in self._point_clouds.values():
+            for (x, y, z), colors in cloud.chunks():
+                camera: list[numpy.ndarray] = [
+                    x * row[0] + y * row[1] + z * row[2] - shift
+                    for row, shift in zip(rotation, offset)
+                ]
+                depth: numpy.ndarray = camera[2] + distance
+                f: numpy.ndarray = depth_scaling / numpy.maximum(
+                    depth, numpy.float32(1e-5)
+                )
+                screen_x: numpy.ndarray = camera[0] * f + half_width
+                screen_y: numpy.ndarray = half_height - camera[1] * f
+                visible: numpy.ndarray = (
+                    (camera[2] > near)
+                    & (camera[2] < self._camera.far_plane)
+                    & (screen_x >= 0)
+                    & (screen_x < self._win_width)
+                    & (screen_y >= 0)
+                    & (screen_y < self._win_height)
+                )
+                kernels.splat_points(
+                    self._framebuffer,
+                    self._zbuffer,
+                    numpy.where(
+                        visible,
+                        screen_x.astype(numpy.int64) * self._win_height
+                        + screen_y.astype(numpy.int64),
+                        -1,
+                    ),
+                    depth,
+                    colors,
+                )
+                rendered += int(numpy.count_nonzero(visible))
+        return rendered
+
+    def _render_view(self, templates: list[Object3DTemplate]) -> None:
+        views: list[tuple] = self._cull_groups()
+        if self._raster:
+            self._framebuffer.fill(0)
+            if self._solid:
+                self._current_rendered += self._render_faces(templates, views)
+            rendered, points, point_colors = self._render_wireframes(views)
+            self._current_rendered += rendered
+            if self._point_clouds:
+                self._current_points += self._render_point_clouds()
+            pygame.surfarray.blit_array(self._window, self._framebuffer)
+            for point, color in zip(points.tolist(), point_colors.tolist()):
+                pygame.draw.circle(self._window, color, point, 3)
+            self._render_point(self._camera.focus, pygame.Color(255, 0, 0), 10)
+            return
+
+        if self._solid:
+            self._current_rendered += self._render_faces(templates, views)
+
+        for _, template, _, _, world in views:
+            if self._solid and len(template.face_indices):
+                continue
+            for vertices in world:
+                self._current_rendered += self._render_object(template, vertices)
+
+        if not self._solid:
+            for grid in self._voxel_grids.values():
+                lines, _ = self._voxel_lines(grid)
+                color: pygame.Color = pygame.Color(*grid.line_color.tolist())
+                for start, end in lines.tolist():
+                    pygame.draw.line(self._window, color, start, end)
+
+        if self._point_clouds:
+            self._framebuffer.fill(0)
+            self._current_points += self._render_point_clouds()
+            layer: pygame.Surface = pygame.surfarray.make_surface(self._framebuffer)
+            layer.set_colorkey((0, 0, 0))
+            self._window.blit(layer, (0, 0))
 
         self._render_point(self._camera.focus, pygame.Color(255, 0, 0), 10)
 
         if self._debug_mode:
             self._render_object
 
+    def _render_objects(self) -> None:
+        self._current_rendered = 0
+        self._current_points = 0
+        self._objects.update_transforms()
+        templates: list[Object3DTemplate] = self._get_templates()
+        self._prepare_groups(templates)
+        if not self._viewports:
+            self._render_view(templates)
+            return
+
+        for viewport in self._viewports:
+            with self._use_viewport(viewport) as rect:
+                self._render_view(templates)
+            pygame.draw.rect(
+                self._window,
+                (200, 200, 200) if viewport.camera is self._camera else (80, 80, 80),
+                rect,
+                1,
+            )
+
     def draw_ui(self) -> None:
         if self._debug_mode:
             debug_text: str = str(
                 f"FPS: {round(self._clock.get_fps(), 2)}\n"
                 + f"Objects (Rendered/Total): {self._current_rendered}/{len(self._objects)}\n"
+                + f"Voxels (Cells/Faces/Edges): "
+                + f"{sum(len(grid) for grid in self._voxel_grids.values())}/"
+                + f"{sum(len(grid.faces) for grid in self._voxel_grids.values())}/"
+                + f"{sum(len(grid.edges) for grid in self._voxel_grids.values())}\n"
+                + f"Points (Rendered/Total): {self._current_points}/"
+                + f"{sum(len(cloud) for cloud in self._point_clouds.values())}\n"
+                + f"Hover: {self.pick(self._mouse_pos)}\n"
+                + f"Resolution: {self._get_resolution_text()}\n"
+                + f"Workers (Threads/Chunk): {self._pool.workers}/"
+                + f"{max(self._pool.chunk_sizes.values(), default=0)}\n"
+                + f"Startup (First Frame): {self._get_startup_text()}\n"
+                + "\n".join(self._get_memory_text())
+                + "\n"
                 + f"Camera Pos: {self._camera.focus}\n"
                 + f"Camera Rot: {numpy.degrees(self._camera.rot)}\n"
             )
@@ -349,12 +1326,16 @@ class Renderer3D(RendererBase):
                 )
                 self._window.blit(debug_label, (10, 10 + idx * line_distance))
 
+    def _stop_workers(self) -> None:
+        self._pool.close()
+
     def _toggle_debug(self) -> None:
         self._debug_mode = not self._debug_mode
         if self._debug_mode:
-            self._debug_cursor_idx = len(self._objects)
-            self.create_object("debug_cursor", self._camera.focus)
+            self._debug_cursor_idx = self.create_object(
+                "debug_cursor", self._camera.focus
+            )
 
-        elif self._debug_cursor_idx:
+        elif self._debug_cursor_idx is not None:
             self._delete_object(self._debug_cursor_idx)
             self._debug_cursor_idx = None
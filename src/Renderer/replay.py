@@ -0,0 +1,104 @@
+import json
+import pygame
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+INPUT_LOG_VERSION: int = 2
+
+
+def encode_event(event: pygame.event.Event) -> dict[str, Any]:
+    attrs: dict[str, Any] = {}
+    for name, value in event.dict.items():
+        if isinstance(value, (bool, int, float, str)) or value is None:
+            attrs[name] = value
+        elif isinstance(value, tuple):
+            attrs[name] = list(value)
+    return {"type": event.type, "attrs": attrs}
+
+
+def decode_event(data: dict[str, Any]) -> pygame.event.Event:
+    attrs: dict[str, Any] = {
+        name: tuple(value) if isinstance(value, list) else value
+        for name, value in data["attrs"].items()
+    }
+    return pygame.event.Event(data["type"], attrs)
+
+
+def scene_path(path: Path | str) -> Path:
+    return Path(path).with_suffix(".scene")
+
+
+class InputRecorder:
+    def __init__(
+        self,
+        path: Path | str,
+        size: tuple[int, int],
+        seed: int,
+        state: dict[str, Any] | None = None,
+    ) -> None:
+        self.path: Path = Path(path)
+        self.frames: int = 0
+        self.time: float = 0.0
+        self._file: TextIO = open(self.path, "w")
+        self._file.write(
+            json.dumps(
+                {
+                    "version": INPUT_LOG_VERSION,
+                    "size": size,
+                    "seed": seed,
+                    "state": state,
+                }
+            )
+            + "\n"
+        )
+
+    def frame(
+        self,
+        dt: float,
+        mouse_pos: tuple[int, int],
+        events: list[pygame.event.Event],
+    ) -> None:
+        self.time += dt
+        self._file.write(
+            json.dumps(
+                {
+                    "t": self.time,
+                    "dt": dt,
+                    "mouse": mouse_pos,
+                    "events": [encode_event(event) for event in events],
+                }
+            )
+            + "\n"
+        )
+        self.frames += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class InputLog:
+    def __init__(self, path: Path | str) -> None:
+        with open(path, "r") as file:
+            header: dict[str, Any] = json.loads(file.readline())
+            if header.get("version") not in (1, INPUT_LOG_VERSION):
+                raise ValueError("Invalid input log")
+            self.path: Path = Path(path)
+            self.size: tuple[int, int] = tuple(header["size"])
+            self.seed: int = header["seed"]
+            self.state: dict[str, Any] | None = header.get("state")
+            self.frames: list[dict[str, Any]] = [
+                json.loads(line) for line in file if line.strip()
+            ]
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __iter__(
+        self,
+    ) -> Iterator[tuple[float, tuple[int, int], list[pygame.event.Event]]]:
+        for frame in self.frames:
+            yield (
+                frame["dt"],
+                tuple(frame["mouse"]),
+                [decode_event(event) for event in frame["events"]],
+            )
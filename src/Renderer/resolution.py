@@ -0,0 +1,53 @@
+class ResolutionScaler:
+    def __init__(
+        self,
+        target_fps: float = 60.0,
+        min_scale: float = 0.25,
+        step: float = 0.05,
+        smoothing: float = 0.2,
+        settle_frames: int = 8,
+    ) -> None:
+        if target_fps <= 0:
+            raise ValueError("Target FPS must be greater than 0")
+        if not 0 < min_scale <= 1:
+            raise ValueError("Minimum scale must be between 0 and 1")
+
+        self.target_fps: float = target_fps
+        self.min_scale: float = min_scale
+        self.step: float = step
+        self.smoothing: float = smoothing
+        self.settle_frames: int = settle_frames
+        self.scale: float = 1.0
+        self.frame_time: float | None = None
+        self.changes: int = 0
+        self._settle: int = 0
+
+    @property
+    def budget(self) -> float:
+        return 1 / self.target_fps
+
+    def update(self, frame_time: float) -> bool:
+        if self.frame_time is None:
+            self.frame_time = frame_time
+        else:
+            self.frame_time += (frame_time - self.frame_time) * self.smoothing
+
+        if self._settle > 0:
+            self._settle -= 1
+            return False
+
+        load: float = self.frame_time / self.budget
+        if 0.85 <= load <= 1.0:
+            return False
+
+        wanted: float = self.scale / load**0.5
+        wanted = min(max(wanted, self.scale * 0.5), self.scale * 1.25)
+        wanted = round(wanted / self.step) * self.step
+        wanted = min(max(wanted, self.min_scale), 1.0)
+        if wanted == self.scale:
+            return False
+
+        self.scale = wanted
+        self.changes += 1
+        self._settle = self.settle_frames
+        return True
@@ -0,0 +1,448 @@
+import os
+import struct
+import numpy
+from pathlib import Path
+
+FLAG_ALIVE: int = 1
+
+SNAPSHOT_MAGIC: bytes = b"DELSCN04"
+SNAPSHOT_MAGIC_V3: bytes = b"DELSCN03"
+SNAPSHOT_MAGIC_V2: bytes = b"DELSCN02"
+SNAPSHOT_MAGIC_V1: bytes = b"DELSCN01"
+SNAPSHOT_ALIGN: int = 64
+
+
+def euler_quaternions(angles: numpy.ndarray) -> numpy.ndarray:
+    cos: numpy.ndarray = numpy.cos(angles / 2)
+    sin: numpy.ndarray = numpy.sin(angles / 2)
+    cx, cy, cz = cos[..., 0], cos[..., 1], cos[..., 2]
+    sx, sy, sz = sin[..., 0], sin[..., 1], sin[..., 2]
+    return numpy.stack(
+        (
+            cz * cy * cx + sz * sy * sx,
+            cz * cy * sx - sz * sy * cx,
+            cz * sy * cx + sz * cy * sx,
+            sz * cy * cx - cz * sy * sx,
+        ),
+        axis=-1,
+    )
+
+
+def quaternion_matrices(quaternions: numpy.ndarray) -> numpy.ndarray:
+    w, x, y, z = numpy.moveaxis(quaternions, -1, 0)
+    return numpy.stack(
+        (
+            1 - 2 * (y * y + z * z),
+            2 * (x * y - w * z),
+            2 * (x * z + w * y),
+            2 * (x * y + w * z),
+            1 - 2 * (x * x + z * z),
+            2 * (y * z - w * x),
+            2 * (x * z - w * y),
+            2 * (y * z + w * x),
+            1 - 2 * (x * x + y * y),
+        ),
+        axis=-1,
+    ).reshape(*quaternions.shape[:-1], 3, 3)
+
+
+class ObjectStore:
+    def __init__(self, dims: int, capacity: int = 64) -> None:
+        self.dims: int = dims
+        self.templates: list[str] = []
+        self._template_ids: dict[str, int] = {}
+
+        self.positions: numpy.ndarray = numpy.zeros((capacity, dims), dtype=float)
+        self.template_ids: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.int32)
+        self.flags: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.uint8)
+
+        self.transforms: bool = dims == 3
+        size: int = dims if self.transforms else 0
+        self.rotations: numpy.ndarray = numpy.zeros((capacity, 4 if size else 0))
+        self.scales: numpy.ndarray = numpy.ones((capacity, size))
+        self.matrices: numpy.ndarray = numpy.zeros((capacity, size, size))
+        self.dirty: numpy.ndarray = numpy.zeros(capacity, dtype=bool)
+        self._has_dirty: bool = False
+
+        self.parents: numpy.ndarray = numpy.full(capacity, -1, dtype=numpy.int32)
+        self.world_dirty: numpy.ndarray = numpy.zeros(capacity, dtype=bool)
+        self.move_stamps: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.int64)
+        self._world_positions: numpy.ndarray | None = None
+        self._world_matrices: numpy.ndarray | None = None
+        self._has_world_dirty: bool = False
+        self._levels: list[numpy.ndarray] | None = None
+
+        self.count: int = 0
+        self._free: list[int] = []
+
+        self.version: int = 0
+        self.move_version: int = 0
+
+    def __len__(self) -> int:
+        return self.count - len(self._free)
+
+    def __contains__(self, idx: int) -> bool:
+        return 0 <= idx < self.count and bool(self.flags[idx] & FLAG_ALIVE)
+
+    def template_id(self, name: str) -> int:
+        if name not in self._template_ids:
+            self._template_ids[name] = len(self.templates)
+            self.templates.append(name)
+        return self._template_ids[name]
+
+    def _grow(self, capacity: int) -> None:
+        capacity = max(capacity, len(self.flags) * 2, 64)
+
+        positions: numpy.ndarray = numpy.zeros((capacity, self.dims), dtype=float)
+        positions[: self.count] = self.positions[: self.count]
+        template_ids: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.int32)
+        template_ids[: self.count] = self.template_ids[: self.count]
+        flags: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.uint8)
+        flags[: self.count] = self.flags[: self.count]
+
+        self.positions, self.template_ids, self.flags = positions, template_ids, flags
+
+        for name in (
+            "rotations",
+            "scales",
+            "matrices",
+            "dirty",
+            "parents",
+            "world_dirty",
+            "move_stamps",
+            "_world_positions",
+            "_world_matrices",
+        ):
+            old: numpy.ndarray | None = getattr(self, name)
+            if old is None:
+                continue
+            new: numpy.ndarray = numpy.zeros((capacity, *old.shape[1:]), old.dtype)
+            new[: self.count] = old[: self.count]
+            setattr(self, name, new)
+
+    def add(self, name: str, pos: numpy.ndarray) -> int:
+        if self._free:
+            idx: int = self._free.pop()
+        else:
+            if self.count == len(self.flags):
+                self._grow(self.count + 1)
+            idx = self.count
+            self.count += 1
+
+        self.positions[idx] = pos
+        self.template_ids[idx] = self.template_id(name)
+        self.flags[idx] = FLAG_ALIVE
+        if self.transforms:
+            self.rotations[idx] = (1.0, 0.0, 0.0, 0.0)
+            self.scales[idx] = 1.0
+            self.matrices[idx] = numpy.eye(self.dims)
+            self.dirty[idx] = False
+        self.parents[idx] = -1
+        self._mark_world(idx)
+        self._levels = None
+        self.version += 1
+        self.move_version += 1
+        self.move_stamps[idx] = self.move_version
+        return idx
+
+    def move(self, idx: int, pos: numpy.ndarray) -> None:
+        if idx not in self:
+            raise KeyError(idx)
+        self.positions[idx] = pos
+        self._mark_world(idx)
+        self.move_version += 1
+        self.move_stamps[idx] = self.move_version
+
+    def set_transforms(
+        self,
+        handles: numpy.ndarray,
+        rotations: numpy.ndarray | None = None,
+        scales: numpy.ndarray | None = None,
+    ) -> None:
+        if not self.transforms:
+            raise ValueError(f"{self.dims}D objects cannot be rotated or scaled")
+        handles = numpy.atleast_1d(numpy.asarray(handles, dtype=numpy.intp))
+        if len(handles) == 0:
+            return
+        if not numpy.all(self.flags[handles] & FLAG_ALIVE):
+            raise KeyError(handles[(self.flags[handles] & FLAG_ALIVE) == 0][0])
+
+        if rotations is not None:
+            rotations = numpy.asarray(rotations, dtype=float)
+            if rotations.shape[-1] == 3:
+                rotations = euler_quaternions(rotations)
+            elif rotations.shape[-1] != 4:
+                raise ValueError("Rotations must be Euler angles or quaternions")
+            self.rotations[handles] = rotations / numpy.linalg.norm(
+                rotations, axis=-1, keepdims=True
+            )
+        if scales is not None:
+            scales = numpy.asarray(scales, dtype=float)
+            if numpy.any(scales == 0):
+                raise ValueError("Scale cannot be 0")
+            self.scales[handles] = scales
+
+        self.dirty[handles] = True
+        self._has_dirty = True
+        self._mark_world(handles)
+        self.move_version += 1
+        self.move_stamps[handles] = self.move_version
+
+    @property
+    def hierarchical(self) -> bool:
+        return self._world_positions is not None
+
+    @property
+    def world_positions(self) -> numpy.ndarray:
+        if self._world_positions is None:
+            return self.positions
+        return self._world_positions
+
+    @property
+    def world_matrices(self) -> numpy.ndarray:
+        if self._world_matrices is None:
+            return self.matrices
+        return self._world_matrices
+
+    def _mark_world(self, handles: int | numpy.ndarray) -> None:
+        if self._world_positions is not None:
+            self.world_dirty[handles] = True
+            self._has_world_dirty = True
+
+    def set_parent(self, handles: numpy.ndarray, parent: int) -> None:
+        if not self.transforms:
+            raise ValueError(f"{self.dims}D objects cannot be grouped")
+        handles = numpy.atleast_1d(numpy.asarray(handles, dtype=numpy.intp))
+        if not numpy.all(self.flags[handles] & FLAG_ALIVE):
+            raise KeyError(handles[(self.flags[handles] & FLAG_ALIVE) == 0][0])
+        if parent != -1:
+            if parent not in self:
+                raise KeyError(parent)
+            ancestor: int = parent
+            while ancestor != -1:
+                if ancestor in handles:
+                    raise ValueError("An object cannot be its own ancestor")
+                ancestor = int(self.parents[ancestor])
+
+        if self._world_positions is None:
+            self._world_positions = self.positions.copy()
+            self._world_matrices = self.matrices.copy()
+            self.world_dirty[: self.count] = True
+        self.parents[handles] = parent
+        self._mark_world(handles)
+        self._levels = None
+        self.move_version += 1
+        self.move_stamps[handles] = self.move_version
+
+    def children(self, idx: int) -> numpy.ndarray:
+        return numpy.flatnonzero(self.parents[: self.count] == idx)
+
+    def _build_levels(self) -> list[numpy.ndarray]:
+        handles: numpy.ndarray = self.alive()
+        depths: numpy.ndarray = numpy.full(self.count, -1, dtype=numpy.int32)
+        remaining: numpy.ndarray = handles[self.parents[handles] >= 0]
+        level: numpy.ndarray = handles[self.parents[handles] < 0]
+        levels: list[numpy.ndarray] = []
+        while len(level):
+            depths[level] = len(levels)
+            levels.append(level)
+            ready: numpy.ndarray = depths[self.parents[remaining]] == len(levels) - 1
+            level, remaining = remaining[ready], remaining[~ready]
+        return levels
+
+    def update_world(self) -> int:
+        if self._world_positions is None or not self._has_world_dirty:
+            return 0
+        if self._levels is None:
+            self._levels = self._build_levels()
+
+        positions: numpy.ndarray = self._world_positions
+        matrices: numpy.ndarray = self._world_matrices
+        updated: int = 0
+        for depth, level in enumerate(self._levels):
+            parents: numpy.ndarray = self.parents[level]
+            if depth:
+                self.world_dirty[level] |= self.world_dirty[parents]
+            dirty: numpy.ndarray = numpy.flatnonzero(self.world_dirty[level])
+            if len(dirty) == 0:
+                continue
+
+            handles: numpy.ndarray = level[dirty]
+            if depth == 0:
+                positions[handles] = self.positions[handles]
+                matrices[handles] = self.matrices[handles]
+            else:
+                parent_matrices: numpy.ndarray = matrices[parents[dirty]]
+                positions[handles] = positions[parents[dirty]] + numpy.einsum(
+                    "nij,nj->ni", parent_matrices, self.positions[handles]
+                )
+                matrices[handles] = parent_matrices @ self.matrices[handles]
+                self.move_stamps[handles] = self.move_version
+            updated += len(handles)
+
+        self.world_dirty[: self.count] = False
+        self._has_world_dirty = False
+        return updated
+
+    def update_transforms(self) -> int:
+        if not self._has_dirty:
+            self.update_world()
+            return 0
+
+        dirty: numpy.ndarray = numpy.flatnonzero(self.dirty[: self.count])
+        self.matrices[dirty] = (
+            quaternion_matrices(self.rotations[dirty]) * self.scales[dirty, None, :]
+        )
+        self.dirty[dirty] = False
+        self._has_dirty = False
+        self.update_world()
+        return len(dirty)
+
+    def moved_since(self, move_version: int) -> numpy.ndarray:
+        self.update_world()
+        return numpy.flatnonzero(
+            (self.move_stamps[: self.count] > move_version)
+            & (self.flags[: self.count] & FLAG_ALIVE).astype(bool)
+        )
+
+    def normal_matrices(self, handles: numpy.ndarray) -> numpy.ndarray:
+        if self._world_matrices is None:
+            return self.matrices[handles] / self.scales[handles, None, :] ** 2
+        return numpy.linalg.inv(self._world_matrices[handles]).swapaxes(1, 2)
+
+    def bounds(
+        self, handles: numpy.ndarray, local: numpy.ndarray
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        mins: numpy.ndarray = local[:, : self.dims]
+        sizes: numpy.ndarray = local[:, self.dims :]
+        if not self.transforms:
+            mins = self.positions[handles] + mins
+            return mins, mins + sizes
+
+        self.update_transforms()
+        matrices: numpy.ndarray = self.world_matrices[handles]
+        centers: numpy.ndarray = self.world_positions[handles] + numpy.einsum(
+            "nij,nj->ni", matrices, mins + sizes / 2
+        )
+        extents: numpy.ndarray = numpy.einsum(
+            "nij,nj->ni", numpy.abs(matrices), sizes / 2
+        )
+        return centers - extents, centers + extents
+
+    def remove(self, idx: int) -> None:
+        if idx not in self:
+            raise KeyError(idx)
+        self.flags[idx] = 0
+        self._free.append(idx)
+        children: numpy.ndarray = self.children(idx)
+        self.parents[children] = -1
+        self.parents[idx] = -1
+        self._mark_world(children)
+        self._levels = None
+        self.version += 1
+
+    def alive(self) -> numpy.ndarray:
+        return numpy.flatnonzero(self.flags[: self.count] & FLAG_ALIVE)
+
+    def save(self, path: Path | str) -> None:
+        self.update_transforms()
+        header: bytearray = bytearray(SNAPSHOT_MAGIC)
+        header += struct.pack("<BQI", self.dims, self.count, len(self.templates))
+        for name in self.templates:
+            encoded: bytes = name.encode()
+            header += struct.pack("<H", len(encoded)) + encoded
+        header += bytes(-len(header) % SNAPSHOT_ALIGN)
+
+        path = Path(path)
+        temp: Path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp, "wb") as file:
+                file.write(header)
+                for array in (
+                    self.positions,
+                    self.template_ids,
+                    self.flags,
+                    self.rotations,
+                    self.scales,
+                    self.parents,
+                    self.matrices,
+                ):
+                    file.write(numpy.ascontiguousarray(array[: self.count]).tobytes())
+                    file.write(bytes(-array[: self.count].nbytes % SNAPSHOT_ALIGN))
+            os.replace(temp, path)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path | str) -> "ObjectStore":
+        with open(path, "rb") as file:
+            magic: bytes = file.read(len(SNAPSHOT_MAGIC))
+            if magic not in (
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_MAGIC_V3,
+                SNAPSHOT_MAGIC_V2,
+                SNAPSHOT_MAGIC_V1,
+            ):
+                raise ValueError("Invalid scene snapshot")
+            dims, count, template_count = struct.unpack("<BQI", file.read(13))
+
+            templates: list[str] = []
+            for _ in range(template_count):
+                (length,) = struct.unpack("<H", file.read(2))
+                templates.append(file.read(length).decode())
+            offset: int = file.tell() + (-file.tell() % SNAPSHOT_ALIGN)
+
+        store: ObjectStore = cls(dims, 0)
+        for name in templates:
+            store.template_id(name)
+        store.count = count
+        if count == 0:
+            return store
+
+        layout: list[tuple[str, type, tuple[int, ...]]] = [
+            ("positions", numpy.float64, (count, dims)),
+            ("template_ids", numpy.int32, (count,)),
+            ("flags", numpy.uint8, (count,)),
+        ]
+        if magic != SNAPSHOT_MAGIC_V1:
+            layout.append(
+                ("rotations", numpy.float64, (count, *store.rotations.shape[1:]))
+            )
+            layout.append(("scales", numpy.float64, (count, *store.scales.shape[1:])))
+        elif store.transforms:
+            store.rotations = numpy.zeros((count, 4))
+            store.rotations[:, 0] = 1.0
+            store.scales = numpy.ones((count, dims))
+        if magic in (SNAPSHOT_MAGIC, SNAPSHOT_MAGIC_V3):
+            layout.append(("parents", numpy.int32, (count,)))
+        else:
+            store.parents = numpy.full(count, -1, dtype=numpy.int32)
+        stored_matrices: bool = magic == SNAPSHOT_MAGIC
+        if stored_matrices:
+            layout.append(
+                ("matrices", numpy.float64, (count, *store.matrices.shape[1:]))
+            )
+
+        for name, dtype, shape in layout:
+            if 0 in shape:
+                setattr(store, name, numpy.zeros(shape, dtype=dtype))
+                continue
+            array: numpy.ndarray = numpy.memmap(
+                path, dtype=dtype, mode="c", offset=offset, shape=shape
+            )
+            setattr(store, name, array)
+            offset += array.nbytes + (-array.nbytes % SNAPSHOT_ALIGN)
+
+        if not stored_matrices:
+            store.matrices = numpy.zeros((count, *store.matrices.shape[1:]))
+        store.dirty = numpy.full(count, store.transforms and not stored_matrices)
+        store._has_dirty = store.transforms and not stored_matrices
+        store.world_dirty = numpy.zeros(count, dtype=bool)
+        store.move_stamps = numpy.zeros(count, dtype=numpy.int64)
+        if (store.parents >= 0).any():
+            store._world_positions = numpy.zeros((count, dims))
+            store._world_matrices = numpy.zeros((count, dims, dims))
+            store._mark_world(slice(None))
+        store._free = numpy.flatnonzero((store.flags & FLAG_ALIVE) == 0).tolist()
+        return store
@@ -0,0 +1,60 @@
+import time
+import pygame
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class StartupProfile:
+    def __init__(self, start: float) -> None:
+        self.start: float = start
+        self.phases: dict[str, float] = {"import": time.perf_counter() - start}
+        self.first_frame: float | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        phase_start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (
+                self.phases.get(name, 0.0) + time.perf_counter() - phase_start
+            )
+
+    def frame_done(self) -> None:
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - self.start
+
+    def report(self) -> dict[str, float]:
+        report: dict[str, float] = dict(self.phases)
+        if self.first_frame is not None:
+            report["first_frame"] = self.first_frame
+        return report
+
+
+class FontCache:
+    def __init__(
+        self,
+        factories: dict[str, Callable[[], pygame.font.Font]],
+        profile: StartupProfile,
+    ) -> None:
+        self._factories: dict[str, Callable[[], pygame.font.Font]] = factories
+        self._fonts: dict[str, pygame.font.Font] = {}
+        self._profile: StartupProfile = profile
+
+    def __getitem__(self, name: str) -> pygame.font.Font:
+        font: pygame.font.Font | None = self._fonts.get(name)
+        if font is None:
+            with self._profile.phase("fonts"):
+                font = self._factories[name]()
+            self._fonts[name] = font
+        return font
+
+    def __setitem__(self, name: str, font: pygame.font.Font) -> None:
+        self._fonts[name] = font
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories or name in self._fonts
+
+    def load_all(self) -> None:
+        for name in self._factories:
+            self[name]
@@ -0,0 +1,94 @@
+import pygame
+from collections import OrderedDict
+from pathlib import Path
+
+
+class Texture:
+    def __init__(self, surface: pygame.Surface) -> None:
+        self.levels: list[pygame.Surface] = [surface]
+        while self.levels[-1].get_width() > 1 or self.levels[-1].get_height() > 1:
+            previous: pygame.Surface = self.levels[-1]
+            self.levels.append(
+                pygame.transform.smoothscale(
+                    previous,
+                    (
+                        max(previous.get_width() // 2, 1),
+                        max(previous.get_height() // 2, 1),
+                    ),
+                )
+            )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "Texture":
+        surface: pygame.Surface = pygame.image.load(path)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return cls(surface)
+
+    def get_level(self, size: tuple[int, int]) -> pygame.Surface:
+        for level in reversed(self.levels):
+            if level.get_width() >= size[0] and level.get_height() >= size[1]:
+                return level
+        return self.levels[0]
+
+
+class TextureCache:
+    def __init__(self, budget: int = 32 * 1024 * 1024) -> None:
+        self.budget: int = budget
+        self.textures: dict[str, Texture] = {}
+        self._surfaces: OrderedDict[tuple[str, int, int], pygame.Surface] = (
+            OrderedDict()
+        )
+        self._levels: dict[tuple[str, int, int], pygame.Surface] = {}
+        self.used: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def set_budget(self, budget: int) -> None:
+        if budget < 0:
+            raise ValueError("Budget cannot be less than 0")
+        self.budget = budget
+        self._evict()
+
+    def add(self, name: str, texture: Texture) -> None:
+        self.textures[name] = texture
+        for key in [key for key in self._levels if key[0] == name]:
+            del self._levels[key]
+        for key in [key for key in self._surfaces if key[0] == name]:
+            self.used -= self._size(self._surfaces.pop(key))
+
+    @staticmethod
+    def _size(surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def _evict(self) -> None:
+        while self.used > self.budget and self._surfaces:
+            _, surface = self._surfaces.popitem(last=False)
+            self.used -= self._size(surface)
+
+    def get(self, name: str, size: tuple[int, int]) -> pygame.Surface:
+        key: tuple[str, int, int] = (name, size[0], size[1])
+        surface: pygame.Surface | None = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        surface = self._levels.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        level: pygame.Surface = self.textures[name].get_level(size)
+        if level.get_size() == size:
+            self._levels[key] = level
+            return level
+        if level.get_width() >= size[0] and level.get_height() >= size[1]:
+            surface = pygame.transform.smoothscale(level, size)
+        else:
+            surface = pygame.transform.scale(level, size)
+
+        self._surfaces[key] = surface
+        self.used += self._size(surface)
+        self._evict()
+        return surface
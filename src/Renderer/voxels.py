@@ -0,0 +1,215 @@
+import numpy
+
+DIRECTIONS: numpy.ndarray = numpy.array(
+    [[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]]
+)
+REBUILD_CELLS: int = 256
+
+
+class SlotList:
+    def __init__(self, width: tuple[int, ...]) -> None:
+        self.ids: numpy.ndarray = numpy.zeros(0, dtype=numpy.int64)
+        self.data: numpy.ndarray = numpy.zeros((0, *width))
+        self.count: int = 0
+        self._slots: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def reset(self, ids: numpy.ndarray, data: numpy.ndarray) -> None:
+        self.ids = ids.copy()
+        self.data = data.copy()
+        self.count = len(ids)
+        self._slots = dict(zip(ids.tolist(), range(len(ids))))
+
+    def add(self, ids: numpy.ndarray, data: numpy.ndarray) -> None:
+        end: int = self.count + len(ids)
+        if end > len(self.ids):
+            capacity: int = max(end, len(self.ids) * 2, 64)
+            grown_ids: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.int64)
+            grown_ids[: self.count] = self.ids[: self.count]
+            grown: numpy.ndarray = numpy.zeros((capacity, *self.data.shape[1:]))
+            grown[: self.count] = self.data[: self.count]
+            self.ids, self.data = grown_ids, grown
+
+        self.ids[self.count : end] = ids
+        self.data[self.count : end] = data
+        self._slots.update(zip(ids.tolist(), range(self.count, end)))
+        self.count = end
+
+    def remove(self, ids: numpy.ndarray) -> None:
+        for idx in ids.tolist():
+            slot: int = self._slots.pop(idx)
+            self.count -= 1
+            if slot != self.count:
+                moved: int = int(self.ids[self.count])
+                self.ids[slot] = moved
+                self.data[slot] = self.data[self.count]
+                self._slots[moved] = slot
+
+    def arrays(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        return self.ids[: self.count], self.data[: self.count]
+
+
+class VoxelGrid:
+    def __init__(
+        self,
+        shape: tuple[int, int, int],
+        origin: tuple[float, float, float] = (0.0, 0.0, 0.0),
+        cell_size: float = 1.0,
+        color: tuple[int, int, int] = (90, 90, 90),
+        line_color: tuple[int, int, int] = (255, 255, 255),
+    ) -> None:
+        if len(shape) != 3 or min(shape) < 1:
+            raise ValueError("Voxel grids need three sizes of at least 1")
+        if cell_size <= 0:
+            raise ValueError("Cell size must be greater than 0")
+
+        self.shape: tuple[int, int, int] = tuple(shape)
+        self.origin: numpy.ndarray = numpy.array(origin, dtype=float)
+        self.cell_size: float = cell_size
+        self.color: numpy.ndarray = numpy.array(color, dtype=float)
+        self.line_color: numpy.ndarray = numpy.array(line_color, dtype=numpy.uint8)
+        self.version: int = 0
+
+        self._lattice: tuple[int, int, int] = tuple(size + 1 for size in shape)
+        self.cells: numpy.ndarray = numpy.zeros(shape, dtype=bool)
+        self._faces: numpy.ndarray = numpy.zeros((6, *shape), dtype=bool)
+        self._edge_refs: numpy.ndarray = numpy.zeros((3, *self._lattice), numpy.uint8)
+        self.faces: SlotList = SlotList((4, 3))
+        self.edges: SlotList = SlotList((2, 3))
+
+    def __len__(self) -> int:
+        return int(self.cells.sum())
+
+    def _face_corners(self, ids: numpy.ndarray) -> numpy.ndarray:
+        direction, *cell = numpy.unravel_index(ids, self._faces.shape)
+        axis: numpy.ndarray = direction // 2
+        start: numpy.ndarray = numpy.stack(cell, axis=1)
+        start[numpy.arange(len(ids)), axis] += direction % 2 == 0
+        u: numpy.ndarray = numpy.eye(3, dtype=int)[(axis + 1) % 3]
+        v: numpy.ndarray = numpy.eye(3, dtype=int)[(axis + 2) % 3]
+        return numpy.stack((start, start + u, start + u + v, start + v), axis=1)
+
+    def _edge_ids(self, corners: numpy.ndarray) -> numpy.ndarray:
+        starts: numpy.ndarray = corners[:, [0, 3, 0, 1]].reshape(-1, 3)
+        ends: numpy.ndarray = corners[:, [1, 2, 3, 2]].reshape(-1, 3)
+        axis: numpy.ndarray = numpy.argmax(ends != starts, axis=1)
+        return (
+            numpy.ravel_multi_index((axis, *starts.T), self._edge_refs.shape)
+            .reshape(-1, 4)
+            .ravel()
+        )
+
+    def _edge_points(self, ids: numpy.ndarray) -> numpy.ndarray:
+        axis, *point = numpy.unravel_index(ids, self._edge_refs.shape)
+        start: numpy.ndarray = numpy.stack(point, axis=1)
+        return (
+            numpy.stack((start, start + numpy.eye(3, dtype=int)[axis]), axis=1)
+            * self.cell_size
+            + self.origin
+        )
+
+    def _world(self, corners: numpy.ndarray) -> numpy.ndarray:
+        return corners * self.cell_size + self.origin
+
+    def rebuild(self) -> None:
+        padded: numpy.ndarray = numpy.pad(self.cells, 1)
+        for direction, offset in enumerate(DIRECTIONS):
+            neighbors: numpy.ndarray = numpy.roll(padded, -offset, axis=(0, 1, 2))
+            self._faces[direction] = self.cells & ~neighbors[1:-1, 1:-1, 1:-1]
+
+        face_ids: numpy.ndarray = numpy.flatnonzero(self._faces)
+        corners: numpy.ndarray = self._face_corners(face_ids)
+        self.faces.reset(face_ids, self._world(corners))
+
+        refs: numpy.ndarray = numpy.bincount(
+            self._edge_ids(corners), minlength=self._edge_refs.size
+        )
+        self._edge_refs = refs.astype(numpy.uint8).reshape(self._edge_refs.shape)
+        edge_ids: numpy.ndarray = numpy.flatnonzero(refs)
+        self.edges.reset(edge_ids, self._edge_points(edge_ids))
+        self.version += 1
+
+    def fill(
+        self,
+        low: tuple[int, int, int],
+        high: tuple[int, int, int],
+        value: bool = True,
+    ) -> None:
+        self.cells[low[0] : high[0], low[1] : high[1], low[2] : high[2]] = value
+        self.rebuild()
+
+    def set_cells(self, cells: numpy.ndarray, values: numpy.ndarray | bool) -> None:
+        cells = numpy.asarray(cells, dtype=int).reshape(-1, 3)
+        if ((cells < 0) | (cells >= self.shape)).any():
+            raise IndexError("Voxel cell outside the grid")
+        values = numpy.broadcast_to(numpy.asarray(values, dtype=bool), len(cells))
+        changed: numpy.ndarray = self.cells[tuple(cells.T)] != values
+        cells, values = cells[changed], values[changed]
+        if len(cells) == 0:
+            return
+
+        self.cells[tuple(cells.T)] = values
+        if len(cells) > REBUILD_CELLS:
+            self.rebuild()
+            return
+
+        neighbors: numpy.ndarray = cells[:, None, :] + DIRECTIONS
+        affected: numpy.ndarray = numpy.concatenate(
+            (
+                numpy.repeat(cells, 6, axis=0),
+                neighbors.reshape(-1, 3),
+            )
+        )
+        directions: numpy.ndarray = numpy.concatenate(
+            (
+                numpy.tile(numpy.arange(6), len(cells)),
+                numpy.tile(numpy.arange(6) ^ 1, len(cells)),
+            )
+        )
+        inside: numpy.ndarray = ((affected >= 0) & (affected < self.shape)).all(axis=1)
+        affected, directions = affected[inside], directions[inside]
+        face_ids: numpy.ndarray = numpy.unique(
+            numpy.ravel_multi_index((directions, *affected.T), self._faces.shape)
+        )
+        self._update_faces(face_ids)
+        self.version += 1
+
+    def _update_faces(self, face_ids: numpy.ndarray) -> None:
+        direction, *cell = numpy.unravel_index(face_ids, self._faces.shape)
+        cell = numpy.stack(cell, axis=1)
+        neighbor: numpy.ndarray = cell + DIRECTIONS[direction]
+        outside: numpy.ndarray = ((neighbor < 0) | (neighbor >= self.shape)).any(axis=1)
+        neighbor = numpy.clip(neighbor, 0, numpy.array(self.shape) - 1)
+        flags: numpy.ndarray = self.cells[tuple(cell.T)] & (
+            outside | ~self.cells[tuple(neighbor.T)]
+        )
+
+        flat_faces: numpy.ndarray = self._faces.reshape(-1)
+        added: numpy.ndarray = face_ids[flags & ~flat_faces[face_ids]]
+        removed: numpy.ndarray = face_ids[~flags & flat_faces[face_ids]]
+        flat_faces[added] = True
+        flat_faces[removed] = False
+
+        self.faces.remove(removed)
+        added_corners: numpy.ndarray = self._face_corners(added)
+        self.faces.add(added, self._world(added_corners))
+
+        refs: numpy.ndarray = self._edge_refs.reshape(-1)
+        removed_edges: numpy.ndarray = self._edge_ids(self._face_corners(removed))
+        numpy.subtract.at(refs, removed_edges, 1)
+        added_edges: numpy.ndarray = self._edge_ids(added_corners)
+        numpy.add.at(refs, added_edges, 1)
+
+        removed_edges = numpy.unique(removed_edges)
+        added_edges = numpy.unique(added_edges)
+        self.edges.remove(removed_edges[refs[removed_edges] == 0])
+        new_edges: numpy.ndarray = numpy.setdiff1d(
+            added_edges[refs[added_edges] > 0], self.edges.ids[: self.edges.count]
+        )
+        self.edges.add(new_edges, self._edge_points(new_edges))
+
+    def face_normals(self) -> numpy.ndarray:
+        ids, _ = self.faces.arrays()
+        return DIRECTIONS[ids // self.cells.size].astype(float)
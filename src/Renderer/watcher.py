@@ -0,0 +1,66 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+
+class FileWatcher:
+    def __init__(
+        self,
+        directories: list[Path],
+        suffixes: tuple[str, ...],
+        callback: Callable[[Path], None],
+        interval: float = 0.5,
+    ) -> None:
+        self.directories: list[Path] = directories
+        self.suffixes: tuple[str, ...] = suffixes
+        self.callback: Callable[[Path], None] = callback
+        self.interval: float = interval
+        self._stamps: dict[Path, tuple[int, int]] = {}
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        stamps: dict[Path, tuple[int, int]] = {}
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith(self.suffixes):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                stamps[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def poll(self) -> list[Path]:
+        stamps: dict[Path, tuple[int, int]] = self._scan()
+        changed: list[Path] = [
+            path for path, stamp in stamps.items() if self._stamps.get(path) != stamp
+        ]
+        self._stamps = stamps
+        return changed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            for path in self.poll():
+                self.callback(path)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stamps = self._scan()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
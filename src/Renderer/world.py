@@ -0,0 +1,225 @@
+import json
+import queue
+import threading
+import numpy
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+WORLD_VERSION: int = 1
+CHUNK_MAGIC: bytes = b"DELCHK01"
+CHUNK_DTYPE: numpy.dtype = numpy.dtype([("pos", "<f4", 2), ("template", "<u2")])
+
+
+def chunk_path(path: Path, key: tuple[int, int]) -> Path:
+    return path / "chunks" / f"{key[0]}_{key[1]}.chunk"
+
+
+class WorldWriter:
+    def __init__(
+        self, path: Path | str, templates: list[str], chunk_size: float = 32.0
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be greater than 0")
+        if len(templates) > numpy.iinfo(numpy.uint16).max:
+            raise ValueError("Too many templates")
+        self.path: Path = Path(path)
+        self.templates: list[str] = templates
+        self.chunk_size: float = chunk_size
+        self.counts: dict[tuple[int, int], int] = {}
+        (self.path / "chunks").mkdir(parents=True, exist_ok=True)
+
+    def add(self, positions: numpy.ndarray, template_ids: numpy.ndarray) -> None:
+        positions = numpy.asarray(positions, dtype=float).reshape(-1, 2)
+        keys: numpy.ndarray = numpy.floor(positions / self.chunk_size).astype(
+            numpy.int64
+        )
+        order: numpy.ndarray = numpy.lexsort((keys[:, 1], keys[:, 0]))
+
+        records: numpy.ndarray = numpy.empty(len(positions), dtype=CHUNK_DTYPE)
+        records["pos"] = positions - keys * self.chunk_size
+        records["template"] = template_ids
+        records, keys = records[order], keys[order]
+
+        unique, starts = numpy.unique(keys, axis=0, return_index=True)
+        ends: list[int] = [*starts[1:].tolist(), len(records)]
+        for key, start, end in zip(map(tuple, unique.tolist()), starts.tolist(), ends):
+            with open(chunk_path(self.path, key), "ab") as file:
+                if key not in self.counts:
+                    file.truncate(0)
+                    file.write(CHUNK_MAGIC)
+                file.write(records[start:end].tobytes())
+            self.counts[key] = self.counts.get(key, 0) + end - start
+
+    def close(self) -> None:
+        with open(self.path / "world.json", "w") as file:
+            json.dump(
+                {
+                    "version": WORLD_VERSION,
+                    "chunk_size": self.chunk_size,
+                    "templates": self.templates,
+                    "chunks": [[*key, count] for key, count in self.counts.items()],
+                },
+                file,
+            )
+
+
+class WorldChunk:
+    __slots__ = ("key", "origin", "positions", "template_ids", "nbytes")
+
+    def __init__(
+        self, key: tuple[int, int], chunk_size: float, records: numpy.ndarray
+    ) -> None:
+        self.key: tuple[int, int] = key
+        self.origin: numpy.ndarray = numpy.array(key, dtype=float) * chunk_size
+        self.positions: numpy.ndarray = numpy.ascontiguousarray(records["pos"])
+        self.template_ids: numpy.ndarray = numpy.ascontiguousarray(records["template"])
+        self.nbytes: int = self.positions.nbytes + self.template_ids.nbytes
+
+
+class WorldStreamer:
+    def __init__(
+        self,
+        path: Path | str,
+        budget: int = 256 << 20,
+        on_load: Callable[[], None] | None = None,
+    ) -> None:
+        self.path: Path = Path(path)
+        with open(self.path / "world.json", "r") as file:
+            meta: dict = json.load(file)
+        if meta.get("version") != WORLD_VERSION:
+            raise ValueError("Invalid world")
+
+        self.chunk_size: float = meta["chunk_size"]
+        self.templates: list[str] = meta["templates"]
+        self.counts: dict[tuple[int, int], int] = {
+            (x, y): count for x, y, count in meta["chunks"]
+        }
+        self.budget: int = budget
+        self._on_load: Callable[[], None] | None = on_load
+
+        self.nbytes: int = 0
+        self.loads: int = 0
+        self.evictions: int = 0
+        self.error: Exception | None = None
+        self._chunks: OrderedDict[tuple[int, int], WorldChunk] = OrderedDict()
+        self._wanted: set[tuple[int, int]] = set()
+        self._pending: set[tuple[int, int]] = set()
+        self._ready: list[WorldChunk] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._queue: queue.Queue[tuple[int, int] | None] = queue.Queue()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name="WorldStreamer", daemon=True
+        )
+        self._thread.start()
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def loaded(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def keys_in(self, low: numpy.ndarray, high: numpy.ndarray) -> list[tuple[int, int]]:
+        first: numpy.ndarray = numpy.floor(low / self.chunk_size).astype(int)
+        last: numpy.ndarray = numpy.floor(high / self.chunk_size).astype(int)
+        if numpy.prod(last - first + 1) > len(self.counts):
+            return [
+                key
+                for key in self.counts
+                if first[0] <= key[0] <= last[0] and first[1] <= key[1] <= last[1]
+            ]
+        return [
+            (x, y)
+            for x in range(first[0], last[0] + 1)
+            for y in range(first[1], last[1] + 1)
+            if (x, y) in self.counts
+        ]
+
+    def _check(self) -> None:
+        if self.error is not None:
+            raise RuntimeError(f"Streaming {self.path} failed") from self.error
+
+    def request(self, keys: list[tuple[int, int]]) -> None:
+        self._check()
+        wanted: list[tuple[int, int]] = []
+        size: int = 0
+        for key in keys:
+            size += self.counts[key] * CHUNK_DTYPE.itemsize
+            if size > self.budget:
+                break
+            wanted.append(key)
+        self._wanted = set(wanted)
+
+        with self._lock:
+            for key in wanted:
+                if key in self._chunks:
+                    self._chunks.move_to_end(key)
+                elif key not in self._pending:
+                    self._pending.add(key)
+                    self._queue.put(key)
+
+    def poll(self) -> list[WorldChunk]:
+        self._check()
+        with self._lock:
+            ready, self._ready = self._ready, []
+            for chunk in ready:
+                self._pending.discard(chunk.key)
+                self._chunks[chunk.key] = chunk
+                self.nbytes += chunk.nbytes
+                self.loads += 1
+
+        for key in list(self._chunks):
+            if self.nbytes <= self.budget:
+                break
+            if key in self._wanted:
+                continue
+            self.nbytes -= self._chunks.pop(key).nbytes
+            self.evictions += 1
+        return ready
+
+    def chunks_in(self, low: numpy.ndarray, high: numpy.ndarray) -> list[WorldChunk]:
+        return [
+            self._chunks[key] for key in self.keys_in(low, high) if key in self._chunks
+        ]
+
+    def _load(self, key: tuple[int, int]) -> WorldChunk:
+        path: Path = chunk_path(self.path, key)
+        with open(path, "rb") as file:
+            if file.read(len(CHUNK_MAGIC)) != CHUNK_MAGIC:
+                raise ValueError(f"Invalid world chunk {path.name}")
+        return WorldChunk(
+            key,
+            self.chunk_size,
+            numpy.fromfile(path, dtype=CHUNK_DTYPE, offset=len(CHUNK_MAGIC)),
+        )
+
+    def _run(self) -> None:
+        while True:
+            key: tuple[int, int] | None = self._queue.get()
+            if key is None:
+                break
+            if key not in self._wanted:
+                with self._lock:
+                    self._pending.discard(key)
+                continue
+
+            try:
+                chunk: WorldChunk = self._load(key)
+            except (OSError, ValueError) as error:
+                with self._lock:
+                    self._pending.discard(key)
+                    self.error = error
+            else:
+                with self._lock:
+                    self._ready.append(chunk)
+            if self._on_load is not None:
+                self._on_load()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
@@ -28,6 +28,14 @@ class Button:
             pygame.BUTTON_MIDDLE: False,
             pygame.BUTTON_RIGHT: False,
         }
+        self._text_font: pygame.font.Font | None = None
+        self._text_surface: pygame.Surface | None = None
+
+    def get_text_surface(self, font: pygame.font.Font) -> pygame.Surface:
+        if self._text_surface is None or self._text_font is not font:
+            self._text_font = font
+            self._text_surface = font.render(self.text, True, self.text_color)
+        return self._text_surface
 
     def is_inside(self, pos: tuple[int, int]) -> bool:
         return (
@@ -70,25 +78,34 @@ class Block:
         self.border_width: int = border_width
         self.border_radius: int = border_radius
         self.buttons: dict[str, Button] = {}
+        self.size: tuple[int, int] = self._calc_size()
+        self.screen_size: tuple[int, int] | None = None
+        self.on_change: Callable = lambda: None
+
+    def depends_on_screen(self) -> bool:
+        return "right" in self.anchor or "bottom" in self.anchor
 
-    def update_pos(self, screen_size: tuple[int, int]) -> None:
-        size: tuple[int, int] = self.get_size()
-        self.pos = (
+    def update_pos(self, screen_size: tuple[int, int]) -> bool:
+        self.screen_size = screen_size
+        pos: tuple[int, int] = (
             (
-                screen_size[0] - self.rel_pos[0] - size[0]
+                screen_size[0] - self.rel_pos[0] - self.size[0]
                 if "right" in self.anchor
                 else self.rel_pos[0]
             ),
             (
-                screen_size[1] - self.rel_pos[1] - size[1]
+                screen_size[1] - self.rel_pos[1] - self.size[1]
                 if "bottom" in self.anchor
                 else self.rel_pos[1]
             ),
         )
+        if pos == self.pos:
+            return False
 
-        for idx, button_n_id in enumerate(self.buttons.items()):
-            button_id, button = button_n_id
-            self.buttons[button_id] = self.update_button(button, idx)
+        self.pos = pos
+        for idx, button in enumerate(self.buttons.values()):
+            self.update_button(button, idx)
+        return True
 
     def update_button(self, button: Button, idx: int) -> Button:
         button.pos = (self.pos[0] + self.padding, self.pos[1] + self.padding)
@@ -106,7 +123,7 @@ class Block:
                 )
         return button
 
-    def get_size(self) -> tuple[int, int]:
+    def _calc_size(self) -> tuple[int, int]:
         size = [
             self.button_size[0] + self.padding * 2,
             self.button_size[1] + self.padding * 2,
@@ -120,17 +137,32 @@ class Block:
 
         return size[0], size[1]
 
-    def is_inside(self, pos: tuple[int, int]) -> bool:
-        size = self.get_size()
+    def get_size(self) -> tuple[int, int]:
+        return self.size
 
+    def is_inside(self, pos: tuple[int, int]) -> bool:
         return (
-            self.pos[0] <= pos[0] <= self.pos[0] + size[0]
-            and self.pos[1] <= pos[1] <= self.pos[1] + size[1]
+            self.pos[0] <= pos[0] <= self.pos[0] + self.size[0]
+            and self.pos[1] <= pos[1] <= self.pos[1] + self.size[1]
         )
 
     def add_button(self, button: Button, button_id: str) -> None:
-        button = self.update_button(button, len(self.buttons))
         self.buttons[button_id] = button
+        self.size = self._calc_size()
+
+        if self.screen_size is None or not self.update_pos(self.screen_size):
+            self.update_button(button, len(self.buttons) - 1)
+        self.on_change()
+
+    def remove_button(self, button_id: str) -> Button:
+        button: Button = self.buttons.pop(button_id)
+        self.size = self._calc_size()
+
+        if self.screen_size is None or not self.update_pos(self.screen_size):
+            for idx, other in enumerate(self.buttons.values()):
+                self.update_button(other, idx)
+        self.on_change()
+        return button
 
     def get_buttons(self) -> list[Button]:
         return list(self.buttons.values())
@@ -0,0 +1,29 @@
+from typing import Any
+
+
+class HitGrid:
+    def __init__(self, cell_size: int = 64) -> None:
+        self.cell_size: int = cell_size
+        self.cells: dict[tuple[int, int], list[tuple[tuple[int, ...], Any]]] = {}
+
+    def clear(self) -> None:
+        self.cells = {}
+
+    def insert(self, rect: tuple[int, int, int, int], item: Any) -> None:
+        x, y, width, height = rect
+        for cell_x in range(x // self.cell_size, (x + width) // self.cell_size + 1):
+            for cell_y in range(
+                y // self.cell_size, (y + height) // self.cell_size + 1
+            ):
+                self.cells.setdefault((cell_x, cell_y), []).append((rect, item))
+
+    def query(self, pos: tuple[int, int]) -> list[Any]:
+        cell: tuple[int, int] = (
+            int(pos[0]) // self.cell_size,
+            int(pos[1]) // self.cell_size,
+        )
+        return [
+            item
+            for (x, y, width, height), item in self.cells.get(cell, [])
+            if x <= pos[0] <= x + width and y <= pos[1] <= y + height
+        ]
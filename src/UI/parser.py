@@ -1,9 +1,25 @@
+import re
+import hashlib
 from UI.content import Block, Button
-from typing import Any
+from typing import Any, Callable
 from pathlib import Path
 
+HTML_TOKEN = re.compile(
+    r"<!--.*?-->"
+    r"|<(?P<close>/?)(?P<tag>[A-Za-z][\w-]*)(?P<attrs>(?:\s+[\w-]+=\"[^\"]*\")*)"
+    r"\s*(?P<self_close>/?)>"
+    r"|(?P<text>[^<]+)",
+    re.S,
+)
+HTML_ATTR = re.compile(r"([\w-]+)=\"([^\"]*)\"")
+CSS_TOKEN = re.compile(r"/\*.*?\*/|(?P<symbol>[{};])|(?P<text>[^{};/]+|/)", re.S)
+
 
 class Parser:
+    documents: dict[Path, tuple[bytes, dict]] = {}
+    stylesheets: dict[Path, tuple[bytes, dict]] = {}
+    layouts: dict[Path, tuple[bytes, bytes, list[tuple]]] = {}
+
     @staticmethod
     def merge_default(default: dict, override: dict) -> dict:
         merged: dict = default.copy()
@@ -14,87 +30,90 @@ class Parser:
         return merged
 
     @staticmethod
-    def get_tag(html: str, tag: str) -> tuple[dict, str]:
-        string = html.split("<" + tag, 1)[1]
-        if "</" + tag + ">" in string:
-            items = string.split("</" + tag + ">", 1)
-
-            if ">" in items[0]:
-                data, content = items[0].split(">", 1)
-
-            if len(items) == 1:
-                html = ""
-            else:
-                html = items[1]
-        else:
-            if "/>" in string:
-                data, html = string.split("/>", 1)
-                content = ""
-
-        out: dict = {"content": content}
+    def parse_html(html: str) -> dict:
+        root: dict = {"tag": "", "content": "", "children": []}
+        stack: list[dict] = [root]
 
-        while "=" in data:
-            if data[0] != " ":
-                raise ValueError("Invalid HTML")
-            data = data[1:]
-
-            key, data = data.split("=", 1)
-
-            if data[0] != '"':
+        idx: int = 0
+        while idx < len(html):
+            match = HTML_TOKEN.match(html, idx)
+            if match is None:
                 raise ValueError("Invalid HTML")
-            data = data[1:]
-
-            value, data = data.split('"', 1)
+            idx = match.end()
+
+            if match["text"] is not None:
+                stack[-1]["content"] += match["text"]
+            elif match["tag"] is None:
+                continue
+            elif match["close"]:
+                if len(stack) == 1 or stack[-1]["tag"] != match["tag"]:
+                    raise ValueError("Invalid HTML")
+                stack.pop()
+            else:
+                node: dict = {"tag": match["tag"], "content": "", "children": []}
+                node.update(HTML_ATTR.findall(match["attrs"]))
+                stack[-1]["children"].append(node)
+                if not match["self_close"]:
+                    stack.append(node)
 
-            out[key] = value
+        if len(stack) != 1:
+            raise ValueError("Invalid HTML")
 
-        return out, html
+        return root
 
     @staticmethod
-    def get_tags(html: str, tag_name: str) -> list[dict]:
-        tags: list[dict] = []
-        while "<" + tag_name in html:
-            tag, html = Parser.get_tag(html, tag_name)
-            tags.append(tag)
-        return tags
+    def get_tag(node: dict, tag: str) -> dict:
+        for child in node["children"]:
+            if child["tag"] == tag:
+                return child
+        raise ValueError("Invalid HTML")
 
     @staticmethod
-    def parse(path: Path) -> dict[str, Block]:
-        with open(path / "main.html", "r") as file:
-            html: str = file.read()
+    def get_tags(node: dict, tag: str) -> list[dict]:
+        return [child for child in node["children"] if child["tag"] == tag]
 
-        html = html.replace("\n", "")
-        html = html.replace("\t", "")
+    @staticmethod
+    def read_cached(
+        path: Path, cache: dict[Path, tuple[bytes, dict]], parse: Callable
+    ) -> tuple[bytes, dict]:
+        with open(path, "rb") as file:
+            data: bytes = file.read()
+        digest: bytes = hashlib.blake2b(data).digest()
+
+        cached: tuple[bytes, dict] | None = cache.get(path)
+        if cached is None or cached[0] != digest:
+            cached = (digest, parse(data.decode()))
+            cache[path] = cached
+        return cached
 
-        while "<!--" in html:
-            start = html.find("<!--")
-            end = html.find("-->")
-            html = html[:start] + html[end + 3 :]
+    @staticmethod
+    def compile(path: Path) -> list[tuple]:
+        html_hash, document = Parser.read_cached(
+            path / "main.html", Parser.documents, Parser.parse_html
+        )
 
-        main: dict = Parser.get_tag(html, "main")[0]
+        main: dict = Parser.get_tag(document, "main")
 
-        header: dict = Parser.get_tag(main["content"], "header")[0]
-        body: dict = Parser.get_tag(main["content"], "body")[0]
+        header: dict = Parser.get_tag(main, "header")
+        body: dict = Parser.get_tag(main, "body")
 
-        link: dict = Parser.get_tag(header["content"], "link")[0]
+        link: dict = Parser.get_tag(header, "link")
 
         if link["rel"] != "stylesheet":
             raise ValueError("Invalid HTML")
 
-        css: dict = Parser.parse_css(path / link["href"])
+        css_hash, css = Parser.read_cached(
+            path / link["href"], Parser.stylesheets, Parser.parse_css
+        )
 
-        block_tags: list[dict] = Parser.get_tags(body["content"], "block")
+        cached: tuple[bytes, bytes, list[tuple]] | None = Parser.layouts.get(path)
+        if cached is not None and cached[:2] == (html_hash, css_hash):
+            return cached[2]
 
-        blocks: dict[str, Block] = {}
+        layout: list[tuple] = []
 
-        for block_tag in block_tags:
-            block_id: str = "-1"
-            try:
-                block_id = block_tag["id"]
-            except KeyError:
-                pass
-
-            button_tags: list[dict] = Parser.get_tags(block_tag["content"], "button")
+        for block_tag in Parser.get_tags(body, "block"):
+            block_id: str = block_tag.get("id", "-1")
 
             try:
                 block_css: dict = css["block"][f"#{block_id}"]
@@ -103,36 +122,23 @@ class Parser:
 
             block_css = Parser.merge_default(css["*block"], block_css)
 
-            pos: tuple[int, int] = block_css["position"]
-            size: tuple[int, int] = block_css["size"]
-            direction: str = block_css["direction"]
-            anchor: str = block_css["offset-anchor"]
-            gap: int = block_css["gap"]
-            padding: int = block_css["padding"]
-            background_color: tuple[int, int, int] = block_css["background-color"]
-            border_color: tuple[int, int, int] = block_css["border-color"]
-            border_width: int = block_css["border-width"]
-            border_radius: int = block_css["border-radius"]
-
-            block: Block = Block(
-                pos,
-                size,
-                direction,
-                anchor,
-                gap,
-                padding,
-                background_color,
-                border_color,
-                border_width,
-                border_radius,
+            block_args: tuple = (
+                block_css["position"],
+                block_css["size"],
+                block_css["direction"],
+                block_css["offset-anchor"],
+                block_css["gap"],
+                block_css["padding"],
+                block_css["background-color"],
+                block_css["border-color"],
+                block_css["border-width"],
+                block_css["border-radius"],
             )
 
-            for idx, button_tag in enumerate(button_tags):
-                button_id: str = "-1"
-                try:
-                    button_id = button_tag["id"]
-                except KeyError:
-                    pass
+            buttons: list[tuple[str, tuple]] = []
+
+            for idx, button_tag in enumerate(Parser.get_tags(block_tag, "button")):
+                button_id: str = button_tag.get("id", "-1")
 
                 try:
                     button_css_nth: dict = block_css["button"][f":nth({idx})"]
@@ -148,105 +154,96 @@ class Parser:
 
                 button_css = Parser.merge_default(button_css, button_css_id)
 
-                background_color = button_css["background-color"]
-                text_color = button_css["color"]
-                held_color = button_css["accent-color"]
-                border_color = button_css["border-color"]
-                border_width = button_css["border-width"]
-                border_radius = button_css["border-radius"]
-
-                button = Button(
-                    background_color,
-                    text_color,
-                    held_color,
-                    border_color,
-                    border_width,
-                    border_radius,
-                    button_tag["content"],
+                button_args: tuple = (
+                    button_css["background-color"],
+                    button_css["color"],
+                    button_css["accent-color"],
+                    button_css["border-color"],
+                    button_css["border-width"],
+                    button_css["border-radius"],
+                    button_tag["content"].strip(),
                 )
 
-                block.add_button(button, button_id)
+                buttons.append((button_id, button_args))
 
-            blocks[block_id] = block
+            layout.append((block_id, block_args, buttons))
 
-        return blocks
+        Parser.layouts[path] = (html_hash, css_hash, layout)
+        return layout
 
     @staticmethod
-    def parse_block(css_str: list[str], idx: int) -> tuple[dict, int]:
-        block: dict = {}
-
-        while ";" in css_str[idx]:
-            key, line = css_str[idx][:-1].split(":", 1)
-
-            block[key] = Parser.parse_css_value(line.strip())
+    def build(layout: list[tuple]) -> dict[str, Block]:
+        blocks: dict[str, Block] = {}
 
-            idx += 1
+        for block_id, block_args, buttons in layout:
+            block: Block = Block(*block_args)
 
-        while "}" not in css_str[idx]:
-            if css_str[idx].startswith("button") and "{" in css_str[idx]:
-                if ":nth(" in css_str[idx]:
-                    button_idx: str = (
-                        css_str[idx].split(":nth(")[1].split(") {")[0].strip()
-                    )
-                    block_id: str = ""
-                elif "#" in css_str[idx]:
-                    block_id = css_str[idx].split("#")[1].split("{")[0].strip()
-                    button_idx = ""
+            for button_id, button_args in buttons:
+                block.add_button(Button(*button_args), button_id)
 
-                idx += 1
-
-                button: dict = {}
+            blocks[block_id] = block
 
-                while ";" in css_str[idx]:
-                    key, line = css_str[idx][:-1].split(":", 1)
+        return blocks
 
-                    button[key] = Parser.parse_css_value(line.strip())
+    @staticmethod
+    def parse(path: Path) -> dict[str, Block]:
+        return Parser.build(Parser.compile(path))
 
-                    idx += 1
+    @staticmethod
+    def parse_rule(rule: dict) -> dict:
+        block: dict = rule["declarations"]
 
+        for selector, nested in rule["rules"]:
+            if selector.startswith("button"):
                 if "button" not in block:
                     block["button"] = {}
 
-                if button_idx:
-                    block["button"][f":nth({button_idx})"] = button
-                elif block_id:
-                    block["button"][f"#{block_id}"] = button
+                block["button"][selector[len("button") :].strip()] = Parser.parse_rule(
+                    nested
+                )
 
-            idx += 1
-        return block, idx
+        return block
 
     @staticmethod
-    def parse_css(path: Path) -> dict:
-        with open(path, "r") as file:
-            css_str: list[str] = file.read().split("\n")
-
-        css_str = [line.strip() for line in css_str if line != ""]
+    def parse_css(css_str: str) -> dict:
+        root: dict = {"declarations": {}, "rules": []}
+        stack: list[dict] = [root]
+        text: str = ""
+
+        for match in CSS_TOKEN.finditer(css_str):
+            if match["text"] is not None:
+                text += match["text"]
+                continue
+            if match["symbol"] is None:
+                continue
+
+            if match["symbol"] == "{":
+                rule: dict = {"declarations": {}, "rules": []}
+                stack[-1]["rules"].append((text.strip(), rule))
+                stack.append(rule)
+            else:
+                if ":" in text:
+                    key, value = text.split(":", 1)
+                    stack[-1]["declarations"][key.strip()] = Parser.parse_css_value(
+                        value.strip()
+                    )
+                if match["symbol"] == "}":
+                    if len(stack) == 1:
+                        raise ValueError("Invalid CSS")
+                    stack.pop()
+            text = ""
 
-        while "/*" in css_str:
-            start = css_str.index("/*")
-            end = css_str.index("*/")
-            css_str = css_str[:start] + css_str[end + 2 :]
+        if len(stack) != 1:
+            raise ValueError("Invalid CSS")
 
         css: dict = {"block": {}, "*block": {}, "*button": {}}
 
-        idx: int = 0
-        while idx < len(css_str):
-            if css_str[idx].startswith("*block") and "{" in css_str[idx]:
-                idx += 1
-
-                css["*block"], idx = Parser.parse_block(css_str, idx)
-            elif css_str[idx].startswith("*button") and "{" in css_str[idx]:
-                idx += 1
-
-                css["*button"], idx = Parser.parse_block(css_str, idx)
-            elif css_str[idx].startswith("block") and "{" in css_str[idx]:
-                block_id: str = css_str[idx].split("#")[1].split("{")[0].strip()
-
-                idx += 1
-
-                css["block"][f"#{block_id}"], idx = Parser.parse_block(css_str, idx)
-
-            idx += 1
+        for selector, rule in root["rules"]:
+            if selector in ("*block", "*button"):
+                css[selector] = Parser.parse_rule(rule)
+            elif selector.startswith("block") and "#" in selector:
+                block_id: str = selector.split("#", 1)[1].strip()
+                css["block"][f"#{block_id}"] = Parser.parse_rule(rule)
 
         return css
 
@@ -1,63 +1,135 @@
 import pygame
 from UI.parser import Parser
 from UI.content import Block, Button
+from UI.hit_grid import HitGrid
 from typing import Callable
 from pathlib import Path
 
 
 class UI:
-    def __init__(self, screen_size: tuple[int, int], path: str = "UI/") -> None:
+    def __init__(
+        self, screen_size: tuple[int, int], path: str = "UI/", lazy: bool = False
+    ) -> None:
         self.layout_path: Path = Path.cwd() / path / "layout"
         self.blocks: dict[str, Block] = {}
+        self._layout: list[tuple] | None = None
+        self._anchored_blocks: list[Block] = []
+        self._block_grid: HitGrid = HitGrid()
+        self._button_grid: HitGrid = HitGrid()
+        self._grid_dirty: bool = True
+        self._held_buttons: list[Button] = []
         self.screen_size: tuple[int, int] = screen_size
         self.bound_buttons: dict[str, Callable] = {}
 
-        self.reload()
+        if not lazy:
+            self.reload()
+
+    @property
+    def loaded(self) -> bool:
+        return self._layout is not None
+
+    def _ensure_loaded(self) -> None:
+        if self._layout is None:
+            self.reload()
 
     def update_blocks(self, size: tuple[int, int]) -> None:
         self.screen_size = size
 
-        for block in list(self.blocks.values()):
-            block.update_pos(self.screen_size)
+        for block in self._anchored_blocks:
+            if block.update_pos(self.screen_size):
+                self._grid_dirty = True
 
     def reload(self) -> None:
-        self.blocks = Parser.parse(self.layout_path)
-        self.update_blocks(self.screen_size)
+        layout: list[tuple] = Parser.compile(self.layout_path)
+        if layout is self._layout:
+            return
+
+        self._layout = layout
+        self.blocks = Parser.build(layout)
+        self._anchored_blocks = [
+            block for block in self.blocks.values() if block.depends_on_screen()
+        ]
+        for block in self.blocks.values():
+            block.update_pos(self.screen_size)
+            block.on_change = self._mark_grid_dirty
+        self._held_buttons = []
+        self._grid_dirty = True
         for path, callback in self.bound_buttons.items():
             self.bind_button(path, callback)
 
+    def _mark_grid_dirty(self) -> None:
+        self._grid_dirty = True
+        buttons: list[Button] = self.get_buttons()
+        self._held_buttons = [
+            button for button in self._held_buttons if button in buttons
+        ]
+
+    def add_block(self, block_id: str, block: Block) -> None:
+        self._ensure_loaded()
+        self.blocks[block_id] = block
+        if block.depends_on_screen():
+            self._anchored_blocks.append(block)
+        block.update_pos(self.screen_size)
+        block.on_change = self._mark_grid_dirty
+        self._mark_grid_dirty()
+
+    def remove_block(self, block_id: str) -> Block:
+        self._ensure_loaded()
+        block: Block = self.blocks.pop(block_id)
+        if block in self._anchored_blocks:
+            self._anchored_blocks.remove(block)
+        block.on_change = lambda: None
+        self._mark_grid_dirty()
+        return block
+
     def get_buttons(self) -> list[Button]:
+        self._ensure_loaded()
         return [
             button
             for block in list(self.blocks.values())
             for button in block.get_buttons()
         ]
 
+    def _update_grid(self) -> None:
+        if not self._grid_dirty:
+            return
+
+        self._block_grid.clear()
+        self._button_grid.clear()
+        for block in self.blocks.values():
+            self._block_grid.insert((*block.pos, *block.size), block)
+            for button in block.get_buttons():
+                self._button_grid.insert((*button.pos, *button.size), (block, button))
+        self._grid_dirty = False
+
     def clear_clicks(self, mouse_button: int) -> None:
-        for button in self.get_buttons():
+        for button in self._held_buttons:
             button.is_held[mouse_button] = False
+        self._held_buttons = [
+            button for button in self._held_buttons if any(button.is_held.values())
+        ]
 
     def press(self, pos: tuple[int, int], mouse_button: int) -> bool:
-        for block in list(self.blocks.values()):
-            if not block.is_inside(pos):
+        self._ensure_loaded()
+        self._update_grid()
+        blocks: list[Block] = self._block_grid.query(pos)
+        if not blocks:
+            return False
+
+        for block, button in self._button_grid.query(pos):
+            if block is not blocks[0]:
                 continue
 
-            for button in block.get_buttons():
-                if not button.is_inside(pos):
-                    continue
-
-                button.start_click(mouse_button)
-            return True
-
-        return False
+            button.start_click(mouse_button)
+            self._held_buttons.append(button)
+        return True
 
     def release(self, pos: tuple[int, int], mouse_button: int) -> bool:
+        self._ensure_loaded()
+        self._update_grid()
         caught_click: bool = False
 
-        for button in self.get_buttons():
-            if not button.is_inside(pos):
-                continue
-
+        for _, button in self._button_grid.query(pos):
             button.end_click(mouse_button)
             caught_click = True
 
@@ -67,24 +139,27 @@ class UI:
     def bind_button(self, button_path: str, callback: Callable) -> None:
         if button_path not in self.bound_buttons.keys():
             self.bound_buttons[button_path] = callback
+        if self._layout is None:
+            return
 
         block_id, button_id = button_path.split("/")
 
         self.blocks[block_id].buttons[button_id].callback = callback
 
     def draw(self, window: pygame.Surface, font: pygame.font.Font) -> None:
+        self._ensure_loaded()
         for block in list(self.blocks.values()):
             pygame.draw.rect(
                 window,
                 block.color,
-                (*block.pos, *block.get_size()),
+                (*block.pos, *block.size),
                 0,
                 block.border_radius,
             )
             pygame.draw.rect(
                 window,
                 block.border_color,
-                (*block.pos, *block.get_size()),
+                (*block.pos, *block.size),
                 block.border_width,
                 block.border_radius,
             )
@@ -103,7 +178,7 @@ class UI:
                     button.border_width,
                     button.border_radius,
                 )
-                text = font.render(button.text, True, button.text_color)
+                text: pygame.Surface = button.get_text_surface(font)
                 window.blit(
                     text,
                     (
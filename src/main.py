@@ -1,6 +1,13 @@
 from Renderer import Renderer2D, Renderer3D, SetupOptions
 from Renderer import pygame as pg
-from random import random
+from Renderer import numpy as np
+from Renderer.world import WorldWriter
+from Renderer.voxels import VoxelGrid
+from Renderer.renderer3d import Viewport
+from pathlib import Path
+import argparse
+from random import random, randrange
+from typing import Any
 
 
 class DelRend2D(Renderer2D):
@@ -9,25 +16,69 @@ class DelRend2D(Renderer2D):
         options.set_size((800, 600))
         options.enable_resizable()
         options.set_title("DelRenderer 2D")
+        options.enable_hot_reload()
         super().__init__(options)
 
+    def spawn_random(self, obj_name: str, amount: int = 100) -> None:
+        for _ in range(amount):
+            pos: tuple[float, float] = (
+                self._camera.pos[0] + random() * 20 - 10,
+                self._camera.pos[1] + random() * 20 - 10,
+            )
+            self.create_object(obj_name, pos)
+
+    def build_world(self, path: Path, amount: int = 2_000_000) -> None:
+        rng: np.random.Generator = np.random.default_rng(0)
+        writer: WorldWriter = WorldWriter(path, ["square", "textured_square"])
+        for start in range(0, amount, 1_000_000):
+            count: int = min(amount - start, 1_000_000)
+            writer.add(
+                rng.uniform(-3000, 3000, (count, 2)),
+                (rng.random(count) < 0.1).astype(np.uint16),
+            )
+        writer.close()
+
     def key_pressed(self, key: int, mod: int, unicode: str, scancode: int) -> None:
         if key == pg.K_F2:
-            for _ in range(100):
-                pos: tuple[float, float] = (
-                    self._camera.pos[0] + random() * 20 - 10,
-                    self._camera.pos[1] + random() * 20 - 10,
-                )
-                self.create_object("square", pos)
+            self.spawn_random("square")
+        elif key == pg.K_F3:
+            self.spawn_random("textured_square")
+        elif key == pg.K_F4:
+            if self._world is not None:
+                self.close_world()
+                return
+            path: Path = Path("world")
+            if not (path / "world.json").exists():
+                self.build_world(path)
+            self.open_world(path, 64 << 20)
 
 
 class DelRend3D(Renderer3D):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        headless: bool = False,
+        on_demand: bool = False,
+        target_fps: float | None = None,
+    ) -> None:
         options: SetupOptions = SetupOptions()
         options.set_size((800, 600))
         options.enable_resizable()
         options.set_title("DelRenderer 3D")
+        if headless:
+            options.enable_headless()
+        else:
+            options.enable_hot_reload()
+            options.enable_memory_tracing()
+        if on_demand:
+            options.enable_on_demand()
+        if target_fps is not None:
+            options.enable_dynamic_resolution(target_fps)
         super().__init__(options)
+        self._spawned: list[int] = []
+        self._spin: float | None = None
+        self._cloud: int | None = None
+        self._cloud_seed: int | None = None
+        self._terrain: int | None = None
 
     def spawn_random(self, amount: int = 100) -> None:
         for _ in range(amount):
@@ -36,7 +87,87 @@ class DelRend3D(Renderer3D):
                 self._camera.focus[1] + random() * 20 - 10,
                 self._camera.focus[2] + random() * 20 - 10,
             )
-            self.create_object("cube", pos)
+            self._spawned.append(self.create_object("cube", pos))
+
+    def spawn_point_cloud(
+        self, amount: int = 2_000_000, seed: int | None = None
+    ) -> int:
+        self._cloud_seed = randrange(2**32) if seed is None else seed
+        rng: np.random.Generator = np.random.default_rng(self._cloud_seed)
+        ground: np.ndarray = rng.uniform(-10, 10, (amount, 2))
+        heights: np.ndarray = (
+            np.sin(ground[:, 0]) * np.cos(ground[:, 1] * 0.7)
+            + rng.normal(0, 0.03, amount)
+        ) - 2
+        shade: np.ndarray = np.clip((heights + 3) / 2, 0, 1)
+        colors: np.ndarray = np.stack(
+            (shade * 255, 80 + shade * 120, (1 - shade) * 255), axis=1
+        )
+        return self.add_point_cloud(
+            np.stack((ground[:, 0], heights, ground[:, 1]), axis=1), colors
+        )
+
+    def spawn_terrain(self, size: int = 48, height: int = 16) -> int:
+        grid: VoxelGrid = VoxelGrid(
+            (size, height, size), (-size / 2, -height - 2.0, -size / 2)
+        )
+        x, z = np.meshgrid(np.arange(size), np.arange(size), indexing="ij")
+        heights: np.ndarray = (
+            height / 2 + np.sin(x * 0.25) * np.cos(z * 0.2) * height / 3
+        ).astype(int)
+        grid.cells[:] = np.arange(height)[None, :, None] < heights[:, None, :]
+        grid.rebuild()
+        return self.add_voxel_grid(grid)
+
+    def _capture_state(self) -> dict[str, Any]:
+        return super()._capture_state() | {
+            "spawned": self._spawned,
+            "spin": self._spin,
+            "cloud_seed": None if self._cloud is None else self._cloud_seed,
+            "terrain": (
+                None
+                if self._terrain is None
+                else np.flatnonzero(self.get_voxel_grid(self._terrain).cells).tolist()
+            ),
+        }
+
+    def _restore_state(self, state: dict[str, Any]) -> None:
+        super()._restore_state(state)
+        self._spawned = list(state["spawned"])
+        self._spin = state["spin"]
+        if state["cloud_seed"] is not None:
+            self._cloud = self.spawn_point_cloud(seed=state["cloud_seed"])
+        if state["terrain"] is not None:
+            self._terrain = self.spawn_terrain()
+            grid: VoxelGrid = self.get_voxel_grid(self._terrain)
+            grid.cells[:] = False
+            grid.cells.flat[state["terrain"]] = True
+            grid.rebuild()
+
+    def mouse_pressed(self, pos: tuple[int, int], button: int) -> None:
+        if button != pg.BUTTON_LEFT or self._terrain is None:
+            super().mouse_pressed(pos, button)
+            return
+
+        viewport: Viewport | None = self._viewport_at(pos)
+        if viewport is not None:
+            self._camera = viewport.camera
+        grid: VoxelGrid = self.get_voxel_grid(self._terrain)
+        cell: np.ndarray = np.floor(
+            (self._camera.focus - grid.origin) / grid.cell_size
+        ).astype(int)
+        if ((cell >= 0) & (cell < grid.shape)).all():
+            grid.set_cells(cell, not grid.cells[tuple(cell)])
+
+    def update(self, dt: float) -> None:
+        super().update(dt)
+        if self._spin is None or not self._spawned:
+            return
+
+        self._spin += dt
+        handles: np.ndarray = np.array(self._spawned)
+        phases: np.ndarray = handles[:, None] * (0.1, 0.2, 0.3)
+        self.transform_objects(handles, phases + self._spin * np.array([0.5, 1.0, 0.0]))
 
     def bind_buttons(self) -> None:
         self.ui.bind_button("main/debug", self._toggle_debug)
@@ -50,11 +181,72 @@ class DelRend3D(Renderer3D):
             self.spawn_random()
         if key == pg.K_F5:
             self.ui.reload()
+        if key == pg.K_F6:
+            self.dump_memory_snapshot("memory.snapshot")
+        if key == pg.K_F7:
+            self._spin = None if self._spin is not None else 0.0
+        if key == pg.K_F8:
+            if self._recorder is None:
+                self.start_recording("recording.avi", "avi")
+            else:
+                self.stop_recording()
+        if key == pg.K_F10:
+            if self._cloud is None:
+                self._cloud = self.spawn_point_cloud()
+            else:
+                self.remove_point_cloud(self._cloud)
+                self._cloud = None
+        if key == pg.K_F11:
+            if self._viewports:
+                self.clear_viewports()
+            else:
+                self.set_quad_view()
+        if key == pg.K_F12:
+            if self._terrain is None:
+                self._terrain = self.spawn_terrain()
+            else:
+                self.remove_voxel_grid(self._terrain)
+                self._terrain = None
+        if key == pg.K_F9:
+            if self._input_recorder is None:
+                self.start_input_recording("input.jsonl")
+            else:
+                self.stop_input_recording()
 
 
 def main() -> None:
-    renderer: DelRend3D = DelRend3D()
-    renderer.start()
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--replay", help="replay an input log recorded with F9")
+    parser.add_argument("--fixed-dt", type=float, help="frame time used in replays")
+    parser.add_argument("--record", help="record input from the first frame")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument(
+        "--on-demand", action="store_true", help="only redraw when something changed"
+    )
+    parser.add_argument(
+        "--target-fps",
+        type=float,
+        help="lower the internal resolution to hold this frame rate",
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    renderer: DelRend3D = DelRend3D(args.headless, args.on_demand, args.target_fps)
+    if args.replay is None:
+        if args.record is not None:
+            renderer.start_input_recording(args.record)
+        renderer.start()
+        return
+
+    frame_times: list[float] = renderer.replay(
+        args.replay, args.fixed_dt, realtime=not args.headless
+    )
+    renderer.close()
+    total: float = sum(frame_times)
+    print(
+        f"{len(frame_times)} frames in {total:.3f} s, "
+        f"mean {total / max(len(frame_times), 1) * 1000:.2f} ms, "
+        f"max {max(frame_times, default=0.0) * 1000:.2f} ms"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+import numpy
+import pytest
+
+pytest.importorskip("Renderer._raster")
+
+from Renderer import kernels
+
+
+@pytest.mark.parametrize(
+    "size, count, seed",
+    [((320, 240), 500, 0), ((97, 61), 200, 1), ((160, 400), 300, 2)],
+)
+def test_backends_match(size: tuple[int, int], count: int, seed: int) -> None:
+    assert kernels.compare_backends(size, count, seed) == 0
+
+
+def test_dispatch_matches() -> None:
+    rng: numpy.random.Generator = numpy.random.default_rng(3)
+    size: tuple[int, int] = (200, 150)
+    polygons: numpy.ndarray = rng.random((300, 5, 2)) * (260, 210) - 30
+    colors: numpy.ndarray = rng.integers(0, 256, (300, 3), dtype=numpy.uint8)
+    outlined: numpy.ndarray = rng.random(300) < 0.5
+    starts: numpy.ndarray = rng.random((300, 2)) * (260, 210) - 30
+    ends: numpy.ndarray = rng.random((300, 2)) * (260, 210) - 30
+
+    frames: list[numpy.ndarray] = []
+    previous: object = kernels.backend
+    try:
+        for name in ("numpy", "compiled"):
+            kernels.set_backend(name)
+            framebuffer: numpy.ndarray = numpy.zeros((*size, 3), dtype=numpy.uint8)
+            kernels.fill_polygons(framebuffer, polygons, colors, colors, outlined)
+            kernels.draw_lines(framebuffer, starts, ends, colors[::-1])
+            frames.append(framebuffer)
+    finally:
+        kernels.backend = previous
+
+    assert int((frames[0] != frames[1]).any(axis=2).sum()) == 0
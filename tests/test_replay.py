@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+
+import pytest
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+import pygame
+
+from main import DelRend3D
+
+
+def key_event(key: int) -> pygame.event.Event:
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "src").symlink_to(Path(__file__).resolve().parent.parent / "src")
+    monkeypatch.chdir(tmp_path)
+
+
+def test_replay_round_trip() -> None:
+    log: Path = Path("input.jsonl")
+    recorded: DelRend3D = DelRend3D(headless=True)
+    try:
+        recorded.spawn_random(20)
+        recorded._frame(0.016, ((400, 300), []))
+        recorded.start_input_recording(log)
+        frames: list[tuple[tuple[int, int], list[pygame.event.Event]]] = [
+            ((400, 300), [key_event(pygame.K_F2)]),
+            ((420, 310), [key_event(pygame.K_F7)]),
+            ((440, 320), []),
+            ((460, 330), [key_event(pygame.K_F3)]),
+            ((480, 340), [key_event(pygame.K_F9)]),
+        ]
+        for frame_input in frames:
+            recorded._frame(0.016, frame_input)
+        expected: bytes = pygame.image.tobytes(recorded._window, "RGB")
+    finally:
+        recorded.close()
+    contents: bytes = log.read_bytes()
+    scene: bytes = log.with_suffix(".scene").read_bytes()
+
+    replayed: DelRend3D = DelRend3D(headless=True)
+    try:
+        frame_times: list[float] = replayed.replay(log, 0.016)
+        actual: bytes = pygame.image.tobytes(replayed._window, "RGB")
+    finally:
+        replayed.close()
+
+    assert len(frame_times) == len(frames)
+    assert actual == expected
+    assert log.read_bytes() == contents
+    assert log.with_suffix(".scene").read_bytes() == scene